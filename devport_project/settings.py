@@ -43,6 +43,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'portfolio.timing_utils.ServerTimingMiddleware',  # First: its total covers everything below
     'corsheaders.middleware.CorsMiddleware',  # CORS middleware
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -51,13 +52,15 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'portfolio.replica_utils.ReplicaStickinessMiddleware',  # After sessions: pins reads after writes
 ]
 
 ROOT_URLCONF = 'devport_project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to Server-Timing
+        'BACKEND': 'portfolio.timing_utils.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -87,6 +90,43 @@ DATABASES = {
     }
 }
 
+# Opt-in tuning for SQLite deployments with concurrent editors: WAL (readers
+# no longer block behind writers), synchronous=NORMAL, larger page and mmap
+# caches, a busy timeout, and BEGIN IMMEDIATE for atomic() blocks so writers
+# queue for the lock instead of failing with "database is locked"
+SQLITE_PERFORMANCE_MODE = config('SQLITE_PERFORMANCE_MODE', default=False, cast=bool)
+SQLITE_PERFORMANCE_OPTIONS = {
+    'timeout': config('SQLITE_BUSY_TIMEOUT', default=20, cast=int),  # seconds
+    'transaction_mode': 'IMMEDIATE',
+    'pragmas': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -config('SQLITE_CACHE_SIZE_KB', default=20000, cast=int),  # negative means KiB
+        'mmap_size': config('SQLITE_MMAP_SIZE', default=134217728, cast=int),  # bytes
+        'temp_store': 'MEMORY',
+    },
+}
+if SQLITE_PERFORMANCE_MODE and DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    DATABASES['default']['ENGINE'] = 'portfolio.sqlite_backend'
+    DATABASES['default']['OPTIONS'] = SQLITE_PERFORMANCE_OPTIONS
+
+# Optional read replicas of the default database, comma-separated. Each one
+# reuses the primary's settings with a different NAME for SQLite (a database
+# file) or HOST otherwise. Only views and exports that opt in read from them.
+DATABASE_REPLICA_ALIASES = []
+# Matches both Django's SQLite backend and the tuned portfolio.sqlite_backend
+_default_is_sqlite = 'sqlite' in DATABASES['default']['ENGINE']
+for number, replica in enumerate(config('DATABASE_REPLICAS', default='', cast=Csv()), start=1):
+    location = {'NAME': replica} if _default_is_sqlite else {'HOST': replica}
+    DATABASES[f'replica{number}'] = {**DATABASES['default'], **location, 'TEST': {'MIRROR': 'default'}}
+    DATABASE_REPLICA_ALIASES.append(f'replica{number}')
+
+DATABASE_ROUTERS = ['portfolio.replica_utils.ReplicaRouter']
+
+# Seconds a user's reads stay on the primary after they write, so replication
+# lag never hides their own edits
+DATABASE_REPLICA_STICKY_SECONDS = config('DATABASE_REPLICA_STICKY_SECONDS', default=5, cast=int)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -161,12 +201,21 @@ DATA_UPLOAD_MAX_MEMORY_SIZE = config('DATA_UPLOAD_MAX_MEMORY_SIZE', default=1048
 FILE_UPLOAD_PERMISSIONS = 0o644  # Fixed permissions
 
 # Cache Configuration
+# The default two-tier cache keeps a small LRU in each process in front of a
+# file cache shared by every worker on the host; writes invalidate the other
+# processes' copies through version stamps. Point CACHE_BACKEND at Redis or
+# Memcached when workers span several hosts.
 CACHES = {
     'default': {
-        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
-        'LOCATION': config('CACHE_LOCATION', default='devport-cache'),
+        'BACKEND': config('CACHE_BACKEND', default='portfolio.cache_utils.TwoTierCache'),
+        'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / 'cache')),
     }
 }
+if CACHES['default']['BACKEND'] == 'portfolio.cache_utils.TwoTierCache':
+    CACHES['default']['OPTIONS'] = {
+        'L1_MAX_ENTRIES': config('CACHE_L1_MAX_ENTRIES', default=1000, cast=int),
+        'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=10000, cast=int),
+    }
 
 # Logging Configuration
 LOGGING = {
@@ -225,6 +274,13 @@ LOGGING = {
     },
 }
 
+# Share of requests that get one "request timing" log line from
+# portfolio.timing_utils (query count and SQL time, template render time,
+# cache hits, export phases). Sampled responses also carry the timings in a
+# Server-Timing header for staff, or for everyone with SERVER_TIMING_PUBLIC.
+SERVER_TIMING_SAMPLE_RATE = config('SERVER_TIMING_SAMPLE_RATE', default=0.05, cast=float)
+SERVER_TIMING_PUBLIC = config('SERVER_TIMING_PUBLIC', default=False, cast=bool)
+
 # Create logs directory if it doesn't exist
 LOGS_DIR = BASE_DIR / 'logs'
 LOGS_DIR.mkdir(exist_ok=True)
@@ -243,6 +299,16 @@ MESSAGE_TAGS = {
 # Session Configuration
 SESSION_COOKIE_AGE = 86400  # 1 day
 SESSION_SAVE_EVERY_REQUEST = True
+
+# Every deployment now uses cached database sessions instead of Django's
+# plain database engine (set SESSION_ENGINE to opt out). Sessions are read
+# from the cache and written to the database only when their data changes
+# or, to keep the sliding expiry moving, at most once every
+# SESSION_WRITE_INTERVAL seconds. The default two-tier file cache is shared
+# by the worker processes of one host; run several hosts on a shared cache
+# such as Redis or Memcached.
+SESSION_ENGINE = config('SESSION_ENGINE', default='portfolio.session_utils')
+SESSION_WRITE_INTERVAL = config('SESSION_WRITE_INTERVAL', default=300, cast=int)
 SESSION_EXPIRE_AT_BROWSER_CLOSE = False
 
 # CSRF Configuration
@@ -293,10 +359,68 @@ AVAILABLE_THEMES = [
 
 DEFAULT_THEME = 'minimal_dark'
 
+# Portfolios per dashboard page ("Load more" fetches the next page)
+DASHBOARD_PAGE_SIZE = config('DASHBOARD_PAGE_SIZE', default=20, cast=int)
+
+# Seconds a serialized portfolio stays in the cache for the JSON API; entries
+# are keyed by content version, so edits never serve stale documents
+API_CACHE_TIMEOUT = config('API_CACHE_TIMEOUT', default=3600, cast=int)
+
 # Portfolio Export Settings
 MAX_PORTFOLIO_EXPORT_SIZE = 50 * 1024 * 1024  # 50MB
 EXPORT_TIMEOUT = 300  # 5 minutes
 
+# Import WeasyPrint at startup instead of on the first PDF export. Leave off
+# for web workers; enable it for processes dedicated to exports.
+PRELOAD_EXPORT_LIBS = config('PRELOAD_EXPORT_LIBS', default=False, cast=bool)
+
+# Concurrent storage reads used to prefetch a portfolio's images on export,
+# and the most image bytes one export holds in memory; images beyond that
+# are streamed from storage instead
+EXPORT_MEDIA_PREFETCH_WORKERS = config('EXPORT_MEDIA_PREFETCH_WORKERS', default=8, cast=int)
+EXPORT_MEDIA_PREFETCH_MAX_BYTES = config('EXPORT_MEDIA_PREFETCH_MAX_BYTES', default=32 * 1024 * 1024, cast=int)
+
+# Threads that build ZIP/PDF exports for async export views, so a slow
+# export never holds up the event loop under ASGI
+EXPORT_WORKERS = config('EXPORT_WORKERS', default=4, cast=int)
+
+# Public page views are counted in memory and written in batches once this
+# many seconds have passed or this many portfolio-days are buffered
+VIEW_ANALYTICS_FLUSH_INTERVAL = config('VIEW_ANALYTICS_FLUSH_INTERVAL', default=60, cast=int)
+VIEW_ANALYTICS_MAX_PENDING = config('VIEW_ANALYTICS_MAX_PENDING', default=1000, cast=int)
+
+# Generated ZIP/PDF exports, cached on disk per portfolio content version.
+# A superseded version is deleted once a newer one has existed for
+# EXPORT_CACHE_PRUNE_GRACE seconds, so downloads already handed its path
+# can finish.
+EXPORT_CACHE_ROOT = config('EXPORT_CACHE_ROOT', default=BASE_DIR / 'export_cache')
+EXPORT_CACHE_PRUNE_GRACE = config('EXPORT_CACHE_PRUNE_GRACE', default=3600, cast=int)
+
+# Export admission control, shared by every worker process on the host:
+# at most EXPORT_MAX_CONCURRENT renders and EXPORT_MAX_PER_USER per user.
+# Up to EXPORT_QUEUE_SIZE requests wait EXPORT_QUEUE_TIMEOUT seconds for a
+# render slot; the rest get 429 with Retry-After: EXPORT_RETRY_AFTER.
+EXPORT_ADMISSION_ROOT = config('EXPORT_ADMISSION_ROOT', default=BASE_DIR / 'export_cache' / 'admission')
+EXPORT_MAX_CONCURRENT = config('EXPORT_MAX_CONCURRENT', default=4, cast=int)
+EXPORT_MAX_PER_USER = config('EXPORT_MAX_PER_USER', default=1, cast=int)
+EXPORT_QUEUE_SIZE = config('EXPORT_QUEUE_SIZE', default=8, cast=int)
+EXPORT_QUEUE_TIMEOUT = config('EXPORT_QUEUE_TIMEOUT', default=10, cast=float)
+EXPORT_RETRY_AFTER = config('EXPORT_RETRY_AFTER', default=5, cast=int)
+
+# File delivery: '' serves files from Django (FileResponse with Range support),
+# 'nginx' returns X-Accel-Redirect and 'xsendfile' returns X-Sendfile so the
+# front proxy streams the file. For nginx, files under SENDFILE_ROOT are
+# redirected to the internal location SENDFILE_URL.
+SENDFILE_BACKEND = config('SENDFILE_BACKEND', default='')
+SENDFILE_ROOT = config('SENDFILE_ROOT', default=BASE_DIR)
+SENDFILE_URL = config('SENDFILE_URL', default='/protected/')
+
+# Reports written by `manage.py profile_export` and staff `?profile=1` exports
+EXPORT_PROFILE_ROOT = config('EXPORT_PROFILE_ROOT', default=BASE_DIR / 'logs' / 'export_profiles')
+
+# Output directory for `manage.py build_static_site`
+STATIC_SITE_ROOT = config('STATIC_SITE_ROOT', default=BASE_DIR / 'public_site')
+
 # Image Processing Settings
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_IMAGE_FORMATS = ['JPEG', 'PNG', 'WEBP']
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import UserProfile, Portfolio, Education, Experience, Skill, Project, Certification
+from .models import UserProfile, Portfolio, Education, Experience, Skill, Project, Certification, PlatformCounter, Technology, AggregateStat, PortfolioViewStat, UserViewStat
 
 
 @admin.register(UserProfile)
@@ -15,7 +15,7 @@ class PortfolioAdmin(admin.ModelAdmin):
     list_display = ['title', 'user', 'theme', 'is_public', 'created_at']
     list_filter = ['theme', 'is_public', 'created_at']
     search_fields = ['title', 'user__username', 'slug']
-    readonly_fields = ['id', 'created_at', 'updated_at']
+    readonly_fields = ['id', 'export_count', 'last_exported_at', 'content_version', 'created_at', 'updated_at']
     prepopulated_fields = {'slug': ('title',)}
 
 
@@ -88,3 +88,40 @@ class CertificationAdmin(admin.ModelAdmin):
     search_fields = ['name', 'issuing_organization', 'portfolio__title']
     ordering = ['-issue_date']
 
+
+@admin.register(PlatformCounter)
+class PlatformCounterAdmin(admin.ModelAdmin):
+    list_display = ['name', 'value', 'updated_at']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(AggregateStat)
+class AggregateStatAdmin(admin.ModelAdmin):
+    list_display = ['kind', 'label', 'value', 'updated_at']
+    list_filter = ['kind']
+    search_fields = ['key', 'label']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(PortfolioViewStat)
+class PortfolioViewStatAdmin(admin.ModelAdmin):
+    list_display = ['portfolio', 'date', 'views', 'visitors']
+    list_filter = ['date']
+    search_fields = ['portfolio__title']
+    exclude = ['visitor_sketch']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(UserViewStat)
+class UserViewStatAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'views']
+    list_filter = ['date']
+    search_fields = ['user__username']
+    exclude = ['visitor_sketch']
+    readonly_fields = ['updated_at']
+
+
+@admin.register(Technology)
+class TechnologyAdmin(admin.ModelAdmin):
+    list_display = ['name', 'key']
+    search_fields = ['name', 'key']
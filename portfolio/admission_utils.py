@@ -0,0 +1,118 @@
+import asyncio
+import os
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.files import locks
+
+
+class ExportRejected(Exception):
+    """An export was turned away; retry after ``retry_after`` seconds"""
+
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ExportAdmission:
+    """Limit concurrent export renders across every worker process on the host.
+
+    Capacity is a set of numbered lock files in ``EXPORT_ADMISSION_ROOT``;
+    holding an exclusive lock on one is holding a slot, and the OS releases
+    it if the process dies. An export needs one of the user's
+    ``EXPORT_MAX_PER_USER`` slots, then one of ``EXPORT_MAX_CONCURRENT``
+    render slots. When every render slot is busy it may wait, holding one
+    of ``EXPORT_QUEUE_SIZE`` queue slots, for up to ``EXPORT_QUEUE_TIMEOUT``
+    seconds. Waiters poll, so admission from the queue isn't strictly FIFO.
+    """
+
+    poll_interval = 0.05
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    @asynccontextmanager
+    async def admit(self, user_id):
+        """Hold an export slot for the body of the block, or raise ``ExportRejected``"""
+        user_slot = self._try_acquire(f'user-{user_id}', settings.EXPORT_MAX_PER_USER)
+        if user_slot is None:
+            self._count('rejected_user_limit')
+            raise ExportRejected('You already have exports in progress', settings.EXPORT_RETRY_AFTER)
+        try:
+            slot = self._try_acquire('render', settings.EXPORT_MAX_CONCURRENT)
+            if slot is None:
+                slot = await self._wait_in_queue()
+            self._count('admitted')
+            try:
+                yield
+            finally:
+                self._release(slot)
+        finally:
+            self._release(user_slot)
+
+    async def _wait_in_queue(self):
+        queue_slot = self._try_acquire('queue', settings.EXPORT_QUEUE_SIZE)
+        if queue_slot is None:
+            self._count('rejected_queue_full')
+            raise ExportRejected('Too many exports in progress', settings.EXPORT_RETRY_AFTER)
+        self._count('queued')
+        try:
+            deadline = time.monotonic() + settings.EXPORT_QUEUE_TIMEOUT
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                slot = self._try_acquire('render', settings.EXPORT_MAX_CONCURRENT)
+                if slot is not None:
+                    return slot
+        finally:
+            self._release(queue_slot)
+        self._count('rejected_timeout')
+        raise ExportRejected('Too many exports in progress', settings.EXPORT_RETRY_AFTER)
+
+    def _try_acquire(self, name, count):
+        """Lock the first free ``<name>-<n>`` file, return its descriptor or None"""
+        root = settings.EXPORT_ADMISSION_ROOT
+        os.makedirs(root, exist_ok=True)
+        for n in range(count):
+            fd = os.open(os.path.join(root, f'{name}-{n}.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+            if locks.lock(fd, locks.LOCK_EX | locks.LOCK_NB):
+                return fd
+            os.close(fd)
+        return None
+
+    def _release(self, fd):
+        locks.unlock(fd)
+        os.close(fd)
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_stats(self):
+        """Admission counts of this process"""
+        with self.lock:
+            counts = dict(self.stats)
+        rejected = {
+            reason: counts.get(f'rejected_{reason}', 0) for reason in ('user_limit', 'queue_full', 'timeout')
+        }
+        return {
+            'pid': os.getpid(),
+            'admitted': counts.get('admitted', 0),
+            'queued': counts.get('queued', 0),
+            'rejected': sum(rejected.values()),
+            'rejected_by_reason': rejected,
+            'limits': {
+                'max_concurrent': settings.EXPORT_MAX_CONCURRENT,
+                'max_per_user': settings.EXPORT_MAX_PER_USER,
+                'queue_size': settings.EXPORT_QUEUE_SIZE,
+                'queue_timeout': settings.EXPORT_QUEUE_TIMEOUT,
+            },
+        }
+
+
+# Global instance
+export_admission = ExportAdmission()
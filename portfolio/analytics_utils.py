@@ -0,0 +1,235 @@
+import datetime
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from .models import Portfolio, PortfolioViewStat, UserViewStat
+
+logger = logging.getLogger(__name__)
+
+# 2**10 one-byte registers: 1 KB per sketch, about 3% standard error
+SKETCH_PRECISION = 10
+SKETCH_REGISTERS = 1 << SKETCH_PRECISION
+HASH_BITS = 64
+
+# Crawlers and link previews aren't visitors
+BOT_RE = re.compile(r'bot|crawl|spider|slurp|preview|monitor', re.IGNORECASE)
+
+
+class VisitorSketch:
+    """HyperLogLog estimate of the number of distinct visitors"""
+
+    def __init__(self, registers=b''):
+        self.registers = bytearray(registers) if registers else bytearray(SKETCH_REGISTERS)
+
+    def add(self, visitor_hash):
+        """Add a 64-bit visitor hash"""
+        index = visitor_hash >> (HASH_BITS - SKETCH_PRECISION)
+        rest = visitor_hash & ((1 << (HASH_BITS - SKETCH_PRECISION)) - 1)
+        # Position of the first 1 bit in the remaining bits
+        rank = HASH_BITS - SKETCH_PRECISION - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Fold another sketch in; the result counts the union of visitors"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self):
+        m = len(self.registers)
+        raw = 0.7213 / (1 + 1.079 / m) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Small counts: linear counting is far more accurate
+            return round(m * math.log(m / zeros))
+        return round(raw)
+
+    def __bytes__(self):
+        return bytes(self.registers)
+
+
+class ViewAnalytics:
+    """Public page views, buffered in process memory and flushed in batches.
+
+    ``record`` only touches a dict. Once ``VIEW_ANALYTICS_FLUSH_INTERVAL``
+    seconds have passed, or ``VIEW_ANALYTICS_MAX_PENDING`` portfolio-days
+    are buffered, the caller is told to ``flush``, which upserts every
+    buffered portfolio-day, and the owners' daily rollups, in one
+    transaction. Views buffered by a process
+    that dies before flushing are lost.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_flush = time.monotonic()
+
+    def visitor_hash(self, request):
+        """Keyed hash of the client address and user agent; never stored"""
+        visitor = f"{request.META.get('REMOTE_ADDR', '')}\n{request.headers.get('User-Agent', '')}"
+        key = hashlib.sha256(settings.SECRET_KEY.encode()).digest()
+        return int.from_bytes(hashlib.blake2b(visitor.encode(), key=key, digest_size=8).digest(), 'big')
+
+    def record(self, portfolio_id, request):
+        """Count one view, return True when a flush is due"""
+        if BOT_RE.search(request.headers.get('User-Agent', '')):
+            return False
+        visitor_hash = self.visitor_hash(request)
+        bucket = (portfolio_id, timezone.localdate())
+        with self.lock:
+            views, sketch = self.pending.get(bucket) or (0, VisitorSketch())
+            sketch.add(visitor_hash)
+            self.pending[bucket] = (views + 1, sketch)
+            return (
+                len(self.pending) >= settings.VIEW_ANALYTICS_MAX_PENDING
+                or time.monotonic() - self.last_flush >= settings.VIEW_ANALYTICS_FLUSH_INTERVAL
+            )
+
+    def flush(self):
+        """Write the buffered views, return the number of portfolio-days written"""
+        with self.lock:
+            batch, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+        if not batch:
+            return 0
+        try:
+            return self._write(batch)
+        except DatabaseError:
+            logger.exception("Could not flush %d portfolio view counters", len(batch))
+            self._requeue(batch)
+            return 0
+
+    def _write(self, batch):
+        # Views of since-deleted portfolios are dropped
+        owners = dict(Portfolio.objects.filter(
+            pk__in={portfolio_id for portfolio_id, _ in batch},
+        ).values_list('pk', 'user_id'))
+        batch = {bucket: value for bucket, value in batch.items() if bucket[0] in owners}
+        if not batch:
+            return 0
+
+        # The same views rolled up per owner and day for dashboard totals
+        user_batch = {}
+        for (portfolio_id, date), (views, sketch) in batch.items():
+            user_views, user_sketch = user_batch.get((owners[portfolio_id], date)) or (0, VisitorSketch())
+            user_sketch.merge(sketch)
+            user_batch[owners[portfolio_id], date] = (user_views + views, user_sketch)
+
+        with transaction.atomic():
+            written = self._upsert(PortfolioViewStat, 'portfolio_id', batch)
+            self._upsert(UserViewStat, 'user_id', user_batch)
+        return written
+
+    def _upsert(self, model, owner_field, batch):
+        """Add ``{(owner id, date): (views, sketch)}`` to a day stats table"""
+        model.objects.bulk_create([
+            model(**{owner_field: owner_id, 'date': date}) for owner_id, date in batch
+        ], ignore_conflicts=True)
+        # Sketches merge in Python, so lock the rows other processes may flush into
+        rows = list(model.objects.select_for_update().filter(**{
+            f'{owner_field}__in': {owner_id for owner_id, _ in batch},
+            'date__in': {date for _, date in batch},
+        }))
+        # Only the per-portfolio rows store a daily visitor estimate
+        estimate = model is PortfolioViewStat
+        fields = ['views', 'visitor_sketch', 'updated_at'] + (['visitors'] if estimate else [])
+        updated, now = [], timezone.now()
+        for row in rows:
+            pending = batch.get((getattr(row, owner_field), row.date))
+            if pending is None:
+                continue
+            views, sketch = pending
+            # Merge into a copy: the batch is requeued as is if the write fails
+            merged = VisitorSketch(row.visitor_sketch)
+            merged.merge(sketch)
+            row.views += views
+            row.visitor_sketch = bytes(merged)
+            if estimate:
+                row.visitors = merged.estimate()
+            row.updated_at = now
+            updated.append(row)
+        model.objects.bulk_update(updated, fields)
+        return len(updated)
+
+    def _requeue(self, batch):
+        with self.lock:
+            for bucket, (views, sketch) in batch.items():
+                pending = self.pending.get(bucket)
+                if pending is not None:
+                    sketch.merge(pending[1])
+                    views += pending[0]
+                self.pending[bucket] = (views, sketch)
+
+    def get_stats(self, portfolio_ids, days=30):
+        """Views and estimated unique visitors of each portfolio over the last ``days`` days.
+
+        Returns ``{portfolio_id: {'views', 'visitors'}}``; visitors of
+        several days are counted once.
+        """
+        portfolio_ids = set(portfolio_ids)
+        since = self._since(days)
+        totals = _Totals()
+        rows = PortfolioViewStat.objects.filter(
+            portfolio_id__in=portfolio_ids, date__gte=since,
+        ).values_list('portfolio_id', 'views', 'visitor_sketch')
+        for portfolio_id, count, sketch in rows:
+            totals.add(portfolio_id, count, VisitorSketch(sketch))
+        # Include what this process hasn't flushed yet
+        for (portfolio_id, date), (count, sketch) in self._pending_items():
+            if portfolio_id in portfolio_ids and date >= since:
+                totals.add(portfolio_id, count, sketch)
+        return totals.result()
+
+    def get_user_total(self, user_id, days=30):
+        """Views and estimated unique visitors of all of a user's portfolios, from the daily rollup"""
+        since = self._since(days)
+        totals = _Totals()
+        rows = UserViewStat.objects.filter(user_id=user_id, date__gte=since).values_list('views', 'visitor_sketch')
+        for count, sketch in rows:
+            totals.add(user_id, count, VisitorSketch(sketch))
+
+        pending = [(bucket, value) for bucket, value in self._pending_items() if bucket[1] >= since]
+        if pending:
+            owned = set(Portfolio.objects.filter(
+                user_id=user_id, pk__in={portfolio_id for (portfolio_id, _), _ in pending},
+            ).values_list('pk', flat=True))
+            for (portfolio_id, _), (count, sketch) in pending:
+                if portfolio_id in owned:
+                    totals.add(user_id, count, sketch)
+        return totals.result().get(user_id, {'views': 0, 'visitors': 0})
+
+    def _since(self, days):
+        return timezone.localdate() - datetime.timedelta(days=days - 1)
+
+    def _pending_items(self):
+        with self.lock:
+            return list(self.pending.items())
+
+
+class _Totals:
+    """Views and merged visitor sketches per key"""
+
+    def __init__(self):
+        self.views = {}
+        self.sketches = {}
+
+    def add(self, key, count, sketch):
+        self.views[key] = self.views.get(key, 0) + count
+        self.sketches.setdefault(key, VisitorSketch()).merge(sketch)
+
+    def result(self):
+        return {
+            key: {'views': self.views[key], 'visitors': sketch.estimate()}
+            for key, sketch in self.sketches.items()
+        }
+
+
+# Global instance
+view_analytics = ViewAnalytics()
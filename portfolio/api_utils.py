@@ -0,0 +1,168 @@
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import prefetch_related_objects
+
+from .hash_utils import PORTFOLIO_PREFETCH, PORTFOLIO_RELATIONS
+from .models import Portfolio
+
+API_VERSION = 1
+
+# Serialized fields per part of the document
+PORTFOLIO_FIELDS = ('slug', 'title', 'theme', 'updated_at')
+PROFILE_FIELDS = ('bio', 'location', 'website', 'github_url', 'linkedin_url', 'twitter_url', 'behance_url')
+ITEM_FIELDS = {
+    'education': ('id', 'institution', 'degree', 'field_of_study', 'start_date', 'end_date', 'description', 'order'),
+    'experience': (
+        'id', 'company', 'position', 'location', 'start_date', 'end_date', 'is_current', 'description', 'order',
+    ),
+    'skills': ('id', 'name', 'category', 'proficiency', 'order'),
+    'projects': ('id', 'name', 'description', 'github_url', 'live_url', 'featured', 'order', 'created_at'),
+    'certifications': (
+        'id', 'name', 'issuing_organization', 'issue_date', 'expiry_date', 'credential_id', 'credential_url', 'order',
+    ),
+}
+NESTED_KEYS = ('owner', 'profile') + PORTFOLIO_RELATIONS
+DOCUMENT_KEYS = ('api_version',) + PORTFOLIO_FIELDS + NESTED_KEYS
+
+
+class InvalidFields(ValueError):
+    """Raised for a ``fields`` selection naming unknown fields"""
+
+
+class PortfolioAPISerializer:
+    """Serialize public portfolios for the read-only JSON API.
+
+    The full document is built with a fixed number of queries (the
+    portfolio with its owner and profile, plus one per child collection)
+    and cached under a key derived from the portfolio's content version,
+    so a repeat read costs the version lookup plus one cache hit. Field
+    selection is applied to the cached document.
+    """
+
+    def __init__(self, timeout=None):
+        self.timeout = timeout or getattr(settings, 'API_CACHE_TIMEOUT', 3600)
+
+    def get_portfolio(self, slug):
+        """Return the public portfolio with its owner and profile, or None"""
+        return (
+            Portfolio.objects.select_related('user__profile')
+            .filter(slug=slug, is_public=True)
+            .first()
+        )
+
+    async def aget_portfolio(self, slug):
+        """Async ``get_portfolio``"""
+        return (
+            await Portfolio.objects.select_related('user__profile')
+            .filter(slug=slug, is_public=True)
+            .afirst()
+        )
+
+    def get_version_key(self, portfolio):
+        """Identify the content version of everything in the document"""
+        user = portfolio.user
+        profile = getattr(user, 'profile', None)
+        profile_stamp = profile.updated_at.timestamp() if profile else 0
+        # User has no modification time, so stamp the fields of ``owner``
+        owner = f"{user.username}\0{user.first_name}\0{user.last_name}\0{user.email}"
+        owner_stamp = hashlib.md5(owner.encode('utf-8'), usedforsecurity=False).hexdigest()[:12]
+        return (
+            f"{API_VERSION}:{portfolio.pk}:{portfolio.content_version}:"
+            f"{portfolio.updated_at.timestamp()}:{profile_stamp}:{owner_stamp}"
+        )
+
+    def get_etag(self, version_key, selection=None):
+        """ETag of a version of the document projected onto ``selection``"""
+        canonical = sorted((key, sorted(subfields or ())) for key, subfields in (selection or {}).items())
+        digest = hashlib.md5(f"{version_key}:{canonical}".encode('utf-8'), usedforsecurity=False).hexdigest()
+        return f'"{digest}"'
+
+    def get_document(self, portfolio, version_key):
+        """Return the full document, from the cache when possible"""
+        cache_key = f"api:portfolio:{version_key}"
+        document = cache.get(cache_key)
+        if document is None:
+            document = self.serialize(portfolio)
+            cache.set(cache_key, document, self.timeout)
+        return document
+
+    async def aget_document(self, portfolio, version_key):
+        """Async ``get_document``; only a cache miss leaves the event loop"""
+        cache_key = f"api:portfolio:{version_key}"
+        document = await cache.aget(cache_key)
+        if document is None:
+            document = await sync_to_async(self.serialize)(portfolio)
+            await cache.aset(cache_key, document, self.timeout)
+        return document
+
+    def serialize(self, portfolio):
+        prefetch_related_objects([portfolio], *PORTFOLIO_PREFETCH)
+        user = portfolio.user
+        profile = getattr(user, 'profile', None)
+
+        document = {'api_version': API_VERSION}
+        document.update({name: getattr(portfolio, name) for name in PORTFOLIO_FIELDS})
+        document['owner'] = {
+            'username': user.username,
+            'name': user.get_full_name(),
+            'email': user.email,
+        }
+        document['profile'] = {name: getattr(profile, name) for name in PROFILE_FIELDS} if profile else {}
+        if profile:
+            document['profile']['profile_picture'] = _file_url(profile.profile_picture)
+
+        for relation in PORTFOLIO_RELATIONS:
+            items = []
+            for item in getattr(portfolio, relation).all():
+                data = {name: getattr(item, name) for name in ITEM_FIELDS[relation]}
+                if relation == 'projects':
+                    data['tech_stack'] = item.get_tech_list()
+                    data['image'] = _file_url(item.image)
+                items.append(data)
+            document[relation] = items
+
+        return document
+
+    def parse_fields(self, value):
+        """Parse ``title,skills.name,profile.bio`` into ``{key: subfields or None}``"""
+        selection = {}
+        unknown = []
+        for part in filter(None, (part.strip() for part in value.split(','))):
+            key, _, subfield = part.partition('.')
+            if key not in DOCUMENT_KEYS or (subfield and key not in NESTED_KEYS):
+                unknown.append(part)
+                continue
+            if not subfield:
+                selection[key] = None
+            elif selection.get(key, ()) is not None:
+                selection.setdefault(key, set()).add(subfield)
+        if unknown:
+            raise InvalidFields(f"Unknown fields: {', '.join(unknown)}")
+        return selection
+
+    def select(self, document, selection):
+        """Project a document onto a parsed field selection"""
+        if not selection:
+            return document
+
+        result = {'api_version': document['api_version']}
+        for key, subfields in selection.items():
+            value = document[key]
+            if subfields is None:
+                result[key] = value
+            elif isinstance(value, list):
+                result[key] = [{name: item[name] for name in subfields if name in item} for item in value]
+            else:
+                result[key] = {name: value[name] for name in subfields if name in value}
+        return result
+
+
+def _file_url(field_file):
+    return field_file.url if field_file else None
+
+
+# Global instance
+api_serializer = PortfolioAPISerializer()
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class PortfolioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolio'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # Web workers load the PDF stack on first export; dedicated export
+        # workers can opt in to paying that cost at boot instead.
+        if getattr(settings, 'PRELOAD_EXPORT_LIBS', False):
+            from .pdf_utils import preload_weasyprint
+            preload_weasyprint()
@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.views import redirect_to_login
+from django.db import close_old_connections
+from django.http import HttpResponseNotAllowed
+
+_export_pool = None
+_export_pool_lock = threading.Lock()
+
+
+async def aget_user(request):
+    """Resolve the lazy ``request.user`` off the event loop"""
+    # Evaluating it once in a thread caches the user on the lazy object
+    await sync_to_async(lambda: request.user.is_authenticated)()
+    return request.user
+
+
+def async_login_required(view):
+    """``login_required`` for async views; Django 4.2's only wraps sync ones"""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        user = await aget_user(request)
+        if not user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+def async_require_http_methods(methods):
+    """``require_http_methods`` for async views"""
+    def decorator(view):
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in methods:
+                return HttpResponseNotAllowed(methods)
+            return await view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def export_pool():
+    """Threads that build exports, created on first use"""
+    global _export_pool
+    with _export_pool_lock:
+        if _export_pool is None:
+            _export_pool = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'EXPORT_WORKERS', 4), thread_name_prefix='export',
+            )
+    return _export_pool
+
+
+async def run_in_export_pool(func, *args, **kwargs):
+    """Run blocking export work on the export pool without blocking the event loop.
+
+    The caller's context variables (replica routing state) go along, and
+    the worker thread's database connections are recycled like a request's.
+    """
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, _run_with_connections, func, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(export_pool(), call)
+
+
+def _run_with_connections(func, *args, **kwargs):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        close_old_connections()
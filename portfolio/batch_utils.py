@@ -0,0 +1,194 @@
+from django.db import transaction
+from django.forms.models import model_to_dict
+
+from .forms import CertificationForm, EducationForm, ExperienceForm, ProjectForm, SkillForm
+from .models import Portfolio, Project, Skill
+from .stats_utils import record_skill_changes, skill_state
+from .technology_utils import sync_project_technologies
+
+# Item type -> form used to validate it; the model comes from the form
+ITEM_FORMS = {
+    'education': EducationForm,
+    'experience': ExperienceForm,
+    'skill': SkillForm,
+    'project': ProjectForm,
+    'certification': CertificationForm,
+}
+
+OPERATIONS = ('create', 'update', 'delete')
+
+
+class InvalidBatch(ValueError):
+    """Raised for a malformed batch payload"""
+
+
+class PortfolioBatchEditor:
+    """Apply many item create/update/delete operations to one portfolio.
+
+    Every operation is validated with the item's ModelForm first; only if
+    all of them pass are they written, in a single transaction with one
+    ``bulk_create``/``bulk_update``/``delete`` per item type.
+    """
+
+    max_operations = 500
+
+    def apply(self, portfolio, operations):
+        """Validate and apply ``operations``.
+
+        Returns ``(applied, results)`` where ``results`` has one entry per
+        operation, in order. Nothing is written unless ``applied`` is true.
+        """
+        if not isinstance(operations, list) or not operations:
+            raise InvalidBatch('Expected a non-empty list of operations')
+        if len(operations) > self.max_operations:
+            raise InvalidBatch(f'At most {self.max_operations} operations per batch')
+
+        existing = self._load_existing(portfolio, operations)
+        results = []
+        plan = {item_type: {'create': [], 'update': [], 'delete': []} for item_type in ITEM_FORMS}
+        seen = set()
+
+        for index, operation in enumerate(operations):
+            result, instance = self._validate(portfolio, operation, existing, seen)
+            result['index'] = index
+            results.append(result)
+            if instance is not None:
+                plan[result['type']][result['op']].append((result, instance))
+
+        if not all(result['success'] for result in results):
+            return False, results
+
+        with transaction.atomic():
+            for item_type, form_class in ITEM_FORMS.items():
+                self._write(form_class, plan[item_type])
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+
+        return True, results
+
+    def reorder(self, user, slug, item_type, ids):
+        """Give a portfolio's items of one type the order of ``ids``.
+
+        ``ids`` must list every item of that type exactly once. Ownership is
+        checked by the same query that loads the items (or, when there are
+        none, by a lookup of the portfolio), and only rows whose
+        position changed are written. Returns the number of rows updated.
+        """
+        if item_type not in ITEM_FORMS:
+            raise InvalidBatch(f"Unknown item type: {item_type}")
+        if not isinstance(ids, list) or not all(isinstance(item_id, int) for item_id in ids):
+            raise InvalidBatch('Expected a list of item ids')
+        if len(ids) > self.max_operations:
+            raise InvalidBatch(f'At most {self.max_operations} items per reorder')
+
+        model = ITEM_FORMS[item_type]._meta.model
+        with transaction.atomic():
+            items = model.objects.filter(
+                portfolio__slug=slug, portfolio__user=user,
+            ).select_for_update().only('pk', 'portfolio_id', 'order').order_by().in_bulk()
+            # With no items loaded, nothing above proved the portfolio is the user's
+            if not items and not Portfolio.objects.filter(slug=slug, user=user).exists():
+                raise InvalidBatch('Portfolio not found')
+
+            if len(ids) != len(set(ids)) or set(ids) != set(items):
+                raise InvalidBatch('The ids must list every item of this type exactly once')
+
+            changed = []
+            for position, item_id in enumerate(ids):
+                item = items[item_id]
+                if item.order != position:
+                    item.order = position
+                    changed.append(item)
+            if changed:
+                model.objects.bulk_update(changed, ['order'])
+                Portfolio.objects.filter(pk=changed[0].portfolio_id).bump_content_version()
+
+        return len(changed)
+
+    def _load_existing(self, portfolio, operations):
+        """Fetch every item targeted by an update or delete, one query per type"""
+        ids = {}
+        for operation in operations:
+            if isinstance(operation, dict) and operation.get('op') in ('update', 'delete'):
+                item_type, item_id = operation.get('type'), operation.get('id')
+                if item_type in ITEM_FORMS and isinstance(item_id, int):
+                    ids.setdefault(item_type, set()).add(item_id)
+
+        existing = {}
+        for item_type, item_ids in ids.items():
+            model = ITEM_FORMS[item_type]._meta.model
+            for item in model.objects.filter(portfolio=portfolio, pk__in=item_ids):
+                existing[(item_type, item.pk)] = item
+        return existing
+
+    def _validate(self, portfolio, operation, existing, seen):
+        if not isinstance(operation, dict):
+            return {'success': False, 'errors': {'__all__': ['Operation must be an object']}}, None
+
+        op, item_type, item_id = operation.get('op'), operation.get('type'), operation.get('id')
+        result = {'op': op, 'type': item_type, 'id': item_id, 'success': False}
+
+        if op not in OPERATIONS:
+            result['errors'] = {'op': [f"Must be one of: {', '.join(OPERATIONS)}"]}
+            return result, None
+        if item_type not in ITEM_FORMS:
+            result['errors'] = {'type': [f"Must be one of: {', '.join(ITEM_FORMS)}"]}
+            return result, None
+
+        form_class = ITEM_FORMS[item_type]
+        instance = None
+        if op != 'create':
+            instance = existing.get((item_type, item_id))
+            if instance is None:
+                result['errors'] = {'id': ['Item not found']}
+                return result, None
+            if (item_type, item_id) in seen:
+                result['errors'] = {'id': ['Item appears in more than one operation']}
+                return result, None
+            seen.add((item_type, item_id))
+
+        if op == 'delete':
+            result['success'] = True
+            return result, instance
+
+        data = operation.get('data') or {}
+        if not isinstance(data, dict):
+            result['errors'] = {'data': ['Must be an object']}
+            return result, None
+        if instance is not None:
+            # Updates may be partial: unspecified fields keep their value
+            data = {**model_to_dict(instance, fields=form_class._meta.fields), **data}
+
+        form = form_class(data, instance=instance)
+        if not form.is_valid():
+            result['errors'] = form.errors.get_json_data()
+            return result, None
+
+        item = form.save(commit=False)
+        item.portfolio = portfolio
+        result['success'] = True
+        return result, item
+
+    def _write(self, form_class, plan):
+        model = form_class._meta.model
+
+        if plan['delete']:
+            model.objects.filter(pk__in=[item.pk for _, item in plan['delete']]).delete()
+        if plan['update']:
+            model.objects.bulk_update([item for _, item in plan['update']], form_class._meta.fields)
+        if plan['create']:
+            model.objects.bulk_create([item for _, item in plan['create']])
+            for result, item in plan['create']:
+                result['id'] = item.pk
+
+        # Bulk writes skip signals, so tag projects and count skills here
+        if model is Project and (plan['create'] or plan['update']):
+            sync_project_technologies([item for _, item in plan['create'] + plan['update']])
+        if model is Skill:
+            record_skill_changes(
+                [(item._loaded_stats, skill_state(item)) for _, item in plan['update']]
+                + [(None, skill_state(item)) for _, item in plan['create']]
+            )
+
+
+# Global instance
+batch_editor = PortfolioBatchEditor()
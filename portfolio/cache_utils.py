@@ -0,0 +1,227 @@
+import mmap
+import os
+import pickle
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.core.cache.backends.filebased import FileBasedCache
+from django.utils.functional import cached_property
+
+from .timing_utils import record_cache_lookup
+
+# Version stamps live in a small memory-mapped file next to the L2 entries.
+# Each key hashes to one slot; a write anywhere invalidates that slot's L1
+# entries in every process on the host.
+STAMP_FILE = 'stamps.bin'
+STAMP_SLOTS = 1024
+STAMP_SIZE = 8
+
+# Process-wide L1 state per cache location, shared by all threads (Django
+# creates one cache backend instance per thread)
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class SharedFileCache(FileBasedCache):
+    """File cache on the local host that can also return raw entries"""
+
+    def get_pickled(self, key, version=None):
+        """Return ``(pickled value, expiry)``, or None on a miss"""
+        fname = self._key_to_file(key, version)
+        try:
+            with open(fname, 'rb') as f:
+                expiry = pickle.load(f)
+                if expiry is None or expiry >= time.time():
+                    return zlib.decompress(f.read()), expiry
+        except FileNotFoundError:
+            return None
+        self._delete(fname)
+        return None
+
+
+class _ProcessTier:
+    """Bounded LRU of pickled values plus the shared version stamps"""
+
+    def __init__(self, location, max_entries, max_item_size):
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.max_item_size = max_item_size
+        self.stats = Counter()
+
+        os.makedirs(location, exist_ok=True)
+        fd = os.open(os.path.join(location, STAMP_FILE), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < STAMP_SLOTS * STAMP_SIZE:
+                os.ftruncate(fd, STAMP_SLOTS * STAMP_SIZE)
+            self.stamps = mmap.mmap(fd, STAMP_SLOTS * STAMP_SIZE)
+        finally:
+            os.close(fd)
+
+    def stamp(self, slot):
+        return self.stamps[slot * STAMP_SIZE:(slot + 1) * STAMP_SIZE]
+
+    def bump(self, slot=None):
+        """Give one slot (or all of them) a stamp no process has seen"""
+        if slot is None:
+            self.stamps[:] = os.urandom(STAMP_SLOTS * STAMP_SIZE)
+            return None
+        stamp = os.urandom(STAMP_SIZE)
+        self.stamps[slot * STAMP_SIZE:(slot + 1) * STAMP_SIZE] = stamp
+        return stamp
+
+    def get(self, key, stamp):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.stats['l1_misses'] += 1
+                return None
+            pickled, expiry, entry_stamp = entry
+            if entry_stamp != stamp or (expiry is not None and expiry <= time.time()):
+                del self.entries[key]
+                self.stats['l1_stale'] += 1
+                self.stats['l1_misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['l1_hits'] += 1
+            return pickled
+
+    def put(self, key, pickled, expiry, stamp):
+        if len(pickled) > self.max_item_size or (expiry is not None and expiry <= time.time()):
+            return
+        with self.lock:
+            self.entries[key] = (pickled, expiry, stamp)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['l1_evictions'] += 1
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def discard(self, key=None):
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+
+class TwoTierCache(BaseCache):
+    """In-process LRU (L1) in front of a file cache shared by the host (L2).
+
+    Reads try L1, then L2, filling L1 on an L2 hit. Every write goes to L2
+    and then gives the key's stamp slot a fresh random value; L1 entries
+    remember the stamp they were read under, so other processes drop them
+    on their next read. Writes never fill L1: two writers can bump in the
+    opposite order to the one they wrote L2 in, so only a read knows which
+    value won. Configure with ``LOCATION`` (a directory) and the
+    ``L1_MAX_ENTRIES`` / ``L1_MAX_ITEM_SIZE`` options; other options go to
+    the file cache.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = dict(params.get('OPTIONS', {}))
+        self._max_entries = options.pop('L1_MAX_ENTRIES', 1000)
+        self._max_item_size = options.pop('L1_MAX_ITEM_SIZE', 256 * 1024)
+        self._l2_params = {**params, 'OPTIONS': options}
+        self._location = os.path.abspath(location)
+
+    # Both tiers are opened on first use, so merely instantiating the backend
+    # (as the system checks do) doesn't create the cache directory
+    @cached_property
+    def _l2(self):
+        return SharedFileCache(self._location, self._l2_params)
+
+    @cached_property
+    def _l1(self):
+        with _tiers_lock:
+            if self._location not in _tiers:
+                _tiers[self._location] = _ProcessTier(self._location, self._max_entries, self._max_item_size)
+            return _tiers[self._location]
+
+    def _slot(self, key):
+        # crc32 rather than hash(): the slot must be the same in every process
+        return zlib.crc32(key.encode()) % STAMP_SLOTS
+
+    def get(self, key, default=None, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        # Read the stamp before L2 so a concurrent write invalidates what we cache
+        stamp = self._l1.stamp(self._slot(full_key))
+        pickled = self._l1.get(full_key, stamp)
+        if pickled is not None:
+            record_cache_lookup(hit=True)
+            return pickle.loads(pickled)
+
+        entry = self._l2.get_pickled(key, version=version)
+        record_cache_lookup(hit=entry is not None)
+        if entry is None:
+            self._l1.count('l2_misses')
+            return default
+        self._l1.count('l2_hits')
+        pickled, expiry = entry
+        self._l1.put(full_key, pickled, expiry, stamp)
+        return pickle.loads(pickled)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l2.set(key, value, timeout=timeout, version=version)
+        self._invalidate(key, version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self._l2.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._invalidate(key, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        touched = self._l2.touch(key, timeout=timeout, version=version)
+        self._invalidate(key, version)
+        return touched
+
+    def delete(self, key, version=None):
+        deleted = self._l2.delete(key, version=version)
+        self._invalidate(key, version)
+        return deleted
+
+    def has_key(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        if self._l1.get(full_key, self._l1.stamp(self._slot(full_key))) is not None:
+            return True
+        return self._l2.has_key(key, version=version)
+
+    def clear(self):
+        self._l2.clear()
+        self._l1.bump()
+        self._l1.discard()
+
+    def stats(self):
+        """Hit, miss and eviction counts of this process, per tier"""
+        with self._l1.lock:
+            counts = dict(self._l1.stats)
+            entries = len(self._l1.entries)
+        return {
+            'pid': os.getpid(),
+            'l1': {
+                'hits': counts.get('l1_hits', 0),
+                'misses': counts.get('l1_misses', 0),
+                'stale': counts.get('l1_stale', 0),
+                'evictions': counts.get('l1_evictions', 0),
+                'entries': entries,
+                'max_entries': self._l1.max_entries,
+            },
+            'l2': {
+                'hits': counts.get('l2_hits', 0),
+                'misses': counts.get('l2_misses', 0),
+                'entries': len(self._l2._list_cache_files()),
+            },
+        }
+
+    def _invalidate(self, key, version):
+        full_key = self.make_and_validate_key(key, version=version)
+        self._l1.bump(self._slot(full_key))
+        self._l1.discard(full_key)
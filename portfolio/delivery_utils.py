@@ -0,0 +1,222 @@
+import os
+import re
+import time
+import uuid
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.http import content_disposition_header, http_date
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def send_file(request, path, filename=None, content_type=None, as_attachment=True):
+    """Deliver a file on disk without pulling it through worker memory.
+
+    With ``SENDFILE_BACKEND = 'nginx'`` an ``X-Accel-Redirect`` to
+    ``SENDFILE_URL`` is returned, with ``'xsendfile'`` an ``X-Sendfile``
+    header; the front proxy then streams the file itself. Otherwise the
+    file is served by Django as a ``FileResponse`` (which lets the WSGI
+    server use ``sendfile``), or an async stream under ASGI, with
+    single-range ``Range`` support.
+    """
+    path = os.path.abspath(path)
+    filename = filename or os.path.basename(path)
+    content_type = content_type or 'application/octet-stream'
+    backend = getattr(settings, 'SENDFILE_BACKEND', '')
+
+    if backend == 'nginx':
+        internal_url = _get_internal_url(path)
+        if internal_url:
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = internal_url
+            return _finish_headers(response, filename, as_attachment)
+    elif backend == 'xsendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+        return _finish_headers(response, filename, as_attachment)
+
+    return _serve_from_django(request, path, filename, content_type, as_attachment)
+
+
+def _get_internal_url(path):
+    """Map a path under ``SENDFILE_ROOT`` to the internal nginx location"""
+    root = os.path.abspath(str(settings.SENDFILE_ROOT))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    relative = os.path.relpath(path, root).replace(os.sep, '/')
+    return settings.SENDFILE_URL.rstrip('/') + '/' + quote(relative)
+
+
+def _finish_headers(response, filename, as_attachment):
+    response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+    return response
+
+
+def _serve_from_django(request, path, filename, content_type, as_attachment):
+    stat = os.stat(path)
+    size = stat.st_size
+    etag = f'"{int(stat.st_mtime)}-{size}"'
+
+    byte_range = None
+    range_header = request.META.get('HTTP_RANGE')
+    if range_header and request.META.get('HTTP_IF_RANGE', etag) == etag:
+        byte_range = _parse_range(range_header, size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    # Under ASGI a sync iterator would be read into memory whole before the
+    # first byte is sent, so stream the file through an async iterator there
+    is_async = isinstance(request, ASGIRequest)
+    if byte_range or is_async:
+        start, end = byte_range or (0, size - 1)
+        length = end - start + 1
+        chunks = _aiter_file_range(path, start, length) if is_async else _iter_file_range(path, start, length)
+        response = StreamingHttpResponse(chunks, status=206 if byte_range else 200, content_type=content_type)
+        if byte_range:
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+        _finish_headers(response, filename, as_attachment)
+    else:
+        response = FileResponse(
+            open(path, 'rb'),
+            as_attachment=as_attachment,
+            filename=filename,
+            content_type=content_type,
+        )
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    return response
+
+
+def _parse_range(header, size):
+    """Parse a single ``bytes=`` range.
+
+    Returns ``(start, end)``, ``None`` if the header should be ignored (e.g.
+    multiple ranges, which we answer with the full file) or ``False`` if
+    the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+def _iter_file_range(path, start, length):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(STREAM_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+async def _aiter_file_range(path, start, length):
+    """``_iter_file_range`` with each read done in a worker thread"""
+    chunks = _iter_file_range(path, start, length)
+    read = sync_to_async(next, thread_sensitive=False)
+    try:
+        while True:
+            chunk = await read(chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+    finally:
+        chunks.close()
+
+
+class ExportCache:
+    """On-disk cache of generated export artifacts.
+
+    Artifacts live at ``<EXPORT_CACHE_ROOT>/<kind>/<portfolio id>/<key>.<ext>``
+    where ``key`` is a content hash, so an unchanged portfolio is never
+    rendered twice and the file can be handed to the front proxy as is.
+    """
+
+    def __init__(self, root=None):
+        self._root = root
+
+    @property
+    def root(self):
+        # Read the setting on use so the global instance follows overrides
+        return str(self._root or settings.EXPORT_CACHE_ROOT)
+
+    def get_path(self, kind, portfolio, key, ext):
+        return os.path.join(self.root, kind, str(portfolio.pk), f'{key}.{ext}')
+
+    def get_or_create(self, kind, portfolio, key, ext, build):
+        """Return the cached artifact path, calling ``build(path)`` on a miss"""
+        path = self.get_path(kind, portfolio, key, ext)
+        if os.path.exists(path):
+            return path
+
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            build(tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self._prune(directory, keep=os.path.basename(path))
+        return path
+
+    def _prune(self, directory, keep):
+        """Remove versions superseded more than ``EXPORT_CACHE_PRUNE_GRACE`` seconds ago.
+
+        A request may have been handed an older version just before the
+        rebuild and not have opened it yet (the front proxy opens
+        ``X-Accel-Redirect`` files later still), so a version is only
+        removed once a newer one has existed for the whole grace period.
+        """
+        cutoff = time.time() - settings.EXPORT_CACHE_PRUNE_GRACE
+        versions = []
+        for name in os.listdir(directory):
+            if name.endswith('.tmp'):
+                continue
+            try:
+                versions.append((os.stat(os.path.join(directory, name)).st_mtime, name))
+            except FileNotFoundError:
+                pass
+
+        superseded = False
+        for mtime, name in sorted(versions, reverse=True):
+            if superseded and name != keep:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+            elif mtime <= cutoff:
+                # Everything older than this version is past its grace period
+                superseded = True
+
+
+# Global instance
+export_cache = ExportCache()
@@ -0,0 +1,57 @@
+import hashlib
+import json
+
+from django.template.loader import get_template
+
+# Child collections that make up a portfolio's content
+PORTFOLIO_RELATIONS = ('education', 'experience', 'skills', 'projects', 'certifications')
+
+# Everything prefetched to render a portfolio; projects display their own
+# tech_stack, so the technology tags aren't needed
+PORTFOLIO_PREFETCH = PORTFOLIO_RELATIONS
+
+
+def content_fingerprint(portfolio, user_profile, template_names=None, template_hashes=None, extra=None):
+    """Return a hash of everything that ends up in the rendered output.
+
+    ``template_names`` defaults to the portfolio's theme template;
+    ``template_hashes`` is an optional cache shared between calls and
+    ``extra`` is mixed in for output-specific settings.
+    """
+    if template_names is None:
+        template_names = [f'portfolio/themes/{portfolio.theme}.html']
+    if template_hashes is None:
+        template_hashes = {}
+    for template_name in template_names:
+        if template_name not in template_hashes:
+            template_hashes[template_name] = _template_hash(template_name)
+
+    user = portfolio.user
+    payload = {
+        'templates': [template_hashes[name] for name in template_names],
+        'extra': extra,
+        'portfolio': _row(portfolio, exclude=('created_at', 'updated_at')),
+        'user': [user.username, user.first_name, user.last_name, user.email],
+        'profile': _row(user_profile, exclude=('id', 'created_at', 'updated_at')),
+        'education': [_row(item) for item in portfolio.education.all()],
+        'experience': [_row(item) for item in portfolio.experience.all()],
+        'skills': [_row(item) for item in portfolio.skills.all()],
+        'projects': [_row(item) for item in portfolio.projects.all()],
+        'certifications': [_row(item) for item in portfolio.certifications.all()],
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _row(instance, exclude=()):
+    return [
+        getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.name not in exclude
+    ]
+
+
+def _template_hash(template_name):
+    template = get_template(template_name)
+    source = template.template.source
+    return hashlib.sha256(source.encode('utf-8')).hexdigest()
@@ -1,14 +1,19 @@
 import os
 import uuid
-from PIL import Image, ImageOps
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from django.conf import settings
 import io
 
+from .timing_utils import timed_phase
+
 
 class ImageHandler:
-    """Enhanced image handling utility for DevPort"""
+    """Enhanced image handling utility for DevPort
+    
+    Pillow is imported inside the methods so that only requests which
+    actually handle an upload pay for loading it.
+    """
     
     def __init__(self):
         self.max_size = (800, 800)  # Maximum dimensions for uploaded images
@@ -16,8 +21,10 @@ class ImageHandler:
         self.quality = 85  # JPEG quality
         self.allowed_formats = ['JPEG', 'PNG', 'WEBP']
     
+    @timed_phase('image_profile')
     def process_profile_picture(self, image_file, user_id):
         """Process and optimize profile picture"""
+        from PIL import Image, ImageOps
         try:
             # Open and process the image
             img = Image.open(image_file)
@@ -54,8 +61,10 @@ class ImageHandler:
             print(f"Error processing profile picture: {e}")
             return None
     
+    @timed_phase('image_project')
     def process_project_image(self, image_file, project_name):
         """Process and optimize project image"""
+        from PIL import Image, ImageOps
         try:
             # Open and process the image
             img = Image.open(image_file)
@@ -105,8 +114,10 @@ class ImageHandler:
         
         return img.crop((left, top, right, bottom))
     
+    @timed_phase('image_thumbnail')
     def create_thumbnail(self, image_path):
         """Create thumbnail from existing image"""
+        from PIL import Image
         try:
             with Image.open(image_path) as img:
                 # Convert to RGB if necessary
@@ -135,8 +146,10 @@ class ImageHandler:
             print(f"Error creating thumbnail: {e}")
             return None
     
+    @timed_phase('image_validate')
     def validate_image(self, image_file):
         """Validate uploaded image"""
+        from PIL import Image
         try:
             # Check file size (max 10MB)
             if image_file.size > 10 * 1024 * 1024:
@@ -160,6 +173,7 @@ class ImageHandler:
     
     def get_image_info(self, image_file):
         """Get image information"""
+        from PIL import Image
         try:
             img = Image.open(image_file)
             return {
@@ -0,0 +1,206 @@
+import asyncio
+import datetime
+import random
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.core.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.core.wsgi import WSGIHandler
+from django.db import connection, connections
+from django.test.utils import override_settings
+
+from portfolio.models import Experience, Portfolio, Project, Skill, UserProfile
+
+HOST = 'localhost'
+# Per-process cache, so the run neither reads nor leaves behind shared entries
+BENCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway database and compare public page and JSON API '
+        'throughput under WSGI (a fixed thread pool) and ASGI (one event loop) '
+        'with slow clients'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='Run time per server (default: 5)')
+        parser.add_argument('--threads', type=int, default=8, help='WSGI worker threads (default: 8)')
+        parser.add_argument('--connections', type=int, default=64, help='Concurrent ASGI connections (default: 64)')
+        parser.add_argument(
+            '--client-delay', type=float, default=50,
+            help='Milliseconds each client takes to receive its response (default: 50)',
+        )
+        parser.add_argument('--portfolios', type=int, default=200, help='Public portfolios to seed (default: 200)')
+
+    def handle(self, *args, **options):
+        # Never touch real data: build a separate database the way the test runner does
+        creation = connection.creation
+        old_name = creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(CACHES=BENCH_CACHES):
+                slugs = self._seed(options['portfolios'])
+                rng = random.Random(0)
+                paths = [
+                    rng.choice([f'/u/{slug}/', f'/api/v1/portfolios/{slug}/'])
+                    for slug in (rng.choice(slugs) for _ in range(1000))
+                ]
+                results = {
+                    'wsgi': self._run_wsgi(paths, options),
+                    'asgi': self._run_asgi(paths, options),
+                }
+        finally:
+            connections.close_all()
+            creation.destroy_test_db(old_name, verbosity=0)
+
+        for name, (latencies, failed) in results.items():
+            self._report(name, latencies, failed, options['seconds'])
+        wsgi, asgi = (len(results[name][0]) for name in ('wsgi', 'asgi'))
+        self.stdout.write(f"ASGI vs WSGI: {asgi / wsgi if wsgi else float('inf'):.1f}x throughput")
+
+    def _seed(self, portfolio_count):
+        today = datetime.date.today()
+        users = User.objects.bulk_create([User(username=f'bench{i}') for i in range(portfolio_count)])
+        UserProfile.objects.bulk_create([UserProfile(user=user, bio='Bench user') for user in users])
+        portfolios = Portfolio.objects.bulk_create([
+            Portfolio(user=user, title=f'Portfolio {i}', slug=f'bench-{i}', is_public=True)
+            for i, user in enumerate(users)
+        ])
+        Skill.objects.bulk_create([
+            Skill(portfolio=portfolio, name=f'Skill {i}', order=i)
+            for portfolio in portfolios for i in range(8)
+        ])
+        Experience.objects.bulk_create([
+            Experience(
+                portfolio=portfolio, company='Company', position=f'Role {i}', description='Bench role',
+                start_date=today - datetime.timedelta(days=365 * i), order=i,
+            )
+            for portfolio in portfolios for i in range(4)
+        ])
+        Project.objects.bulk_create([
+            Project(
+                portfolio=portfolio, name=f'Project {i}', description='Bench project',
+                tech_stack='Python, Django', order=i,
+            )
+            for portfolio in portfolios for i in range(4)
+        ])
+        return [portfolio.slug for portfolio in portfolios]
+
+    def _run_wsgi(self, paths, options):
+        """Serve from a fixed thread pool; a slow client holds its thread"""
+        handler = WSGIHandler()
+        delay = options['client_delay'] / 1000
+        deadline = time.perf_counter() + options['seconds']
+        latencies, failed, lock = [], [], threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            served, errors = [], 0
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    statuses = []
+                    response = handler(
+                        self._environ(rng.choice(paths)),
+                        lambda status, headers, exc_info=None: statuses.append(status),
+                    )
+                    b''.join(response)
+                    response.close()
+                    # Writing to the slow client blocks the worker thread
+                    time.sleep(delay)
+                    if statuses[0].startswith('200'):
+                        served.append((time.perf_counter() - started) * 1000)
+                    else:
+                        errors += 1
+            finally:
+                connections.close_all()
+            with lock:
+                latencies.extend(served)
+                failed.append(errors)
+
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            list(pool.map(worker, range(options['threads'])))
+        return latencies, sum(failed)
+
+    def _run_asgi(self, paths, options):
+        """Serve from one event loop; a slow client only suspends its task"""
+        handler = ASGIHandler()
+        delay = options['client_delay'] / 1000
+
+        async def client(rng, deadline, latencies):
+            errors = 0
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                if await self._asgi_request(handler, rng.choice(paths), delay) == 200:
+                    latencies.append((time.perf_counter() - started) * 1000)
+                else:
+                    errors += 1
+            return errors
+
+        async def main():
+            deadline = time.perf_counter() + options['seconds']
+            latencies = []
+            failed = await asyncio.gather(*(
+                client(random.Random(seed), deadline, latencies) for seed in range(options['connections'])
+            ))
+            return latencies, sum(failed)
+
+        try:
+            return asyncio.run(main())
+        finally:
+            connections.close_all()
+
+    async def _asgi_request(self, handler, path, delay):
+        """Serve one request, return its status code"""
+        disconnected = asyncio.Event()
+        requested = False
+        status = None
+
+        async def receive():
+            nonlocal requested
+            if not requested:
+                requested = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            elif message['type'] == 'http.response.body' and not message.get('more_body', False):
+                # Writing to the slow client only suspends this connection
+                await asyncio.sleep(delay)
+                disconnected.set()
+
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', HOST.encode())],
+            'client': ('127.0.0.1', 0), 'server': (HOST, 80),
+        }
+        await handler(scope, receive, send)
+        return status
+
+    def _environ(self, path):
+        return {
+            'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'SCRIPT_NAME': '', 'QUERY_STRING': '',
+            'SERVER_NAME': HOST, 'SERVER_PORT': '80', 'HTTP_HOST': HOST, 'REMOTE_ADDR': '127.0.0.1',
+            'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.input': BytesIO(), 'wsgi.errors': BytesIO(),
+            'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': True,
+            'wsgi.multiprocess': False, 'wsgi.run_once': False,
+        }
+
+    def _report(self, name, latencies, failed, seconds):
+        p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else 0
+        self.stdout.write(
+            f"  {name:<6}{len(latencies) / seconds:>10.0f} req/s"
+            f"  p50 {statistics.median(latencies) if latencies else 0:>8.2f} ms"
+            f"  p99 {p99:>8.2f} ms"
+            f"  non-200 {failed}"
+        )
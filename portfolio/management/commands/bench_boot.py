@@ -0,0 +1,83 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Runs in a fresh interpreter: boot the WSGI app, load the URLconf (which
+# imports every view module, as the first request would) and report
+# wall time plus peak RSS.
+BOOT_SCRIPT = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'devport_project.settings')
+import devport_project.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+for module in sys.argv[1:]:
+    __import__(module)
+elapsed = time.perf_counter() - started
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({
+    'boot_ms': elapsed * 1000,
+    'rss_mb': rss_kb / 1024,
+    'modules': len(sys.modules),
+    'weasyprint_loaded': 'weasyprint' in sys.modules,
+    'pil_loaded': 'PIL.Image' in sys.modules,
+}))
+"""
+
+# Modules the web workers used to import at startup
+EAGER_MODULES = ['weasyprint', 'weasyprint.text.fonts', 'PIL.Image', 'PIL.ImageOps']
+
+
+class Command(BaseCommand):
+    help = 'Benchmark WSGI worker boot time and baseline memory, lazy vs eager export imports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Fresh interpreters to start per mode (default: 5)',
+        )
+
+    def handle(self, *args, **options):
+        runs = max(1, options['runs'])
+        modes = [
+            ('lazy (current)', []),
+            ('eager (old top-level imports)', EAGER_MODULES),
+        ]
+
+        for label, modules in modes:
+            samples = []
+            for _ in range(runs):
+                result = self._run_once(modules)
+                if result is None:
+                    break
+                samples.append(result)
+
+            if not samples:
+                self.stdout.write(self.style.WARNING(f"{label}: failed to boot (see error above)"))
+                continue
+
+            self.stdout.write(
+                f"{label}: boot {statistics.median(s['boot_ms'] for s in samples):.0f} ms, "
+                f"RSS {statistics.median(s['rss_mb'] for s in samples):.1f} MB, "
+                f"{samples[0]['modules']} modules, "
+                f"weasyprint loaded: {samples[0]['weasyprint_loaded']}, "
+                f"PIL loaded: {samples[0]['pil_loaded']}"
+            )
+
+    def _run_once(self, modules):
+        completed = subprocess.run(
+            [sys.executable, '-c', BOOT_SCRIPT, *modules],
+            cwd=str(settings.BASE_DIR),
+            capture_output=True,
+            text=True,
+        )
+        if completed.returncode != 0:
+            error = completed.stderr.strip().splitlines()
+            self.stderr.write(error[-1] if error else 'unknown error')
+            return None
+        return json.loads(completed.stdout.strip().splitlines()[-1])
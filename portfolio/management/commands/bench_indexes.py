@@ -0,0 +1,159 @@
+import datetime
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from portfolio.models import (
+    Certification, Education, Experience, Portfolio, Project, Skill, UserProfile,
+)
+from portfolio.pagination_utils import keyset_page
+
+INDEXED_MODELS = [Portfolio, Education, Experience, Skill, Project, Certification]
+SECTIONS = ['education', 'experience', 'skills', 'projects', 'certifications']
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway database and compare query plans and timings of the '
+        'public, edit and dashboard reads with and without the composite indexes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200, help='Users to seed (default: 200)')
+        parser.add_argument('--portfolios', type=int, default=10, help='Portfolios per user (default: 10)')
+        parser.add_argument('--items', type=int, default=8, help='Items per section (default: 8)')
+        parser.add_argument('--samples', type=int, default=200, help='Lookups timed per read path (default: 200)')
+
+    def handle(self, *args, **options):
+        # Never touch real data: build a separate database the way the test runner does
+        creation = connection.creation
+        old_name = creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._seed(options['users'], options['portfolios'], options['items'])
+            rng = random.Random(0)
+            portfolios = list(Portfolio.objects.values_list('slug', 'user_id'))
+            samples = [rng.choice(portfolios) for _ in range(options['samples'])]
+
+            with_indexes = self._measure(samples), self._plans(*samples[0])
+            self._drop_indexes()
+            without_indexes = self._measure(samples), self._plans(*samples[0])
+
+            self._report('Before (foreign key indexes only)', *without_indexes)
+            self._report('After (composite indexes)', *with_indexes)
+            self.stdout.write('Median speedup')
+            for name, after in with_indexes[0].items():
+                before = without_indexes[0][name]
+                self.stdout.write(f"  {name:<10}{before / after if after else 0:>8.1f}x")
+        finally:
+            creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, user_count, portfolios_per_user, items):
+        self.stdout.write(
+            f"Seeding {user_count} users x {portfolios_per_user} portfolios x "
+            f"{items} items per section..."
+        )
+        started = time.perf_counter()
+        today = datetime.date.today()
+
+        users = User.objects.bulk_create([User(username=f'bench{i}') for i in range(user_count)])
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+
+        portfolios = Portfolio.objects.bulk_create([
+            Portfolio(user=user, title=f'Portfolio {u}-{p}', slug=f'bench-{u}-{p}', is_public=p % 2 == 0)
+            for u, user in enumerate(users)
+            for p in range(portfolios_per_user)
+        ], batch_size=500)
+
+        rows = {model: [] for model in INDEXED_MODELS[1:]}
+        for portfolio in portfolios:
+            for i in range(items):
+                date = today - datetime.timedelta(days=30 * i)
+                rows[Education].append(Education(
+                    portfolio=portfolio, institution='University', degree=f'Degree {i}',
+                    start_date=date, order=i,
+                ))
+                rows[Experience].append(Experience(
+                    portfolio=portfolio, company='Company', position=f'Role {i}',
+                    start_date=date, description='Work', order=i,
+                ))
+                rows[Skill].append(Skill(
+                    portfolio=portfolio, name=f'Skill {i}',
+                    category=Skill.SKILL_CATEGORIES[i % len(Skill.SKILL_CATEGORIES)][0], order=i,
+                ))
+                rows[Project].append(Project(
+                    portfolio=portfolio, name=f'Project {i}', description='Project',
+                    tech_stack='Python, Django', order=i,
+                ))
+                rows[Certification].append(Certification(
+                    portfolio=portfolio, name=f'Cert {i}', issuing_organization='Org',
+                    issue_date=date, order=i,
+                ))
+        for model, objs in rows.items():
+            model.objects.bulk_create(objs, batch_size=1000)
+
+        with connection.cursor() as cursor:
+            if connection.vendor in ('sqlite', 'postgresql'):
+                cursor.execute('ANALYZE')
+        self.stdout.write(f"Seeded in {time.perf_counter() - started:.1f} s\n")
+
+    def _drop_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model in INDEXED_MODELS:
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+        with connection.cursor() as cursor:
+            if connection.vendor in ('sqlite', 'postgresql'):
+                cursor.execute('ANALYZE')
+
+    def _read_paths(self, slug, user_id):
+        """The queries each view issues, keyed by view"""
+        def children(portfolio):
+            return [list(getattr(portfolio, section).all()) for section in SECTIONS]
+
+        def public():
+            portfolio = Portfolio.objects.filter(slug=slug, is_public=True).first()
+            if portfolio:
+                children(portfolio)
+
+        def edit():
+            children(Portfolio.objects.get(slug=slug, user_id=user_id))
+
+        def dashboard():
+            keyset_page(Portfolio.objects.filter(user_id=user_id).with_item_counts(), page_size=20)
+
+        return {'public': public, 'edit': edit, 'dashboard': dashboard}
+
+    def _plans(self, slug, user_id):
+        portfolio = Portfolio.objects.get(slug=slug)
+        plans = {
+            'public': Portfolio.objects.filter(slug=slug, is_public=True),
+            'dashboard': Portfolio.objects.filter(user_id=user_id).with_item_counts()
+            .order_by('-updated_at', '-pk')[:21],
+        }
+        for section in SECTIONS:
+            plans[section] = getattr(portfolio, section).all()
+        return {name: queryset.explain() for name, queryset in plans.items()}
+
+    def _measure(self, samples):
+        """Return the median milliseconds per view"""
+        timings = {}
+        for slug, user_id in samples:
+            for name, read in self._read_paths(slug, user_id).items():
+                started = time.perf_counter()
+                read()
+                timings.setdefault(name, []).append((time.perf_counter() - started) * 1000)
+        return {name: statistics.median(values) for name, values in timings.items()}
+
+    def _report(self, title, timings, plans):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, plan in plans.items():
+            self.stdout.write(f"  plan [{name}]")
+            for line in plan.splitlines():
+                self.stdout.write(f"    {line}")
+        for name, ms in timings.items():
+            self.stdout.write(f"  {name:<10}{ms:>8.3f} ms median")
+        self.stdout.write('')
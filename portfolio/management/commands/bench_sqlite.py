@@ -0,0 +1,141 @@
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+
+SCHEMA = [
+    'CREATE TABLE bench_portfolio (id INTEGER PRIMARY KEY, version INTEGER NOT NULL DEFAULT 0)',
+    'CREATE TABLE bench_item (id INTEGER PRIMARY KEY, portfolio_id INTEGER NOT NULL, '
+    'position INTEGER NOT NULL, body TEXT NOT NULL)',
+    'CREATE INDEX bench_item_portfolio ON bench_item (portfolio_id, position)',
+]
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare read/write throughput of concurrent editors on SQLite with the '
+        'stock settings and with SQLITE_PERFORMANCE_MODE, using throwaway databases'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=5, help='Run time per profile (default: 5)')
+        parser.add_argument('--readers', type=int, default=8, help='Reader threads (default: 8)')
+        parser.add_argument('--writers', type=int, default=4, help='Writer threads (default: 4)')
+        parser.add_argument('--portfolios', type=int, default=1000, help='Portfolios to seed (default: 1000)')
+
+    def handle(self, *args, **options):
+        profiles = {
+            'stock': {'ENGINE': 'django.db.backends.sqlite3', 'OPTIONS': {}},
+            'performance': {'ENGINE': 'portfolio.sqlite_backend', 'OPTIONS': settings.SQLITE_PERFORMANCE_OPTIONS},
+        }
+        workdir = Path(tempfile.mkdtemp(prefix='bench_sqlite_'))
+        try:
+            results = {}
+            for name, profile in profiles.items():
+                alias = f'bench_{name}'
+                connections.settings[alias] = {
+                    **connections['default'].settings_dict, **profile, 'NAME': str(workdir / f'{name}.sqlite3'),
+                }
+                self._seed(alias, options['portfolios'])
+                results[name] = self._run(alias, options)
+                self._report(name, results[name], options['seconds'])
+        finally:
+            for name in profiles:
+                connections[f'bench_{name}'].close()
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        stock, tuned = results['stock'], results['performance']
+        self.stdout.write(self.style.MIGRATE_HEADING('Performance mode vs stock'))
+        for kind in ('reads', 'writes'):
+            ratio = len(tuned[kind]) / len(stock[kind]) if stock[kind] else float('inf')
+            self.stdout.write(f"  {kind:<8}{ratio:>8.1f}x throughput")
+
+    def _seed(self, alias, portfolio_count):
+        with connections[alias].cursor() as cursor:
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany(
+                'INSERT INTO bench_portfolio (id) VALUES (%s)', [(pk,) for pk in range(portfolio_count)],
+            )
+            cursor.executemany(
+                'INSERT INTO bench_item (portfolio_id, position, body) VALUES (%s, %s, %s)',
+                [(pk, position, 'x' * 200) for pk in range(portfolio_count) for position in range(10)],
+            )
+
+    def _run(self, alias, options):
+        """Run readers and writers concurrently, return their latencies and failures"""
+        portfolio_count = options['portfolios']
+        deadline = time.perf_counter() + options['seconds']
+        results = {'reads': [], 'writes': [], 'failed_reads': 0, 'failed_writes': 0}
+        lock = threading.Lock()
+
+        def read(rng):
+            # The public page: one portfolio's items in display order
+            with connections[alias].cursor() as cursor:
+                cursor.execute(
+                    'SELECT id, position, body FROM bench_item WHERE portfolio_id = %s ORDER BY position',
+                    [rng.randrange(portfolio_count)],
+                )
+                cursor.fetchall()
+
+        def write(rng):
+            # A drag-and-drop reorder: read the items, rewrite positions, bump the version
+            portfolio_id = rng.randrange(portfolio_count)
+            with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                cursor.execute('SELECT id FROM bench_item WHERE portfolio_id = %s', [portfolio_id])
+                ids = [row[0] for row in cursor.fetchall()]
+                rng.shuffle(ids)
+                cursor.executemany(
+                    'UPDATE bench_item SET position = %s WHERE id = %s', list(enumerate(ids)),
+                )
+                cursor.execute('UPDATE bench_portfolio SET version = version + 1 WHERE id = %s', [portfolio_id])
+
+        def worker(kind, operation, seed):
+            rng = random.Random(seed)
+            latencies, failures = [], 0
+            try:
+                while time.perf_counter() < deadline:
+                    started = time.perf_counter()
+                    try:
+                        operation(rng)
+                    except OperationalError:
+                        # "database is locked"
+                        failures += 1
+                        continue
+                    latencies.append((time.perf_counter() - started) * 1000)
+            finally:
+                connections[alias].close()
+            with lock:
+                results[kind].extend(latencies)
+                results[f'failed_{kind}'] += failures
+
+        threads = [
+            threading.Thread(target=worker, args=('reads', read, i)) for i in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=('writes', write, 1000 + i)) for i in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _report(self, name, results, seconds):
+        self.stdout.write(self.style.MIGRATE_HEADING(f'{name} profile'))
+        for kind in ('reads', 'writes'):
+            latencies = results[kind]
+            p99 = statistics.quantiles(latencies, n=100)[98] if len(latencies) > 1 else 0
+            self.stdout.write(
+                f"  {kind:<8}{len(latencies) / seconds:>10.0f}/s"
+                f"  p50 {statistics.median(latencies) if latencies else 0:>8.2f} ms"
+                f"  p99 {p99:>8.2f} ms"
+                f"  failed {results[f'failed_{kind}']}"
+            )
+        self.stdout.write('')
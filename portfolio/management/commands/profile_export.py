@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from portfolio.models import Portfolio, UserProfile
+from portfolio.profiling_utils import profile_export
+
+
+class Command(BaseCommand):
+    help = 'Profile a PDF or ZIP export of a portfolio with cProfile and tracemalloc'
+
+    def add_arguments(self, parser):
+        parser.add_argument('slug', help='Slug of the portfolio to export')
+        parser.add_argument(
+            '--format', '-f', choices=['pdf', 'zip'], default='pdf',
+            help='Export to profile (default: pdf)',
+        )
+        parser.add_argument(
+            '--output', '-o',
+            help='Report directory (defaults to settings.EXPORT_PROFILE_ROOT)',
+        )
+        parser.add_argument(
+            '--host', default='localhost',
+            help='Host used to build absolute URLs; must be in ALLOWED_HOSTS (default: localhost)',
+        )
+        parser.add_argument(
+            '--top', type=int, default=30,
+            help='Number of functions and allocation sites to list (default: 30)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            portfolio = Portfolio.objects.select_related('user').get(slug=options['slug'])
+        except Portfolio.DoesNotExist:
+            raise CommandError(f"Portfolio '{options['slug']}' does not exist")
+
+        user_profile, created = UserProfile.objects.get_or_create(user=portfolio.user)
+        request = RequestFactory(HTTP_HOST=options['host']).get('/')
+        request.user = portfolio.user
+
+        report, report_path = profile_export(
+            options['format'], portfolio, user_profile, request,
+            output_dir=options['output'], top=options['top'],
+        )
+
+        self.stdout.write(report)
+        self.stdout.write(self.style.SUCCESS(f"Report saved to {report_path}"))
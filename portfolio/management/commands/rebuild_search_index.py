@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from portfolio.search_utils import search_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of public portfolios from scratch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=500,
+            help='Portfolios loaded per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            count = search_index.rebuild(chunk_size=max(1, options['chunk_size']))
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {count} public portfolios in {time.perf_counter() - started:.1f} s"
+        ))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from portfolio.stats_utils import reconcile_aggregates, reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute denormalized platform counters and aggregates (run periodically, e.g. from cron)'
+
+    def handle(self, *args, **options):
+        for name, value in reconcile_counters().items():
+            self.stdout.write(f"{name} = {value}")
+        for kind, rows in reconcile_aggregates().items():
+            self.stdout.write(f"{kind} aggregates: {rows} rows")
+        self.stdout.write(self.style.SUCCESS('Counters and aggregates reconciled'))
@@ -0,0 +1,161 @@
+import logging
+import mimetypes
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 256 * 1024
+
+# Returned by a read that would go over the memory budget
+_DEFERRED = object()
+
+
+class PrefetchedMedia(dict):
+    """``{name: bytes}`` of prefetched media.
+
+    ``deferred`` holds the names that were left in storage to stay within
+    the memory budget.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.deferred = set()
+
+
+class _ByteBudget:
+    """Bytes the reads of one fetch may still hold in memory"""
+
+    def __init__(self, limit):
+        self.lock = threading.Lock()
+        self.remaining = limit
+
+    def take(self, size):
+        with self.lock:
+            if size > self.remaining:
+                return False
+            self.remaining -= size
+            return True
+
+    def give(self, size):
+        with self.lock:
+            self.remaining += size
+
+
+class MediaPrefetcher:
+    """Read a portfolio's media through the storage API, concurrently.
+
+    Exports only go through ``storage.open()`` so they work with any storage
+    backend, and all images are fetched up front on a small thread pool so a
+    high-latency backend costs one round trip per export instead of one per
+    image. At most ``max_bytes`` are held in memory per export; files that
+    don't fit are left in storage and streamed when they are written out.
+    """
+
+    def __init__(self, storage=None, max_workers=None, max_bytes=None):
+        self.storage = storage or default_storage
+        self.max_workers = max_workers or getattr(settings, 'EXPORT_MEDIA_PREFETCH_WORKERS', 8)
+        self.max_bytes = max_bytes or getattr(settings, 'EXPORT_MEDIA_PREFETCH_MAX_BYTES', 32 * 1024 * 1024)
+
+    def get_media_names(self, user_profile, portfolio):
+        """Return the storage names of every image a portfolio renders"""
+        names = []
+        if user_profile is not None and user_profile.profile_picture:
+            names.append(user_profile.profile_picture.name)
+        for project in portfolio.projects.all():
+            if project.image:
+                names.append(project.image.name)
+        # Keep order but drop duplicates
+        return list(dict.fromkeys(names))
+
+    def fetch(self, names):
+        """Return ``PrefetchedMedia`` with the bytes of every name that could be read"""
+        names = list(dict.fromkeys(names))
+        media = PrefetchedMedia()
+        if not names:
+            return media
+
+        budget = _ByteBudget(self.max_bytes)
+        workers = min(self.max_workers, len(names))
+        if workers <= 1:
+            results = [self._read(name, budget) for name in names]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._read, names, [budget] * len(names)))
+
+        for name, data in zip(names, results):
+            if data is _DEFERRED:
+                media.deferred.add(name)
+            elif data is not None:
+                media[name] = data
+        return media
+
+    def fetch_portfolio_media(self, user_profile, portfolio):
+        """Prefetch all images of a portfolio"""
+        return self.fetch(self.get_media_names(user_profile, portfolio))
+
+    def save(self, media, name, path):
+        """Write a fetched file to ``path``, streaming it from storage if it was deferred"""
+        if name in media:
+            with open(path, 'wb') as f:
+                f.write(media[name])
+        elif name in media.deferred:
+            with self.storage.open(name, 'rb') as src, open(path, 'wb') as f:
+                shutil.copyfileobj(src, f, READ_CHUNK_SIZE)
+        else:
+            return False
+        return True
+
+    def _read(self, name, budget):
+        chunks, taken = [], 0
+        try:
+            with self.storage.open(name, 'rb') as f:
+                while True:
+                    chunk = f.read(READ_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    if not budget.take(len(chunk)):
+                        budget.give(taken)
+                        return _DEFERRED
+                    taken += len(chunk)
+                    chunks.append(chunk)
+        except Exception as e:
+            # Missing files should not abort the whole export
+            budget.give(taken)
+            logger.warning("Error reading media file %s: %s", name, e)
+            return None
+        return b''.join(chunks)
+
+
+def make_media_url_fetcher(media, fallback, storage=None):
+    """Build a WeasyPrint ``url_fetcher`` that serves prefetched media.
+
+    Any URL whose path starts with ``MEDIA_URL`` and was prefetched is
+    answered from memory, or opened from ``storage`` if it was deferred;
+    everything else goes to ``fallback``.
+    """
+    media_url = settings.MEDIA_URL
+    storage = storage or default_storage
+
+    def fetcher(url, *args, **kwargs):
+        path = unquote(urlsplit(url).path)
+        if path.startswith(media_url):
+            name = path[len(media_url):]
+            mime_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+            if name in media:
+                return {'string': media[name], 'mime_type': mime_type, 'redirected_url': url}
+            if name in getattr(media, 'deferred', ()):
+                # WeasyPrint closes the file once it has read it
+                return {'file_obj': storage.open(name, 'rb'), 'mime_type': mime_type, 'redirected_url': url}
+        return fallback(url, *args, **kwargs)
+
+    return fetcher
+
+
+# Global instance
+media_prefetcher = MediaPrefetcher()
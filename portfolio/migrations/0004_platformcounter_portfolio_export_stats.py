@@ -0,0 +1,41 @@
+# Generated by Django 4.2.29 on 2026-10-19 05:42
+
+from django.db import migrations, models
+
+
+def seed_public_portfolio_counter(apps, schema_editor):
+    Portfolio = apps.get_model('portfolio', 'Portfolio')
+    PlatformCounter = apps.get_model('portfolio', 'PlatformCounter')
+    PlatformCounter.objects.update_or_create(
+        name='public_portfolios',
+        defaults={'value': Portfolio.objects.filter(is_public=True).count()},
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_userprofile_behance_url'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlatformCounter',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='export_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='portfolio',
+            name='last_exported_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(seed_public_portfolio_counter, migrations.RunPython.noop),
+    ]
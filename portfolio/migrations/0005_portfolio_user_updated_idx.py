@@ -0,0 +1,17 @@
+# Generated by Django 4.2.29 on 2026-10-19 05:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_platformcounter_portfolio_export_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='portfolio',
+            index=models.Index(fields=['user', '-updated_at', '-id'], name='portfolio_user_updated_idx'),
+        ),
+    ]
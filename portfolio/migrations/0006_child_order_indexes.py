@@ -0,0 +1,33 @@
+# Generated by Django 4.2.29 on 2026-10-19 05:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0005_portfolio_user_updated_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(fields=['portfolio', 'order', '-issue_date'], name='cert_portfolio_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='education',
+            index=models.Index(fields=['portfolio', 'order', '-start_date'], name='education_portfolio_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='experience',
+            index=models.Index(fields=['portfolio', 'order', '-start_date'], name='experience_portfolio_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['portfolio', 'order', '-created_at'], name='project_portfolio_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='skill',
+            index=models.Index(fields=['portfolio', 'category', 'order', 'name'], name='skill_portfolio_order_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.29 on 2026-10-19 05:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0006_child_order_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfolio',
+            name='content_version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 4.2.29 on 2026-10-19 05:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+COLUMNS = 'title, skills, technologies, experience, bio'
+
+# External-content FTS5 table kept in sync with the document table by triggers
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE portfolio_search_fts USING fts5(
+        {COLUMNS}, content='portfolio_portfoliosearchdocument', content_rowid='id',
+        tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER portfolio_search_ai AFTER INSERT ON portfolio_portfoliosearchdocument BEGIN
+        INSERT INTO portfolio_search_fts(rowid, {COLUMNS})
+        VALUES (new.id, new.title, new.skills, new.technologies, new.experience, new.bio);
+    END""",
+    f"""CREATE TRIGGER portfolio_search_ad AFTER DELETE ON portfolio_portfoliosearchdocument BEGIN
+        INSERT INTO portfolio_search_fts(portfolio_search_fts, rowid, {COLUMNS})
+        VALUES ('delete', old.id, old.title, old.skills, old.technologies, old.experience, old.bio);
+    END""",
+    f"""CREATE TRIGGER portfolio_search_au AFTER UPDATE ON portfolio_portfoliosearchdocument BEGIN
+        INSERT INTO portfolio_search_fts(portfolio_search_fts, rowid, {COLUMNS})
+        VALUES ('delete', old.id, old.title, old.skills, old.technologies, old.experience, old.bio);
+        INSERT INTO portfolio_search_fts(rowid, {COLUMNS})
+        VALUES (new.id, new.title, new.skills, new.technologies, new.experience, new.bio);
+    END""",
+]
+SQLITE_BACKWARD = [
+    "DROP TRIGGER IF EXISTS portfolio_search_au",
+    "DROP TRIGGER IF EXISTS portfolio_search_ad",
+    "DROP TRIGGER IF EXISTS portfolio_search_ai",
+    "DROP TABLE IF EXISTS portfolio_search_fts",
+]
+
+# Weighted tsvector maintained by PostgreSQL itself, with a GIN index
+POSTGRES_FORWARD = [
+    """ALTER TABLE portfolio_portfoliosearchdocument ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(skills, '')), 'A')
+            || setweight(to_tsvector('english', coalesce(technologies, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(experience, '')), 'B')
+            || setweight(to_tsvector('english', coalesce(bio, '')), 'C')
+        ) STORED""",
+    "CREATE INDEX portfolio_search_vector_idx ON portfolio_portfoliosearchdocument USING GIN (search_vector)",
+]
+POSTGRES_BACKWARD = [
+    "DROP INDEX IF EXISTS portfolio_search_vector_idx",
+    "ALTER TABLE portfolio_portfoliosearchdocument DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_FORWARD, 'postgresql': POSTGRES_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {'sqlite': SQLITE_BACKWARD, 'postgresql': POSTGRES_BACKWARD})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0007_portfolio_content_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioSearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('skills', models.TextField(blank=True)),
+                ('technologies', models.TextField(blank=True)),
+                ('experience', models.TextField(blank=True)),
+                ('bio', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('portfolio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='search_document', to='portfolio.portfolio')),
+            ],
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
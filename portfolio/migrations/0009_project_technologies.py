@@ -0,0 +1,105 @@
+# Generated by Django 4.2.29 on 2026-10-19 05:57
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+# A frozen copy of portfolio.technology_utils as of this migration, so later
+# changes to the aliases don't change what it does
+TECH_ALIASES = {
+    'js': 'JavaScript',
+    'javascript': 'JavaScript',
+    'ts': 'TypeScript',
+    'typescript': 'TypeScript',
+    'node': 'Node.js',
+    'nodejs': 'Node.js',
+    'node.js': 'Node.js',
+    'react': 'React',
+    'reactjs': 'React',
+    'react.js': 'React',
+    'vue': 'Vue.js',
+    'vuejs': 'Vue.js',
+    'vue.js': 'Vue.js',
+    'golang': 'Go',
+    'postgres': 'PostgreSQL',
+    'postgresql': 'PostgreSQL',
+    'k8s': 'Kubernetes',
+    'kubernetes': 'Kubernetes',
+    'python': 'Python',
+    'django': 'Django',
+}
+MAX_NAME_LENGTH = 100
+
+
+def parse_tech_stack(tech_stack):
+    """Split a comma-separated tech stack into unique canonical ``(name, key)`` pairs"""
+    technologies = {}
+    for raw in tech_stack.split(','):
+        name = re.sub(r'\s+', ' ', raw).strip()[:MAX_NAME_LENGTH]
+        if not name:
+            continue
+        name = TECH_ALIASES.get(name.casefold(), name)
+        technologies.setdefault(name.casefold(), (name, name.casefold()))
+    return list(technologies.values())
+
+
+def populate_technologies(apps, schema_editor):
+    """Tag existing projects from their comma-separated tech_stack"""
+    Project = apps.get_model('portfolio', 'Project')
+    Technology = apps.get_model('portfolio', 'Technology')
+    ProjectTechnology = apps.get_model('portfolio', 'ProjectTechnology')
+
+    parsed = {
+        project_id: parse_tech_stack(tech_stack)
+        for project_id, tech_stack in Project.objects.values_list('pk', 'tech_stack').iterator()
+    }
+    names = {key: name for pairs in parsed.values() for name, key in pairs}
+    Technology.objects.bulk_create([Technology(name=name, key=key) for key, name in names.items()], batch_size=500)
+    technology_ids = dict(Technology.objects.values_list('key', 'pk'))
+    ProjectTechnology.objects.bulk_create([
+        ProjectTechnology(project_id=project_id, technology_id=technology_ids[key], position=position)
+        for project_id, pairs in parsed.items()
+        for position, (name, key) in enumerate(pairs)
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_portfolio_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Technology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(help_text='Case-folded name used for lookups', max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name_plural': 'technologies',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectTechnology',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_technologies', to='portfolio.project')),
+                ('technology', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_links', to='portfolio.technology')),
+            ],
+            options={
+                'ordering': ['position'],
+                'unique_together': {('project', 'technology')},
+            },
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='technologies',
+            field=models.ManyToManyField(blank=True, related_name='projects', through='portfolio.ProjectTechnology', to='portfolio.technology'),
+        ),
+        migrations.RunPython(populate_technologies, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 4.2.29 on 2026-10-19 06:00
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_aggregate_stats(apps, schema_editor):
+    Skill = apps.get_model('portfolio', 'Skill')
+    ProjectTechnology = apps.get_model('portfolio', 'ProjectTechnology')
+    AggregateStat = apps.get_model('portfolio', 'AggregateStat')
+
+    values, labels = Counter(), {}
+    skills = Skill.objects.order_by().values_list('name', 'category', 'proficiency').annotate(count=Count('pk'))
+    for name, category, proficiency, count in skills:
+        name = ' '.join(name.split())
+        for bucket, label in (
+            (('skill', name.casefold()), name),
+            (('proficiency', f"{category}:{proficiency}"), category),
+        ):
+            values[bucket] += count
+            labels.setdefault(bucket, label)
+
+    links = ProjectTechnology.objects.order_by().values_list(
+        'technology__key', 'technology__name',
+    ).annotate(count=Count('pk'))
+    for key, name, count in links:
+        values['technology', key] += count
+        labels['technology', key] = name
+
+    AggregateStat.objects.bulk_create([
+        AggregateStat(kind=kind, key=key, label=labels[kind, key], value=value)
+        for (kind, key), value in values.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0009_project_technologies'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AggregateStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('skill', 'Skill'), ('technology', 'Technology'), ('proficiency', 'Proficiency by category')], max_length=20)),
+                ('key', models.CharField(help_text='Case-folded name, or category:proficiency', max_length=120)),
+                ('label', models.CharField(blank=True, max_length=120)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-value'], name='aggregate_kind_value_idx')],
+                'unique_together': {('kind', 'key')},
+            },
+        ),
+        migrations.RunPython(seed_aggregate_stats, migrations.RunPython.noop),
+    ]
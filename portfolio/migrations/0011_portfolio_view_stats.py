@@ -0,0 +1,30 @@
+# Generated by Django 4.2.29 on 2026-10-19 06:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0010_aggregate_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioViewStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('visitors', models.PositiveIntegerField(default=0)),
+                ('visitor_sketch', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('portfolio', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_stats', to='portfolio.portfolio')),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('portfolio', 'date')},
+            },
+        ),
+    ]
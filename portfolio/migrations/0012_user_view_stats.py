@@ -0,0 +1,53 @@
+# Generated by Django 4.2.29 on 2026-10-19 07:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_user_view_stats(apps, schema_editor):
+    """Roll the existing per-portfolio days up per owner"""
+    PortfolioViewStat = apps.get_model('portfolio', 'PortfolioViewStat')
+    UserViewStat = apps.get_model('portfolio', 'UserViewStat')
+
+    days = {}
+    rows = PortfolioViewStat.objects.values_list('portfolio__user_id', 'date', 'views', 'visitor_sketch')
+    for user_id, date, views, sketch in rows.iterator():
+        total_views, registers = days.get((user_id, date), (0, b''))
+        sketch = bytes(sketch)
+        if registers and sketch:
+            # HyperLogLog sketches merge by taking the larger register
+            sketch = bytes(map(max, registers, sketch))
+        days[user_id, date] = (total_views + views, sketch or registers)
+
+    UserViewStat.objects.bulk_create([
+        UserViewStat(user_id=user_id, date=date, views=views, visitor_sketch=sketch)
+        for (user_id, date), (views, sketch) in days.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('portfolio', '0011_portfolio_view_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserViewStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('visitor_sketch', models.BinaryField(default=bytes)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='view_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-date'],
+                'unique_together': {('user', 'date')},
+            },
+        ),
+        migrations.RunPython(seed_user_view_stats, migrations.RunPython.noop),
+    ]
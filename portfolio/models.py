@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils import timezone
 import uuid
 
 
@@ -22,6 +25,51 @@ class UserProfile(models.Model):
         return f"{self.user.username}'s Profile"
 
 
+class PortfolioQuerySet(models.QuerySet):
+    """Query helpers for portfolios"""
+
+    def with_item_counts(self):
+        """Annotate per-section item counts and their total in the same query"""
+        counts = {
+            'education_count': _child_count(Education),
+            'experience_count': _child_count(Experience),
+            'skills_count': _child_count(Skill),
+            'projects_count': _child_count(Project),
+            'certifications_count': _child_count(Certification),
+        }
+        return self.annotate(**counts).annotate(
+            item_count=F('education_count') + F('experience_count') + F('skills_count')
+            + F('projects_count') + F('certifications_count')
+        )
+
+    def bump_content_version(self):
+        """Record a content change with a single UPDATE of the version columns.
+
+        Sends ``content_changed`` so derived data (e.g. the search index)
+        can follow.
+        """
+        from .signals import content_changed
+
+        portfolio_ids = list(self.values_list('pk', flat=True))
+        updated = self.model.objects.filter(pk__in=portfolio_ids).update(
+            content_version=F('content_version') + 1, updated_at=timezone.now(),
+        )
+        content_changed.send(sender=self.model, portfolio_ids=portfolio_ids)
+        return updated
+
+
+def _child_count(model):
+    """Correlated subquery counting a child model's rows per portfolio"""
+    rows = (
+        model.objects.filter(portfolio=OuterRef('pk'))
+        .order_by()
+        .values('portfolio')
+        .annotate(count=Count('pk'))
+        .values('count')
+    )
+    return Coalesce(Subquery(rows), 0)
+
+
 class Portfolio(models.Model):
     """Main portfolio model"""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -41,11 +89,28 @@ class Portfolio(models.Model):
         ],
         default='minimal_dark'
     )
+    export_count = models.PositiveIntegerField(default=0)
+    last_exported_at = models.DateTimeField(blank=True, null=True)
+    # Incremented on every change to the portfolio's items
+    content_version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = PortfolioQuerySet.as_manager()
+
     class Meta:
         ordering = ['-updated_at']
+        indexes = [
+            # Dashboard listing: WHERE user_id = ? ORDER BY updated_at DESC, id DESC
+            models.Index(fields=['user', '-updated_at', '-id'], name='portfolio_user_updated_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored visibility so signals can maintain counters
+        instance._loaded_is_public = instance.__dict__.get('is_public')
+        return instance
 
     def __str__(self):
         return f"{self.user.username} - {self.title}"
@@ -67,6 +132,9 @@ class Education(models.Model):
 
     class Meta:
         ordering = ['order', '-start_date']
+        indexes = [
+            models.Index(fields=['portfolio', 'order', '-start_date'], name='education_portfolio_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.degree} at {self.institution}"
@@ -86,6 +154,9 @@ class Experience(models.Model):
 
     class Meta:
         ordering = ['order', '-start_date']
+        indexes = [
+            models.Index(fields=['portfolio', 'order', '-start_date'], name='experience_portfolio_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.position} at {self.company}"
@@ -110,6 +181,17 @@ class Skill(models.Model):
     class Meta:
         ordering = ['category', 'order', 'name']
         unique_together = ['portfolio', 'name']
+        indexes = [
+            models.Index(fields=['portfolio', 'category', 'order', 'name'], name='skill_portfolio_order_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored values so aggregate statistics can be adjusted
+        stored = tuple(instance.__dict__.get(name) for name in ('name', 'category', 'proficiency'))
+        instance._loaded_stats = None if None in stored else stored
+        return instance
 
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
@@ -127,16 +209,55 @@ class Project(models.Model):
     featured = models.BooleanField(default=False)
     order = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Normalized from tech_stack by technology_utils.sync_project_technologies
+    technologies = models.ManyToManyField(
+        'Technology', through='ProjectTechnology', related_name='projects', blank=True,
+    )
 
     class Meta:
         ordering = ['order', '-created_at']
+        indexes = [
+            models.Index(fields=['portfolio', 'order', '-created_at'], name='project_portfolio_order_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
     def get_tech_list(self):
-        """Return tech stack as a list"""
-        return [tech.strip() for tech in self.tech_stack.split(',') if tech.strip()]
+        """Return tech stack as a list, spelled the way the owner wrote it"""
+        # The shared Technology tags are only for lookups and aggregates
+        cached = self.__dict__.get('_tech_list')
+        if cached is None or cached[0] != self.tech_stack:
+            cached = (self.tech_stack, [tech.strip() for tech in self.tech_stack.split(',') if tech.strip()])
+            self.__dict__['_tech_list'] = cached
+        return cached[1]
+
+
+class Technology(models.Model):
+    """Canonical technology tag shared by projects"""
+    name = models.CharField(max_length=100)
+    key = models.CharField(max_length=100, unique=True, help_text="Case-folded name used for lookups")
+
+    class Meta:
+        ordering = ['name']
+        verbose_name_plural = 'technologies'
+
+    def __str__(self):
+        return self.name
+
+
+class ProjectTechnology(models.Model):
+    """A technology used by a project, in tech stack order"""
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='project_technologies')
+    technology = models.ForeignKey(Technology, on_delete=models.CASCADE, related_name='project_links')
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['position']
+        unique_together = ['project', 'technology']
+
+    def __str__(self):
+        return f"{self.project_id} uses {self.technology_id}"
 
 
 class Certification(models.Model):
@@ -152,7 +273,115 @@ class Certification(models.Model):
 
     class Meta:
         ordering = ['order', '-issue_date']
+        indexes = [
+            models.Index(fields=['portfolio', 'order', '-issue_date'], name='cert_portfolio_order_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} - {self.issuing_organization}"
 
+
+class PlatformCounter(models.Model):
+    """Denormalized platform-wide counters, kept current by signals"""
+    PUBLIC_PORTFOLIOS = 'public_portfolios'
+
+    name = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} = {self.value}"
+
+
+class AggregateStat(models.Model):
+    """Materialized platform-wide counts, kept current by signals.
+
+    One row per bucket: a skill name, a technology, or a skill category and
+    proficiency pair. ``stats_utils`` applies deltas on writes and can
+    recompute every row from the source tables.
+    """
+    SKILL = 'skill'
+    TECHNOLOGY = 'technology'
+    PROFICIENCY = 'proficiency'
+    KINDS = [
+        (SKILL, 'Skill'),
+        (TECHNOLOGY, 'Technology'),
+        (PROFICIENCY, 'Proficiency by category'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KINDS)
+    key = models.CharField(max_length=120, help_text="Case-folded name, or category:proficiency")
+    label = models.CharField(max_length=120, blank=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['kind', 'key']
+        indexes = [
+            # Top-N reads: WHERE kind = ? ORDER BY value DESC
+            models.Index(fields=['kind', '-value'], name='aggregate_kind_value_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.key} = {self.value}"
+
+
+class PortfolioViewStat(models.Model):
+    """Public page views of a portfolio on one day.
+
+    Written in batches by ``analytics_utils``. Unique visitors are kept as
+    a HyperLogLog sketch so days and portfolios can be merged without
+    storing who visited; ``visitors`` is the day's estimate.
+    """
+    portfolio = models.ForeignKey(Portfolio, on_delete=models.CASCADE, related_name='view_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    visitors = models.PositiveIntegerField(default=0)
+    visitor_sketch = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['portfolio', 'date']
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.portfolio.title} {self.date}: {self.views} views"
+
+
+class UserViewStat(models.Model):
+    """Public page views of all of a user's portfolios on one day.
+
+    Written alongside ``PortfolioViewStat`` so a dashboard total reads one
+    row per day instead of one per portfolio and day.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='view_stats')
+    date = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    visitor_sketch = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['user', 'date']
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.user.username} {self.date}: {self.views} views"
+
+
+class PortfolioSearchDocument(models.Model):
+    """Searchable text of a public portfolio.
+
+    Maintained by ``search_utils``; the full-text index over it is created
+    per database backend by migration 0008 (FTS5 on SQLite, a tsvector
+    column with a GIN index on PostgreSQL).
+    """
+    portfolio = models.OneToOneField(Portfolio, on_delete=models.CASCADE, related_name='search_document')
+    title = models.CharField(max_length=200)
+    skills = models.TextField(blank=True)
+    technologies = models.TextField(blank=True)
+    experience = models.TextField(blank=True)
+    bio = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Search document for {self.portfolio_id}"
@@ -0,0 +1,43 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    """Raised for a cursor that cannot be decoded"""
+
+
+def encode_cursor(portfolio):
+    """Opaque cursor pointing just after ``portfolio`` in ``-updated_at, -id`` order"""
+    payload = json.dumps([portfolio.updated_at.isoformat(), str(portfolio.pk)])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        updated_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return datetime.fromisoformat(updated_at), uuid.UUID(pk)
+    except (ValueError, TypeError, AttributeError, UnicodeError):
+        raise InvalidCursor(cursor)
+
+
+def keyset_page(queryset, cursor=None, page_size=20):
+    """Return ``(items, next_cursor)`` for a page of portfolios.
+
+    Pages are ordered newest-updated first with the primary key as a tie
+    breaker, and seek past the cursor instead of using OFFSET, so every
+    page is a single index range scan no matter how deep it is.
+    """
+    queryset = queryset.order_by('-updated_at', '-pk')
+    if cursor:
+        updated_at, pk = decode_cursor(cursor)
+        queryset = queryset.filter(Q(updated_at__lt=updated_at) | Q(updated_at=updated_at, pk__lt=pk))
+
+    # One extra row tells us whether there is another page
+    items = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(items[page_size - 1]) if len(items) > page_size else None
+    return items[:page_size], next_cursor
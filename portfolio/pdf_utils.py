@@ -3,52 +3,109 @@ import tempfile
 from io import BytesIO
 from django.template.loader import render_to_string
 from django.http import HttpResponse
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
 from django.conf import settings
+from django.db.models import prefetch_related_objects
+from .delivery_utils import export_cache
+from .hash_utils import PORTFOLIO_PREFETCH, content_fingerprint
+from .media_utils import media_prefetcher, make_media_url_fetcher
+from .profiling_utils import export_phase
+from .replica_utils import replica_reads
+
+
+def preload_weasyprint():
+    """Import WeasyPrint eagerly, for dedicated export workers"""
+    import weasyprint
+    import weasyprint.text.fonts
 
 
 class PortfolioPDFGenerator:
     """Enhanced PDF generator for portfolios with better formatting and layout"""
     
+    # Bump when the PDF stylesheet or layout code changes
+    EXPORT_VERSION = 1
+    
+    TEMPLATE_NAME = 'portfolio/pdf/portfolio_pdf.html'
+    
     def __init__(self):
-        self.font_config = FontConfiguration()
+        self._font_config = None
+    
+    @property
+    def font_config(self):
+        """Font configuration, created on first use"""
+        if self._font_config is None:
+            from weasyprint.text.fonts import FontConfiguration
+            self._font_config = FontConfiguration()
+        return self._font_config
+    
+    def get_portfolio_pdf(self, portfolio, user_profile, request):
+        """Return the path of the cached PDF, generating it on a miss"""
+        # Content reads may come from a replica; the owner's own recent
+        # writes pin them to the primary
+        with replica_reads():
+            prefetch_related_objects([portfolio], *PORTFOLIO_PREFETCH)
+        key = content_fingerprint(
+            portfolio,
+            user_profile,
+            template_names=[self.TEMPLATE_NAME],
+            extra=[self.EXPORT_VERSION, request.build_absolute_uri('/')],
+        )
+        return export_cache.get_or_create(
+            'pdf', portfolio, key, 'pdf',
+            lambda pdf_path: self.generate_pdf(portfolio, user_profile, request, target=pdf_path),
+        )
+        
+    def generate_pdf(self, portfolio, user_profile, request, target=None):
+        """Generate a well-formatted PDF from portfolio data
         
-    def generate_pdf(self, portfolio, user_profile, request):
-        """Generate a well-formatted PDF from portfolio data"""
+        Returns the PDF bytes, or writes them to ``target`` if given.
+        """
+        # Imported here so web workers don't load Pango/Cairo at startup
+        from weasyprint import HTML, CSS, default_url_fetcher
         
         # Prepare context data
-        context = {
-            'portfolio': portfolio,
-            'user_profile': user_profile,
-            'education_list': portfolio.education.all(),
-            'experience_list': portfolio.experience.all(),
-            'skills_by_category': self._group_skills_by_category(portfolio.skills.all()),
-            'projects_list': portfolio.projects.all(),
-            'certifications_list': portfolio.certifications.all(),
-            'base_url': request.build_absolute_uri('/'),
-        }
+        with export_phase('context'):
+            prefetch_related_objects([portfolio], *PORTFOLIO_PREFETCH)
+            context = {
+                'portfolio': portfolio,
+                'user_profile': user_profile,
+                'education_list': portfolio.education.all(),
+                'experience_list': portfolio.experience.all(),
+                'skills_by_category': self._group_skills_by_category(portfolio.skills.all()),
+                'projects_list': portfolio.projects.all(),
+                'certifications_list': portfolio.certifications.all(),
+                'base_url': request.build_absolute_uri('/'),
+            }
         
         # Render HTML content using PDF-specific template
-        html_content = render_to_string('portfolio/pdf/portfolio_pdf.html', context, request=request)
+        with export_phase('html_render'):
+            html_content = render_to_string(self.TEMPLATE_NAME, context, request=request)
+        
+        # Serve images from storage instead of fetching them back over HTTP
+        with export_phase('media_fetch'):
+            media = media_prefetcher.fetch_portfolio_media(user_profile, portfolio)
         
         # Create PDF with enhanced settings
         html_doc = HTML(
             string=html_content,
             base_url=request.build_absolute_uri('/'),
-            encoding='utf-8'
+            encoding='utf-8',
+            url_fetcher=make_media_url_fetcher(media, default_url_fetcher, media_prefetcher.storage),
         )
         
         # Enhanced CSS for better PDF formatting
         pdf_css = CSS(string=self._get_pdf_css())
         
-        # Generate PDF with optimized settings
-        pdf_bytes = html_doc.write_pdf(
-            stylesheets=[pdf_css],
-            font_config=self.font_config,
-            optimize_images=True,
-            presentational_hints=True,
-        )
+        # Generate PDF with optimized settings; layout and writing are split
+        # so they can be profiled separately
+        options = {
+            'stylesheets': [pdf_css],
+            'optimize_images': True,
+            'presentational_hints': True,
+        }
+        with export_phase('layout'):
+            document = html_doc.render(font_config=self.font_config, **options)
+        with export_phase('pdf_write'):
+            pdf_bytes = document.write_pdf(target=target, **options)
         
         return pdf_bytes
     
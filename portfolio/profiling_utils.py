@@ -0,0 +1,158 @@
+import cProfile
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.utils import timezone
+
+from .timing_utils import timed_phase
+
+_state = threading.local()
+
+# cProfile and tracemalloc are process-wide, so one export is profiled at a time
+_profile_lock = threading.Lock()
+
+
+@contextmanager
+def export_phase(name):
+    """Mark a phase of an export.
+
+    Costs next to nothing unless an ExportProfiler is active on this
+    thread, in which case the phase's time and allocations are recorded,
+    or the request is sampled for Server-Timing (see ``timing_utils``).
+    """
+    profiler = getattr(_state, 'profiler', None)
+    with timed_phase(f'export_{name}'):
+        if profiler is None:
+            yield
+            return
+        with profiler.phase(name):
+            yield
+
+
+class ExportProfiler:
+    """Run an export under cProfile and tracemalloc, broken down by phase"""
+
+    def __init__(self, title='', top=30):
+        self.title = title
+        self.top = top
+        self.phases = []
+        self.stats = None
+        self.snapshot = None
+        self.total_ms = 0
+
+    @contextmanager
+    def profile(self):
+        """Profile everything run inside the block; waits for any other profile to finish"""
+        with _profile_lock:
+            profile = cProfile.Profile()
+            # Leave tracing on if someone else (e.g. ``-X tracemalloc``) started it
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(25)
+            _state.profiler = self
+            started = time.perf_counter()
+            profile.enable()
+            try:
+                yield self
+            finally:
+                profile.disable()
+                self.total_ms = (time.perf_counter() - started) * 1000
+                _state.profiler = None
+                self.snapshot = tracemalloc.take_snapshot()
+                if started_tracing:
+                    tracemalloc.stop()
+                self.stats = pstats.Stats(profile)
+
+    @contextmanager
+    def phase(self, name):
+        allocated_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            allocated_after, peak = tracemalloc.get_traced_memory()
+            self.phases.append({
+                'name': name,
+                'ms': elapsed_ms,
+                'retained_kb': (allocated_after - allocated_before) / 1024,
+                'peak_kb': (peak - allocated_before) / 1024,
+            })
+
+    def report(self):
+        """Return the profile as a plain-text report"""
+        out = io.StringIO()
+        if self.title:
+            out.write(f"{self.title}\n")
+        out.write(f"Total: {self.total_ms:.1f} ms\n\n")
+
+        out.write("Phases\n")
+        out.write(f"{'phase':<20}{'time ms':>12}{'share':>8}{'retained KB':>14}{'peak KB':>12}\n")
+        for phase in self.phases:
+            share = phase['ms'] / self.total_ms * 100 if self.total_ms else 0
+            out.write(
+                f"{phase['name']:<20}{phase['ms']:>12.1f}{share:>7.1f}%"
+                f"{phase['retained_kb']:>14.1f}{phase['peak_kb']:>12.1f}\n"
+            )
+
+        if self.snapshot is not None:
+            out.write(f"\nTop {self.top} allocation sites\n")
+            snapshot = self.snapshot.filter_traces([
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+            ])
+            for stat in snapshot.statistics('lineno')[:self.top]:
+                out.write(f"{stat.size / 1024:>10.1f} KB {stat.count:>8} blocks  {stat.traceback[0]}\n")
+
+        if self.stats is not None:
+            out.write(f"\nTop {self.top} functions by cumulative time\n")
+            self.stats.stream = out
+            self.stats.sort_stats('cumulative').print_stats(self.top)
+
+        return out.getvalue()
+
+    def save(self, output_dir, basename):
+        """Write the text report and the raw cProfile data, return the report path"""
+        os.makedirs(output_dir, exist_ok=True)
+        report_path = os.path.join(output_dir, f'{basename}.txt')
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(self.report())
+        if self.stats is not None:
+            self.stats.dump_stats(os.path.join(output_dir, f'{basename}.prof'))
+        return report_path
+
+
+def profile_export(kind, portfolio, user_profile, request, output_dir=None, top=30):
+    """Generate a PDF or ZIP export under the profiler, bypassing the export cache.
+
+    Returns ``(report_text, report_path)``.
+    """
+    from .pdf_utils import PortfolioPDFGenerator
+    from .zip_utils import PortfolioZipExporter
+
+    output_dir = str(output_dir or settings.EXPORT_PROFILE_ROOT)
+    profiler = ExportProfiler(top=top)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        target = os.path.join(temp_dir, f'export.{kind}')
+        with profiler.profile():
+            if kind == 'pdf':
+                PortfolioPDFGenerator().generate_pdf(portfolio, user_profile, request, target=target)
+            elif kind == 'zip':
+                PortfolioZipExporter().build_zip(portfolio, user_profile, request, target)
+            else:
+                raise ValueError(f"Unknown export kind: {kind}")
+        size_kb = os.path.getsize(target) / 1024
+
+    profiler.title = f"{kind.upper()} export of '{portfolio.slug}' ({size_kb:.1f} KB)"
+    basename = f"{portfolio.slug}_{kind}_{timezone.now():%Y%m%d_%H%M%S}"
+    report_path = profiler.save(output_dir, basename)
+    return profiler.report(), report_path
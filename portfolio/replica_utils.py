@@ -0,0 +1,144 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Cookie marking a browser whose user wrote within the sticky window
+STICKY_COOKIE = 'devport_primary'
+
+# True inside code paths that opted in to replica reads
+_replica_reads = ContextVar('replica_reads', default=False)
+# True once the current request (or task) has written
+_wrote = ContextVar('wrote_to_primary', default=False)
+# True when the user wrote recently, per the sticky cookie
+_sticky = ContextVar('sticky_to_primary', default=False)
+
+
+def replica_aliases():
+    """Database aliases configured as read replicas of ``default``"""
+    return getattr(settings, 'DATABASE_REPLICA_ALIASES', [])
+
+
+@contextmanager
+def replica_reads():
+    """Let reads in this block go to a replica, unless pinned to the primary"""
+    token = _replica_reads.set(True)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replica(view):
+    """Decorator for read-only views that tolerate slightly stale data"""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(*args, **kwargs):
+            with replica_reads():
+                return await view(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return view(*args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    """Send writes to the primary and opted-in reads to a replica.
+
+    Only code inside ``replica_reads()`` (or a ``read_from_replica`` view)
+    reads from a replica. Reads go back to the primary once the request
+    has written, inside a transaction, and for a short window after the
+    user's last write (see ``ReplicaStickinessMiddleware``).
+    """
+
+    def db_for_read(self, model, **hints):
+        replicas = replica_aliases()
+        if not replicas or not _replica_reads.get() or _wrote.get() or _sticky.get():
+            return DEFAULT_DB_ALIAS
+        # Reads inside a transaction must see its writes
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Every alias holds the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get their schema from the primary
+        if db in replica_aliases():
+            return False
+        return None
+
+
+class ReplicaStickinessMiddleware:
+    """Keep a user's reads on the primary for a short window after they write.
+
+    Must come after the session middleware in ``MIDDLEWARE`` so that
+    saving the session doesn't count as a write by the user. Works in
+    both sync and async middleware chains.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not replica_aliases():
+            return self.get_response(request)
+
+        tokens = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = self._finish(tokens)
+        return self._mark(response, wrote)
+
+    async def __acall__(self, request):
+        if not replica_aliases():
+            return await self.get_response(request)
+
+        tokens = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            wrote = self._finish(tokens)
+        return self._mark(response, wrote)
+
+    def _start(self, request):
+        return _sticky.set(STICKY_COOKIE in request.COOKIES), _wrote.set(False)
+
+    def _finish(self, tokens):
+        """Reset the request's routing state, return whether it wrote"""
+        sticky_token, wrote_token = tokens
+        wrote = _wrote.get()
+        _sticky.reset(sticky_token)
+        _wrote.reset(wrote_token)
+        return wrote
+
+    def _mark(self, response, wrote):
+        if wrote:
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
@@ -0,0 +1,173 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Portfolio, PortfolioSearchDocument
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Column weights for SQLite's bm25(): title, skills, technologies, experience, bio
+FTS_WEIGHTS = (10.0, 8.0, 5.0, 4.0, 1.0)
+
+
+class PortfolioSearchIndex:
+    """Full-text index over public portfolios.
+
+    Each public portfolio has one ``PortfolioSearchDocument`` holding its
+    title, skill names, project technologies, experience and bio. The
+    database indexes those rows itself (SQLite FTS5 or a PostgreSQL
+    tsvector column, see migration 0008); other backends fall back to
+    unranked ``icontains`` matching.
+    """
+
+    max_page_size = 50
+
+    def build_document(self, portfolio):
+        """Return the searchable text fields of a portfolio"""
+        profile = getattr(portfolio.user, 'profile', None)
+        return {
+            'title': portfolio.title,
+            'skills': ' '.join(skill.name for skill in portfolio.skills.all()),
+            'technologies': ' '.join(self._technology_names(portfolio)),
+            'experience': ' '.join(
+                f"{job.position} {job.company}" for job in portfolio.experience.all()
+            ),
+            'bio': profile.bio if profile else '',
+        }
+
+    def _technology_names(self, portfolio):
+        """The owner's spellings plus the canonical names, so "js" and "JavaScript" both match"""
+        names = {}
+        for project in portfolio.projects.all():
+            names.update(dict.fromkeys(project.get_tech_list()))
+            names.update(dict.fromkeys(link.technology.name for link in project.project_technologies.all()))
+        return list(names)
+
+    def update(self, portfolio_ids):
+        """Refresh the documents of the given portfolios"""
+        portfolio_ids = list(portfolio_ids)
+        portfolios = (
+            Portfolio.objects.filter(pk__in=portfolio_ids, is_public=True)
+            .select_related('user__profile')
+            .prefetch_related('skills', 'projects__project_technologies__technology', 'experience')
+        )
+        indexed = set()
+        for portfolio in portfolios:
+            PortfolioSearchDocument.objects.update_or_create(
+                portfolio=portfolio, defaults=self.build_document(portfolio),
+            )
+            indexed.add(portfolio.pk)
+
+        # Private or deleted portfolios drop out of the index
+        stale = set(portfolio_ids) - indexed
+        if stale:
+            PortfolioSearchDocument.objects.filter(portfolio_id__in=stale).delete()
+
+    def rebuild(self, chunk_size=500):
+        """Recreate every document from scratch, return the number indexed"""
+        PortfolioSearchDocument.objects.all().delete()
+
+        public_ids = list(Portfolio.objects.filter(is_public=True).values_list('pk', flat=True))
+        for start in range(0, len(public_ids), chunk_size):
+            chunk = (
+                Portfolio.objects.filter(pk__in=public_ids[start:start + chunk_size])
+                .select_related('user__profile')
+                .prefetch_related('skills', 'projects__project_technologies__technology', 'experience')
+            )
+            PortfolioSearchDocument.objects.bulk_create([
+                PortfolioSearchDocument(portfolio=portfolio, **self.build_document(portfolio))
+                for portfolio in chunk
+            ])
+
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute("INSERT INTO portfolio_search_fts(portfolio_search_fts) VALUES ('rebuild')")
+        return len(public_ids)
+
+    def search(self, query, page=1, page_size=20):
+        """Return ``(portfolios, has_next)`` for one page of ranked matches"""
+        terms = TOKEN_RE.findall(query.lower())
+        if not terms:
+            return [], False
+
+        page = max(page, 1)
+        page_size = max(1, min(page_size, self.max_page_size))
+        offset = (page - 1) * page_size
+
+        # Fetch one extra row to know whether there is a next page
+        if connection.vendor == 'sqlite':
+            ranked = self._search_sqlite(terms, page_size + 1, offset)
+        elif connection.vendor == 'postgresql':
+            ranked = self._search_postgres(terms, page_size + 1, offset)
+        else:
+            ranked = self._search_fallback(terms, page_size + 1, offset)
+
+        has_next = len(ranked) > page_size
+        ranked = ranked[:page_size]
+
+        portfolios = Portfolio.objects.select_related('user').in_bulk([pk for pk, _ in ranked])
+        results = []
+        for pk, rank in ranked:
+            portfolio = portfolios.get(pk)
+            if portfolio is not None and portfolio.is_public:
+                portfolio.search_rank = rank
+                results.append(portfolio)
+        return results, has_next
+
+    def _search_sqlite(self, terms, limit, offset):
+        # Every term must match, as a prefix so "djan" finds "Django"
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                # Rank inside FTS5 and join only the requested page
+                f"""
+                SELECT d.portfolio_id, ranked.rank
+                FROM (
+                    SELECT rowid, bm25(portfolio_search_fts, {weights}) AS rank
+                    FROM portfolio_search_fts
+                    WHERE portfolio_search_fts MATCH %s
+                    ORDER BY rank
+                    LIMIT %s OFFSET %s
+                ) ranked
+                JOIN portfolio_portfoliosearchdocument d ON d.id = ranked.rowid
+                ORDER BY ranked.rank
+                """,
+                [match, limit, offset],
+            )
+            # bm25() is lower-is-better; expose higher-is-better like ts_rank
+            return [(self._pk(pk), -rank) for pk, rank in cursor.fetchall()]
+
+    def _search_postgres(self, terms, limit, offset):
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT portfolio_id, ts_rank(search_vector, query) AS rank
+                FROM portfolio_portfoliosearchdocument, to_tsquery('english', %s) query
+                WHERE search_vector @@ query
+                ORDER BY rank DESC
+                LIMIT %s OFFSET %s
+                """,
+                [tsquery, limit, offset],
+            )
+            return [(self._pk(pk), rank) for pk, rank in cursor.fetchall()]
+
+    def _search_fallback(self, terms, limit, offset):
+        documents = PortfolioSearchDocument.objects.all()
+        for term in terms:
+            documents = documents.filter(
+                Q(title__icontains=term) | Q(skills__icontains=term) | Q(technologies__icontains=term)
+                | Q(experience__icontains=term) | Q(bio__icontains=term)
+            )
+        rows = documents.order_by('-updated_at').values_list('portfolio_id', flat=True)[offset:offset + limit]
+        return [(pk, 0) for pk in rows]
+
+    def _pk(self, value):
+        # Raw queries return the UUID primary key as stored by the backend
+        return Portfolio._meta.pk.to_python(value)
+
+
+# Global instance
+search_index = PortfolioSearchIndex()
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+
+# Session key holding when the session was last written to the database
+WRITTEN_AT_KEY = '_session_written_at'
+
+
+class SessionStore(CachedDBStore):
+    """Cached database sessions that skip redundant writes.
+
+    With ``SESSION_SAVE_EVERY_REQUEST`` every response saves the session.
+    This store writes to the database (and refreshes the cache) only when
+    the session data changed, or when the last write is older than
+    ``SESSION_WRITE_INTERVAL`` seconds so the sliding expiry moves forward.
+    Server-side expiry therefore lags the cookie by at most that interval.
+
+    Like ``cached_db``, run it on a cache shared by all worker processes.
+    """
+
+    def load(self):
+        data = super().load()
+        self._loaded_snapshot = self.serializer().dumps(data)
+        return data
+
+    def save(self, must_create=False):
+        if not must_create and self.session_key is not None and not self._needs_write():
+            return
+        self._get_session(no_load=must_create)[WRITTEN_AT_KEY] = int(time.time())
+        super().save(must_create=must_create)
+        self._loaded_snapshot = self.serializer().dumps(self._session_cache)
+
+    def _needs_write(self):
+        snapshot = getattr(self, '_loaded_snapshot', None)
+        data = self._get_session()
+        if snapshot is None or self.serializer().dumps(data) != snapshot:
+            return True
+
+        # Unchanged: only extend the expiry once per interval, and well
+        # before the stored expiry could pass
+        interval = getattr(settings, 'SESSION_WRITE_INTERVAL', 300)
+        interval = min(interval, self.get_expiry_age() // 2)
+        return time.time() - data.get(WRITTEN_AT_KEY, 0) >= interval
@@ -0,0 +1,93 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import Signal, receiver
+
+from .models import Portfolio, PlatformCounter, Project, Skill, UserProfile
+from .search_utils import search_index
+from .stats_utils import increment_counter, record_skill_changes, skill_state
+from .technology_utils import sync_project_technologies, unlink_project_technologies
+from .timing_utils import install_query_timer
+
+# Sent by PortfolioQuerySet.bump_content_version with ``portfolio_ids``
+content_changed = Signal()
+
+
+@receiver(post_save, sender=Portfolio)
+def update_public_counter_on_save(sender, instance, created, **kwargs):
+    """Keep the public portfolio counter in step with visibility changes"""
+    was_public = False if created else getattr(instance, '_loaded_is_public', None)
+    if was_public is None:
+        # Instance not loaded from the DB (or visibility deferred): we can't
+        # tell what changed, so leave it to periodic reconciliation
+        instance._loaded_is_public = instance.is_public
+        return
+
+    if instance.is_public != was_public:
+        increment_counter(PlatformCounter.PUBLIC_PORTFOLIOS, 1 if instance.is_public else -1)
+    instance._loaded_is_public = instance.is_public
+
+
+@receiver(post_delete, sender=Portfolio)
+def update_public_counter_on_delete(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_is_public', instance.is_public):
+        increment_counter(PlatformCounter.PUBLIC_PORTFOLIOS, -1)
+
+
+@receiver(content_changed)
+def reindex_changed_content(sender, portfolio_ids, **kwargs):
+    """Refresh search documents once the item changes are committed"""
+    if portfolio_ids:
+        transaction.on_commit(lambda: search_index.update(portfolio_ids))
+
+
+@receiver(post_save, sender=Portfolio)
+def reindex_portfolio(sender, instance, **kwargs):
+    """Title and visibility changes affect the search index"""
+    portfolio_id = instance.pk
+    transaction.on_commit(lambda: search_index.update([portfolio_id]))
+
+
+@receiver(post_save, sender=UserProfile)
+def reindex_profile_portfolios(sender, instance, **kwargs):
+    """The bio is indexed with every portfolio of its user"""
+    user_id = instance.user_id
+    transaction.on_commit(lambda: search_index.update(
+        Portfolio.objects.filter(user_id=user_id, is_public=True).values_list('pk', flat=True)
+    ))
+
+
+@receiver(post_save, sender=Project)
+def sync_technologies_on_save(sender, instance, raw=False, **kwargs):
+    """Keep a project's technology tags in step with its tech_stack"""
+    if not raw:
+        sync_project_technologies([instance])
+
+
+@receiver(pre_delete, sender=Project)
+def unlink_technologies_on_delete(sender, instance, **kwargs):
+    # Before the cascade removes the links the counts are read from
+    unlink_project_technologies(instance)
+
+
+@receiver(post_save, sender=Skill)
+def update_skill_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    """Keep the skill aggregates in step with added and edited skills"""
+    if raw:
+        return
+    old = None if created else getattr(instance, '_loaded_stats', None)
+    if created or old is not None:
+        record_skill_changes([(old, skill_state(instance))])
+    # Otherwise the stored values are unknown; leave it to periodic reconciliation
+    instance._loaded_stats = skill_state(instance)
+
+
+@receiver(post_delete, sender=Skill)
+def update_skill_stats_on_delete(sender, instance, **kwargs):
+    record_skill_changes([(getattr(instance, '_loaded_stats', None) or skill_state(instance), None)])
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    """Let sampled requests report their query count and SQL time"""
+    install_query_timer(connection)
@@ -0,0 +1,55 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .models import Portfolio
+
+# Characters kept free at the end of the base slug for "-<n>" suffixes
+SUFFIX_RESERVE = 10
+
+
+def base_slug(title):
+    """Slugify a title to fit the slug column, with a fallback for empty slugs"""
+    max_length = Portfolio._meta.get_field('slug').max_length
+    return slugify(title)[:max_length].strip('-') or 'portfolio'
+
+
+def next_free_slug(base):
+    """Return ``base`` or the first free ``base-<n>`` using a single query"""
+    max_length = Portfolio._meta.get_field('slug').max_length
+    if len(base) <= max_length - SUFFIX_RESERVE:
+        # Suffixes fit without truncating, so only base and base-<n> matter
+        lookup = Q(slug=base) | Q(slug__startswith=f'{base}-')
+    else:
+        lookup = Q(slug__startswith=base[:max_length - SUFFIX_RESERVE])
+    taken = set(Portfolio.objects.filter(lookup).values_list('slug', flat=True))
+
+    if base not in taken:
+        return base
+
+    counter = 1
+    while True:
+        suffix = f'-{counter}'
+        candidate = f"{base[:max_length - len(suffix)].rstrip('-')}{suffix}"
+        if candidate not in taken:
+            return candidate
+        counter += 1
+
+
+def create_with_unique_slug(portfolio, attempts=5):
+    """Insert a new portfolio under a unique slug derived from its title.
+
+    Two concurrent creates can pick the same free slug; the loser's insert
+    fails on the unique constraint and is retried with a fresh lookup.
+    """
+    base = base_slug(portfolio.title)
+    for attempt in range(attempts):
+        portfolio.slug = next_free_slug(base)
+        try:
+            with transaction.atomic():
+                portfolio.save(force_insert=True)
+            return portfolio
+        except IntegrityError:
+            # Only a lost race on the slug is worth retrying
+            if attempt == attempts - 1 or not Portfolio.objects.filter(slug=portfolio.slug).exists():
+                raise
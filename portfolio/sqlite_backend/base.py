@@ -0,0 +1,42 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite tuned for small production deployments.
+
+    Two extra ``OPTIONS`` on top of Django's SQLite backend:
+
+    ``pragmas``
+        ``{name: value}`` applied to every new connection, e.g. WAL mode.
+    ``transaction_mode``
+        How ``atomic()`` blocks begin. ``IMMEDIATE`` takes the write lock up
+        front, so a transaction that reads before writing waits for the busy
+        timeout instead of failing with "database is locked" when another
+        writer got there first (the same option Django 5.1 added).
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pragmas', None)
+        mode = params.pop('transaction_mode', None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f"transaction_mode must be one of {', '.join(TRANSACTION_MODES)}, not {mode!r}"
+            )
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get('pragmas', {}).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode:
+            self.cursor().execute(f'BEGIN {mode.upper()}')
+        else:
+            super()._start_transaction_under_autocommit()
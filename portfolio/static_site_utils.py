@@ -0,0 +1,186 @@
+import json
+import logging
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.template.loader import render_to_string
+
+from .hash_utils import PORTFOLIO_PREFETCH, content_fingerprint
+from .media_utils import media_prefetcher
+from .models import Portfolio, UserProfile
+from .zip_utils import PortfolioZipExporter
+
+logger = logging.getLogger(__name__)
+
+# Bump to force a full rebuild when the output layout changes
+BUILD_FORMAT_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+
+
+class StaticSiteBuilder:
+    """Render every public portfolio into a static directory tree.
+
+    Each portfolio ends up in ``<output_dir>/<slug>/index.html`` with its
+    images under ``<slug>/assets/images/``, so ``/u/<slug>/`` can be served
+    straight from nginx or a CDN. A manifest of content hashes lets re-runs
+    skip portfolios whose content has not changed.
+    """
+
+    def __init__(self, output_dir=None):
+        self.output_dir = str(output_dir or settings.STATIC_SITE_ROOT)
+        self.manifest_path = os.path.join(self.output_dir, MANIFEST_FILENAME)
+
+    def build(self, workers=1, chunk_size=200, force=False):
+        """Build the site and return a dict of build statistics"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        manifest = self._load_manifest()
+        previous = manifest['portfolios']
+
+        portfolio_ids = list(
+            Portfolio.objects.filter(is_public=True).order_by('pk').values_list('pk', flat=True)
+        )
+        jobs = [
+            (str(pk), None if force else previous.get(str(pk), {}).get('hash'))
+            for pk in portfolio_ids
+        ]
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+
+        stats = {'built': 0, 'unchanged': 0, 'failed': 0, 'removed': 0}
+        entries = {}
+
+        if workers > 1 and len(chunks) > 1:
+            # Forked workers must not share the parent's DB connections
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=django.setup) as pool:
+                futures = [pool.submit(build_chunk, self.output_dir, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    self._merge_results(future.result(), entries, stats)
+        else:
+            for chunk in chunks:
+                self._merge_results(build_chunk(self.output_dir, chunk), entries, stats)
+
+        # Portfolios that were deleted, made private or renamed since the last
+        # run, unless another portfolio has taken over the slug in this run
+        current_slugs = {entry['slug'] for entry in entries.values()}
+        for pk, entry in previous.items():
+            if entry['slug'] in current_slugs:
+                continue
+            removed = self._remove_portfolio_dir(entry['slug'])
+            if pk not in entries:
+                stats['removed'] += removed
+
+        manifest['portfolios'] = entries
+        self._write_manifest(manifest)
+        return stats
+
+    def _merge_results(self, results, entries, stats):
+        """Fold the results of one chunk into the manifest and statistics"""
+        for pk, slug, content_hash, status in results:
+            stats[status] += 1
+            # Failed builds keep their previous output and are retried next run
+            entries[pk] = {'slug': slug, 'hash': content_hash}
+
+    def _remove_portfolio_dir(self, slug):
+        path = os.path.join(self.output_dir, slug)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+            return 1
+        return 0
+
+    def _load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = {}
+
+        if manifest.get('format') != BUILD_FORMAT_VERSION:
+            manifest = {'format': BUILD_FORMAT_VERSION, 'portfolios': {}}
+        return manifest
+
+    def _write_manifest(self, manifest):
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def build_chunk(output_dir, jobs):
+    """Build one chunk of ``(portfolio_id, previous_hash)`` jobs.
+
+    Runs inside a worker process, so it only takes picklable arguments and
+    returns ``(portfolio_id, slug, content_hash, status)`` tuples.
+    """
+    previous_hashes = dict(jobs)
+    portfolios = (
+        Portfolio.objects.filter(pk__in=previous_hashes.keys(), is_public=True)
+        .select_related('user', 'user__profile')
+        .prefetch_related(*PORTFOLIO_PREFETCH)
+    )
+
+    exporter = PortfolioZipExporter()
+    template_hashes = {}
+    results = []
+
+    for portfolio in portfolios:
+        pk = str(portfolio.pk)
+        try:
+            user_profile = _get_user_profile(portfolio)
+            content_hash = content_fingerprint(
+                portfolio, user_profile, template_hashes=template_hashes, extra=BUILD_FORMAT_VERSION
+            )
+
+            if content_hash == previous_hashes.get(pk) and os.path.isdir(os.path.join(output_dir, portfolio.slug)):
+                results.append((pk, portfolio.slug, content_hash, 'unchanged'))
+                continue
+
+            _write_portfolio(output_dir, exporter, portfolio, user_profile)
+            results.append((pk, portfolio.slug, content_hash, 'built'))
+        except Exception as e:
+            logger.exception("Error building static portfolio %s: %s", portfolio.slug, e)
+            results.append((pk, portfolio.slug, None, 'failed'))
+
+    return results
+
+
+def _get_user_profile(portfolio):
+    """Return the owner's profile, or an unsaved blank one for rendering"""
+    try:
+        return portfolio.user.profile
+    except UserProfile.DoesNotExist:
+        return UserProfile(user=portfolio.user)
+
+
+def _write_portfolio(output_dir, exporter, portfolio, user_profile):
+    """Render one portfolio into a staging directory and swap it into place"""
+    final_dir = os.path.join(output_dir, portfolio.slug)
+    staging_dir = os.path.join(output_dir, f'.{portfolio.slug}.tmp')
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    images_dir = os.path.join(staging_dir, 'assets', 'images')
+    os.makedirs(images_dir)
+
+    context = exporter.build_context(portfolio, user_profile)
+    html_content = render_to_string(f'portfolio/themes/{portfolio.theme}.html', context)
+    html_content = exporter._process_html_for_offline(html_content, rewrite_cdn=False)
+
+    with open(os.path.join(staging_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        f.write(html_content)
+
+    media = media_prefetcher.fetch_portfolio_media(user_profile, portfolio)
+    for name in [*media, *media.deferred]:
+        # Keep the storage name so rewritten ``assets/images/<name>`` links resolve
+        dest_path = os.path.join(images_dir, name)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        media_prefetcher.save(media, name, dest_path)
+
+    old_dir = os.path.join(output_dir, f'.{portfolio.slug}.old')
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.isdir(final_dir):
+        os.replace(final_dir, old_dir)
+    os.replace(staging_dir, final_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
@@ -0,0 +1,157 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from .models import AggregateStat, Portfolio, PlatformCounter, ProjectTechnology, Skill
+
+# How each counter is recomputed from scratch during reconciliation
+COUNTER_QUERIES = {
+    PlatformCounter.PUBLIC_PORTFOLIOS: lambda: Portfolio.objects.filter(is_public=True).count(),
+}
+
+
+def get_counter(name):
+    """Read a platform counter, computing it on first use"""
+    value = PlatformCounter.objects.filter(name=name).values_list('value', flat=True).first()
+    if value is None:
+        value = reconcile_counter(name)
+    return value
+
+
+def increment_counter(name, delta=1):
+    """Atomically adjust a platform counter"""
+    if not delta:
+        return
+    updated = PlatformCounter.objects.filter(name=name).update(value=F('value') + delta)
+    if not updated:
+        # No row yet: seed it from the source of truth, which already
+        # includes the change being counted
+        reconcile_counter(name)
+
+
+def reconcile_counter(name):
+    """Recompute a counter from the source table and store it"""
+    value = COUNTER_QUERIES[name]()
+    PlatformCounter.objects.update_or_create(name=name, defaults={'value': value})
+    return value
+
+
+def reconcile_counters():
+    """Recompute every counter; run periodically to repair drift from bulk updates"""
+    return {name: reconcile_counter(name) for name in COUNTER_QUERIES}
+
+
+def record_export(portfolio):
+    """Count an export without touching ``updated_at``"""
+    Portfolio.objects.filter(pk=portfolio.pk).update(
+        export_count=F('export_count') + 1,
+        last_exported_at=timezone.now(),
+    )
+
+
+def skill_state(skill):
+    """The values of a skill that aggregate statistics depend on"""
+    return (skill.name, skill.category, skill.proficiency)
+
+
+def _skill_buckets(name, category, proficiency):
+    name = ' '.join(name.split())
+    return [
+        (AggregateStat.SKILL, name.casefold(), name),
+        (AggregateStat.PROFICIENCY, f"{category}:{proficiency}", category),
+    ]
+
+
+def record_skill_changes(changes):
+    """Adjust aggregates for ``(old, new)`` skill states; None means absent"""
+    deltas, labels = Counter(), {}
+    for old, new in changes:
+        for state, sign in ((old, -1), (new, 1)):
+            if state is None:
+                continue
+            for kind, key, label in _skill_buckets(*state):
+                deltas[kind, key] += sign
+                labels.setdefault((kind, key), label)
+    apply_stat_deltas(deltas, labels)
+
+
+def record_technology_changes(removed, added):
+    """Adjust aggregates for technology links, each given as ``(name, key)``"""
+    deltas, labels = Counter(), {}
+    for pairs, sign in ((removed, -1), (added, 1)):
+        for name, key in pairs:
+            deltas[AggregateStat.TECHNOLOGY, key] += sign
+            labels.setdefault((AggregateStat.TECHNOLOGY, key), name)
+    apply_stat_deltas(deltas, labels)
+
+
+def apply_stat_deltas(deltas, labels=None):
+    """Add ``{(kind, key): delta}`` to the aggregate rows, creating missing ones"""
+    deltas = {bucket: delta for bucket, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    labels = labels or {}
+    AggregateStat.objects.bulk_create([
+        AggregateStat(kind=kind, key=key, label=labels.get((kind, key), ''))
+        for kind, key in deltas
+    ], ignore_conflicts=True)
+
+    # One UPDATE per kind and delta, which is usually +1 or -1
+    grouped = defaultdict(list)
+    for (kind, key), delta in deltas.items():
+        grouped[kind, delta].append(key)
+    for (kind, delta), keys in grouped.items():
+        AggregateStat.objects.filter(kind=kind, key__in=keys).update(value=F('value') + delta)
+
+
+def reconcile_aggregates():
+    """Recompute every aggregate row from the source tables"""
+    deltas, labels = Counter(), {}
+    skills = Skill.objects.order_by().values_list('name', 'category', 'proficiency').annotate(count=Count('pk'))
+    for name, category, proficiency, count in skills:
+        for kind, key, label in _skill_buckets(name, category, proficiency):
+            deltas[kind, key] += count
+            labels.setdefault((kind, key), label)
+
+    links = ProjectTechnology.objects.order_by().values_list(
+        'technology__key', 'technology__name',
+    ).annotate(count=Count('pk'))
+    for key, name, count in links:
+        deltas[AggregateStat.TECHNOLOGY, key] += count
+        labels[AggregateStat.TECHNOLOGY, key] = name
+
+    with transaction.atomic():
+        AggregateStat.objects.all().delete()
+        AggregateStat.objects.bulk_create([
+            AggregateStat(kind=kind, key=key, label=labels[kind, key], value=value)
+            for (kind, key), value in deltas.items()
+        ], batch_size=1000)
+
+    totals = Counter(kind for kind, _ in deltas)
+    return {kind: totals[kind] for kind, _ in AggregateStat.KINDS}
+
+
+def get_platform_stats(limit=10):
+    """Top skills and technologies plus the proficiency spread per skill category"""
+    if not AggregateStat.objects.exists():
+        reconcile_aggregates()
+
+    def top(kind):
+        rows = AggregateStat.objects.filter(kind=kind, value__gt=0).order_by('-value', 'key')[:limit]
+        return [{'name': row.label, 'count': row.value} for row in rows]
+
+    categories = dict(Skill.SKILL_CATEGORIES)
+    proficiency = {}
+    for key, value in AggregateStat.objects.filter(kind=AggregateStat.PROFICIENCY, value__gt=0).values_list('key', 'value'):
+        category, _, level = key.rpartition(':')
+        proficiency.setdefault(categories.get(category, category), {})[int(level)] = value
+
+    return {
+        'top_skills': top(AggregateStat.SKILL),
+        'top_technologies': top(AggregateStat.TECHNOLOGY),
+        'proficiency': {
+            category: dict(sorted(levels.items())) for category, levels in sorted(proficiency.items())
+        },
+    }
@@ -0,0 +1,110 @@
+import re
+
+from .models import Project, ProjectTechnology, Technology
+from .stats_utils import record_technology_changes
+
+# Common alternative spellings, by case-folded name
+TECH_ALIASES = {
+    'js': 'JavaScript',
+    'javascript': 'JavaScript',
+    'ts': 'TypeScript',
+    'typescript': 'TypeScript',
+    'node': 'Node.js',
+    'nodejs': 'Node.js',
+    'node.js': 'Node.js',
+    'react': 'React',
+    'reactjs': 'React',
+    'react.js': 'React',
+    'vue': 'Vue.js',
+    'vuejs': 'Vue.js',
+    'vue.js': 'Vue.js',
+    'golang': 'Go',
+    'postgres': 'PostgreSQL',
+    'postgresql': 'PostgreSQL',
+    'k8s': 'Kubernetes',
+    'kubernetes': 'Kubernetes',
+    'python': 'Python',
+    'django': 'Django',
+}
+
+MAX_NAME_LENGTH = Technology._meta.get_field('name').max_length
+
+
+def canonical_technology(name):
+    """Return ``(display name, key)`` for a raw tech name, or None if blank"""
+    name = re.sub(r'\s+', ' ', name).strip()[:MAX_NAME_LENGTH]
+    if not name:
+        return None
+    key = name.casefold()
+    name = TECH_ALIASES.get(key, name)
+    return name, name.casefold()
+
+
+def parse_tech_stack(tech_stack):
+    """Split a comma-separated tech stack into unique canonical ``(name, key)`` pairs"""
+    technologies = {}
+    for raw in tech_stack.split(','):
+        canonical = canonical_technology(raw)
+        if canonical and canonical[1] not in technologies:
+            technologies[canonical[1]] = canonical
+    return list(technologies.values())
+
+
+def sync_project_technologies(projects):
+    """Rewrite the technology tags of ``projects`` from their tech_stack.
+
+    Costs the same handful of queries for one project or a whole batch.
+    """
+    parsed = {project.pk: parse_tech_stack(project.tech_stack) for project in projects if project.pk}
+    if not parsed:
+        return
+
+    names = {key: name for pairs in parsed.values() for name, key in pairs}
+    if names:
+        # Concurrent writers may add the same tag; the unique key settles it
+        Technology.objects.bulk_create(
+            [Technology(name=name, key=key) for key, name in names.items()], ignore_conflicts=True,
+        )
+    technology_ids = dict(Technology.objects.filter(key__in=names).values_list('key', 'pk'))
+
+    links = ProjectTechnology.objects.filter(project_id__in=parsed)
+    removed = list(links.values_list('technology__name', 'technology__key'))
+    links.delete()
+    ProjectTechnology.objects.bulk_create([
+        ProjectTechnology(project_id=project_id, technology_id=technology_ids[key], position=position)
+        for project_id, pairs in parsed.items()
+        for position, (name, key) in enumerate(pairs)
+    ])
+    record_technology_changes(removed, [pair for pairs in parsed.values() for pair in pairs])
+
+
+def unlink_project_technologies(project):
+    """Count a project's technology tags out of the aggregates before it is deleted"""
+    record_technology_changes(
+        project.project_technologies.values_list('technology__name', 'technology__key'), [],
+    )
+
+
+def get_technology(name):
+    """Look up a technology by any spelling, or None"""
+    canonical = canonical_technology(name)
+    if canonical is None:
+        return None
+    return Technology.objects.filter(key=canonical[1]).first()
+
+
+async def aget_technology(name):
+    """Async ``get_technology``"""
+    canonical = canonical_technology(name)
+    if canonical is None:
+        return None
+    return await Technology.objects.filter(key=canonical[1]).afirst()
+
+
+def public_projects_using(technology):
+    """Public projects tagged with ``technology``, newest first"""
+    return (
+        Project.objects.filter(project_technologies__technology=technology, portfolio__is_public=True)
+        .select_related('portfolio')
+        .order_by('-created_at', '-pk')
+    )
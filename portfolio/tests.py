@@ -1,3 +1,1531 @@
-from django.test import TestCase
+import asyncio
+import base64
+import datetime
+import hashlib
+import json
+import multiprocessing
+import os
+import runpy
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import tracemalloc
+import uuid
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.utils import load_backend
+from django.db import transaction
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.text import slugify
+
+from . import slug_utils
+from .admission_utils import ExportAdmission, ExportRejected
+from .analytics_utils import VisitorSketch, view_analytics
+from .async_utils import run_in_export_pool
+from .cache_utils import TwoTierCache
+from .delivery_utils import ExportCache, send_file
+from .media_utils import MediaPrefetcher, media_prefetcher
+from .models import (
+    AggregateStat, Certification, Education, Experience, PlatformCounter, Portfolio, PortfolioSearchDocument,
+    PortfolioViewStat, Project, Skill, Technology, UserProfile, UserViewStat,
+)
+from .pagination_utils import InvalidCursor, keyset_page
+from .profiling_utils import ExportProfiler, export_phase, profile_export
+from .replica_utils import (
+    STICKY_COOKIE, ReplicaRouter, ReplicaStickinessMiddleware, _replica_reads, read_from_replica, replica_reads,
+)
+from .search_utils import search_index
+from .slug_utils import create_with_unique_slug, next_free_slug
+from .static_site_utils import StaticSiteBuilder
+from .stats_utils import get_counter, get_platform_stats, reconcile_aggregates, reconcile_counters, record_export
+from .technology_utils import canonical_technology, parse_tech_stack
+from .zip_utils import PortfolioZipExporter, zip_exporter
+
+_storage_root = None
+_storage_settings = None
+
+
+def setUpModule():
+    """Point every on-disk cache and output directory at a scratch directory"""
+    global _storage_root, _storage_settings
+    _storage_root = tempfile.mkdtemp(prefix='devport-tests-')
+    _storage_settings = override_settings(
+        CACHES={'default': {**settings.CACHES['default'], 'LOCATION': os.path.join(_storage_root, 'cache')}},
+        EXPORT_CACHE_ROOT=os.path.join(_storage_root, 'export_cache'),
+        EXPORT_ADMISSION_ROOT=os.path.join(_storage_root, 'export_cache', 'admission'),
+        EXPORT_PROFILE_ROOT=os.path.join(_storage_root, 'export_profiles'),
+        STATIC_SITE_ROOT=os.path.join(_storage_root, 'public_site'),
+    )
+    _storage_settings.enable()
+
+
+def tearDownModule():
+    _storage_settings.disable()
+    shutil.rmtree(_storage_root, ignore_errors=True)
+
+
+class UniqueSlugTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+
+    def make(self, title):
+        return create_with_unique_slug(Portfolio(user=self.user, title=title))
+
+    def test_first_free_suffix_in_one_query(self):
+        for slug in ['my-site', 'my-site-1', 'my-site-3', 'my-site-design', 'my-sites']:
+            Portfolio.objects.create(user=self.user, title=slug, slug=slug)
+
+        with self.assertNumQueries(1) as queries:
+            self.assertEqual(next_free_slug('my-site'), 'my-site-2')
+        # Slugs that merely share the base's first characters aren't loaded
+        self.assertIn("'my-site-%'", queries.captured_queries[0]['sql'])
+        self.assertNotIn("'my-site%'", queries.captured_queries[0]['sql'])
+
+    def test_long_titles_fit_the_slug_column(self):
+        title = 'a' * 120
+        first, second = self.make(title), self.make(title)
+        max_length = Portfolio._meta.get_field('slug').max_length
+        self.assertEqual(len(first.slug), max_length)
+        self.assertTrue(second.slug.endswith('-1'))
+        self.assertLessEqual(len(second.slug), max_length)
+
+    def test_lost_race_is_retried(self):
+        real_next_free_slug = slug_utils.next_free_slug
+        calls = []
+
+        def racing_next_free_slug(base):
+            slug = real_next_free_slug(base)
+            if not calls:
+                # Another request grabs the slug between lookup and insert
+                Portfolio.objects.create(user=self.user, title='Race', slug=slug)
+            calls.append(slug)
+            return slug
+
+        with mock.patch.object(slug_utils, 'next_free_slug', side_effect=racing_next_free_slug):
+            portfolio = self.make('Race')
+
+        self.assertEqual(calls, ['race', 'race-1'])
+        self.assertEqual(portfolio.slug, 'race-1')
+
+
+class ConcurrentSlugTests(TransactionTestCase):
+    def test_concurrent_creates_get_distinct_slugs(self):
+        user = User.objects.create_user('owner', password='pass')
+        workers = 4
+        barrier = threading.Barrier(workers)
+        slugs, errors = [], []
+
+        def create():
+            try:
+                barrier.wait()
+                slugs.append(create_with_unique_slug(Portfolio(user=user, title='Same Title')).slug)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=create) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(slugs), ['same-title', 'same-title-1', 'same-title-2', 'same-title-3'])
+
+
+class BatchItemsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Batch', slug='batch')
+        self.url = reverse('portfolio:batch_portfolio_items', args=['batch'])
+        self.client.force_login(self.user)
+
+    def post(self, operations):
+        return self.client.post(self.url, json.dumps({'operations': operations}), content_type='application/json')
+
+    def test_mixed_batch_is_applied(self):
+        skill = Skill.objects.create(portfolio=self.portfolio, name='Go')
+        job = Experience.objects.create(
+            portfolio=self.portfolio, company='Acme', position='Dev',
+            start_date=datetime.date(2020, 1, 1), description='Work',
+        )
+        operations = [
+            {'op': 'create', 'type': 'skill', 'data': {'name': f'Skill {i}', 'category': 'tools', 'proficiency': 4}}
+            for i in range(40)
+        ] + [
+            {'op': 'update', 'type': 'experience', 'id': job.pk, 'data': {'position': 'Lead'}},
+            {'op': 'delete', 'type': 'skill', 'id': skill.pk},
+        ]
+
+        response = self.post(operations)
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertTrue(all(result['id'] for result in results))
+        self.assertEqual(self.portfolio.skills.count(), 40)
+        job.refresh_from_db()
+        self.assertEqual((job.position, job.company), ('Lead', 'Acme'))
+
+    def test_invalid_operation_rolls_back_the_batch(self):
+        response = self.post([
+            {'op': 'create', 'type': 'skill', 'data': {'name': 'Python', 'category': 'programming', 'proficiency': 5}},
+            {'op': 'create', 'type': 'education', 'data': {'institution': 'MIT'}},
+            {'op': 'delete', 'type': 'project', 'id': 999},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        results = response.json()['results']
+        self.assertEqual([result['success'] for result in results], [True, False, False])
+        self.assertIn('degree', results[1]['errors'])
+        self.assertEqual(results[2]['errors'], {'id': ['Item not found']})
+        self.assertFalse(self.portfolio.skills.exists())
+
+    def test_other_users_items_are_not_found(self):
+        other = Portfolio.objects.create(user=User.objects.create_user('other'), title='Other', slug='other')
+        skill = Skill.objects.create(portfolio=other, name='Rust')
+
+        response = self.post([{'op': 'delete', 'type': 'skill', 'id': skill.pk}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Skill.objects.filter(pk=skill.pk).exists())
+
+    def test_duplicate_skill_name_conflicts(self):
+        Skill.objects.create(portfolio=self.portfolio, name='Go')
+
+        response = self.post([{'op': 'create', 'type': 'skill', 'data': {'name': 'Go', 'category': 'tools', 'proficiency': 3}}])
+
+        self.assertEqual(response.status_code, 409)
+
+
+class ReorderItemsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Order', slug='order')
+        self.skills = [Skill.objects.create(portfolio=self.portfolio, name=name, order=i) for i, name in enumerate('abcd')]
+        self.client.force_login(self.user)
+
+    def post(self, ids, slug='order'):
+        url = reverse('portfolio:reorder_portfolio_items', args=[slug, 'skill'])
+        return self.client.post(url, json.dumps({'ids': ids}), content_type='application/json')
+
+    def test_new_order_is_saved_with_one_update(self):
+        a, b, c, d = [skill.pk for skill in self.skills]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([b, a, c, d])
+
+        # One SELECT that also checks ownership, one UPDATE for the moved rows
+        skill_queries = [q['sql'].split()[0] for q in queries if 'portfolio_skill' in q['sql']]
+        self.assertEqual(skill_queries, ['SELECT', 'UPDATE'])
+
+        self.assertEqual(response.json(), {'success': True, 'updated': 2})
+        self.assertEqual(list(self.portfolio.skills.order_by('order').values_list('pk', flat=True)), [b, a, c, d])
+
+    def test_partial_or_foreign_lists_are_rejected(self):
+        self.assertEqual(self.post([skill.pk for skill in self.skills[:3]]).status_code, 400)
+
+        Portfolio.objects.create(user=User.objects.create_user('other'), title='Other', slug='other')
+        self.assertEqual(self.post([skill.pk for skill in self.skills], slug='other').status_code, 404)
+        # An empty list matches a portfolio without items, so ownership is checked separately
+        self.assertEqual(self.post([], slug='other').status_code, 404)
+        self.assertEqual(self.post([], slug='missing').status_code, 404)
+        self.assertEqual(self.client.post(
+            reverse('portfolio:reorder_portfolio_items', args=['order', 'education']),
+            json.dumps({'ids': []}), content_type='application/json',
+        ).json(), {'success': True, 'updated': 0})
+
+
+class UpdateItemTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Edit', slug='edit')
+        self.job = Experience.objects.create(
+            portfolio=self.portfolio, company='Acme', position='Dev',
+            start_date=datetime.date(2020, 1, 1), description='Work',
+        )
+        self.url = reverse('portfolio:update_portfolio_item', args=['edit', 'experience', self.job.pk])
+        self.client.force_login(self.user)
+
+    def post(self, data):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, json.dumps(data), content_type='application/json')
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "portfolio_')]
+        return response, updates
+
+    def test_only_changed_columns_are_written(self):
+        response, updates = self.post({'position': 'Lead', 'company': 'Acme', 'start_date': '2020-01-01'})
+
+        self.assertEqual(response.json()['changed'], ['position'])
+        self.assertEqual(len(updates), 2)
+        self.assertIn('SET "position" =', updates[0])
+        self.assertNotIn('"company"', updates[0])
+        self.portfolio.refresh_from_db()
+        self.assertEqual(self.portfolio.content_version, 1)
+
+    def test_unchanged_payload_writes_nothing(self):
+        response, updates = self.post({'position': 'Dev', 'description': 'Work'})
+
+        self.assertEqual(response.json()['changed'], [])
+        self.assertEqual(updates, [])
+        self.portfolio.refresh_from_db()
+        self.assertEqual(self.portfolio.content_version, 0)
+
+    def test_payload_is_validated_by_the_form(self):
+        response, updates = self.post({'start_date': 'not a date'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('start_date', response.json()['errors'])
+        self.assertEqual(updates, [])
+
+    def test_project_can_be_loaded_for_editing(self):
+        project = Project.objects.create(
+            portfolio=self.portfolio, name='App', description='An app', tech_stack='js, Django',
+        )
+        url = reverse('portfolio:get_portfolio_item', args=['edit', 'project', project.pk])
+
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tech_stack'], 'js, Django')
+
+
+class EditFragmentTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        UserProfile.objects.create(user=self.user)
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Frag', slug='frag')
+        self.client.force_login(self.user)
+
+    def test_edit_page_renders_sections_from_partials(self):
+        Skill.objects.create(portfolio=self.portfolio, name='Django')
+
+        response = self.client.get(reverse('portfolio:edit', args=['frag']))
+
+        self.assertContains(response, 'data-type="skill"')
+        self.assertContains(response, 'No work experience added yet')
+
+    def test_add_returns_the_section_fragment(self):
+        Skill.objects.create(portfolio=self.portfolio, name='Django')
+        url = reverse('portfolio:add_skill', args=['frag']) + '?fragment=section'
+
+        data = self.client.post(url, {'name': 'Python', 'category': 'programming', 'proficiency': 5}).json()
+
+        self.assertEqual(data['fragment'], 'section')
+        self.assertEqual(data['html'].count('data-type="skill"'), 2)
+
+    def test_update_returns_the_item_fragment(self):
+        cert = Certification.objects.create(
+            portfolio=self.portfolio, name='AWS', issuing_organization='Amazon', issue_date=datetime.date(2024, 5, 1),
+        )
+        url = reverse('portfolio:update_portfolio_item', args=['frag', 'certification', cert.pk]) + '?fragment=item'
+
+        data = self.client.post(url, json.dumps({'name': 'AWS SA'}), content_type='application/json').json()
+
+        self.assertIn('AWS SA', data['html'])
+        self.assertIn(f'data-id="{cert.pk}"', data['html'])
+
+    def test_fragments_are_opt_in(self):
+        url = reverse('portfolio:add_skill', args=['frag'])
+
+        data = self.client.post(url, {'name': 'Go', 'category': 'programming', 'proficiency': 3}).json()
+
+        self.assertNotIn('html', data)
+
+
+class PortfolioAPITests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', first_name='Ada', last_name='Lovelace')
+        UserProfile.objects.create(user=self.user, bio='Engines')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='API', slug='api', is_public=True)
+        Skill.objects.create(portfolio=self.portfolio, name='Python', category='programming')
+        Experience.objects.create(
+            portfolio=self.portfolio, company='Acme', position='Dev',
+            start_date=datetime.date(2020, 1, 1), description='Work',
+        )
+        self.url = reverse('portfolio:api_portfolio', args=['api'])
+
+    def test_document_is_built_in_constant_queries_then_cached(self):
+        # Portfolio with owner and profile, then one query per collection
+        with self.assertNumQueries(6):
+            data = self.client.get(self.url).json()
+        self.assertEqual(data['owner']['name'], 'Ada Lovelace')
+        self.assertEqual(data['skills'][0]['name'], 'Python')
+        self.assertEqual(data['experience'][0]['start_date'], '2020-01-01')
+
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+
+    def test_sparse_fields(self):
+        data = self.client.get(self.url, {'fields': 'title,skills.name,profile.bio'}).json()
+
+        self.assertEqual(data, {
+            'api_version': 1,
+            'title': 'API',
+            'skills': [{'name': 'Python'}],
+            'profile': {'bio': 'Engines'},
+        })
+        self.assertEqual(self.client.get(self.url, {'fields': 'secret'}).status_code, 400)
+
+    def test_etag_revalidation_and_content_changes(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        Portfolio.objects.filter(pk=self.portfolio.pk).bump_content_version()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_owner_changes_are_served(self):
+        etag = self.client.get(self.url)['ETag']
+
+        self.user.last_name = 'King'
+        self.user.email = 'ada@example.com'
+        self.user.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['owner']['name'], 'Ada King')
+        self.assertEqual(response.json()['owner']['email'], 'ada@example.com')
+
+    def test_private_portfolios_are_not_served(self):
+        Portfolio.objects.filter(pk=self.portfolio.pk).update(is_public=False)
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', first_name='Grace', last_name='Hopper')
+        UserProfile.objects.create(user=self.user, bio='Compiler pioneer')
+        self.url = reverse('portfolio:api_search')
+
+    def make(self, title, skills=(), tech='', is_public=True):
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio = Portfolio.objects.create(user=self.user, title=title, slug=slugify(title), is_public=is_public)
+        with self.captureOnCommitCallbacks(execute=True):
+            for name in skills:
+                Skill.objects.create(portfolio=portfolio, name=name)
+            if tech:
+                Project.objects.create(portfolio=portfolio, name='P', description='D', tech_stack=tech)
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+        return portfolio
+
+    def search(self, q, **params):
+        return self.client.get(self.url, {'q': q, **params}).json()
+
+    def test_ranked_prefix_search(self):
+        self.make('Backend work', skills=['Django'], tech='PostgreSQL, Redis')
+        self.make('Django Portfolio', skills=['Django', 'Python'])
+        self.make('Frontend', tech='React')
+
+        data = self.search('djan')
+
+        self.assertEqual([r['slug'] for r in data['results']], ['django-portfolio', 'backend-work'])
+        self.assertEqual([r['slug'] for r in self.search('redis')['results']], ['backend-work'])
+        self.assertEqual([r['slug'] for r in self.search('compiler react')['results']], ['frontend'])
+
+    def test_private_portfolios_and_later_changes(self):
+        portfolio = self.make('Hidden', skills=['Rust'], is_public=False)
+        self.assertEqual(self.search('rust')['results'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio.is_public = True
+            portfolio.save()
+        self.assertEqual(len(self.search('rust')['results']), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            portfolio.delete()
+        self.assertEqual(self.search('rust')['results'], [])
+
+    def test_pagination(self):
+        for i in range(5):
+            self.make(f'Python {i}', skills=['Python'])
+
+        first = self.search('python', page_size=3)
+        second = self.search('python', page_size=3, page=2)
+
+        self.assertTrue(first['has_next'])
+        self.assertFalse(second['has_next'])
+        self.assertEqual(len({r['slug'] for r in first['results'] + second['results']}), 5)
+
+    def test_rebuild(self):
+        self.make('Go services', skills=['Go'])
+        PortfolioSearchDocument.objects.all().delete()
+
+        self.assertEqual(search_index.rebuild(), 1)
+        self.assertEqual(len(self.search('go')['results']), 1)
+
+
+class TechnologyTagTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Tags', slug='tags', is_public=True)
+        self.client.force_login(self.user)
+
+    def tags(self, project):
+        return list(project.project_technologies.values_list('technology__name', flat=True))
+
+    def test_spellings_share_one_canonical_tag(self):
+        self.assertEqual(canonical_technology('  ReactJS '), ('React', 'react'))
+        self.assertEqual(canonical_technology('Elixir'), ('Elixir', 'elixir'))
+        self.assertEqual(parse_tech_stack('js, JavaScript,, Rust ,rust'), [('JavaScript', 'javascript'), ('Rust', 'rust')])
+
+    def test_saved_projects_are_tagged(self):
+        first = Project.objects.create(portfolio=self.portfolio, name='A', description='D', tech_stack='Python, k8s')
+        second = Project.objects.create(portfolio=self.portfolio, name='B', description='D', tech_stack='python')
+
+        self.assertEqual(self.tags(first), ['Python', 'Kubernetes'])
+        self.assertEqual(self.tags(second), ['Python'])
+        self.assertEqual(Technology.objects.count(), 2)
+
+        second.tech_stack = 'Go'
+        second.save()
+        self.assertEqual(self.tags(second), ['Go'])
+
+    def test_batch_and_inline_edits_are_tagged(self):
+        url = reverse('portfolio:batch_portfolio_items', args=['tags'])
+        data = {'name': 'Batch', 'description': 'D', 'tech_stack': 'nodejs, Postgres'}
+        response = self.client.post(
+            url, json.dumps({'operations': [{'op': 'create', 'type': 'project', 'data': data}]}),
+            content_type='application/json',
+        )
+        project = Project.objects.get(pk=response.json()['results'][0]['id'])
+        self.assertEqual(self.tags(project), ['Node.js', 'PostgreSQL'])
+
+        url = reverse('portfolio:update_portfolio_item', args=['tags', 'project', project.pk])
+        self.client.post(url, json.dumps({'tech_stack': 'Rust'}), content_type='application/json')
+        self.assertEqual(self.tags(project), ['Rust'])
+
+    def test_projects_by_tag(self):
+        Project.objects.create(portfolio=self.portfolio, name='Public', description='D', tech_stack='TypeScript')
+        hidden = Portfolio.objects.create(user=self.user, title='Hidden', slug='hidden')
+        Project.objects.create(portfolio=hidden, name='Private', description='D', tech_stack='ts')
+
+        data = self.client.get(reverse('portfolio:api_technology_projects', args=['ts'])).json()
+
+        self.assertEqual(data['technology'], 'TypeScript')
+        self.assertEqual([r['name'] for r in data['results']], ['Public'])
+        response = self.client.get(reverse('portfolio:api_technology_projects', args=['cobol']))
+        self.assertEqual(response.status_code, 404)
+
+    def test_display_keeps_the_owners_spelling(self):
+        Project.objects.create(portfolio=self.portfolio, name='A', description='D', tech_stack='vue, Python')
+        other = Portfolio.objects.create(user=self.user, title='Other', slug='other')
+        Project.objects.create(portfolio=other, name='B', description='D', tech_stack='VUEJS')
+
+        for projects in (
+            self.portfolio.projects.all(),
+            self.portfolio.projects.prefetch_related('project_technologies__technology'),
+        ):
+            self.assertEqual(projects[0].get_tech_list(), ['vue', 'Python'])
+        self.assertEqual(self.tags(Project.objects.get(name='B')), ['Vue.js'])
+
+
+class PlatformCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+
+    def public_count(self):
+        return get_counter(PlatformCounter.PUBLIC_PORTFOLIOS)
+
+    def test_counter_follows_creates_visibility_changes_and_deletes(self):
+        self.assertEqual(self.public_count(), 0)
+        public = Portfolio.objects.create(user=self.user, title='Public', slug='public', is_public=True)
+        private = Portfolio.objects.create(user=self.user, title='Private', slug='private')
+        self.assertEqual(self.public_count(), 1)
+
+        private = Portfolio.objects.get(pk=private.pk)
+        private.is_public = True
+        private.save()
+        self.assertEqual(self.public_count(), 2)
+        # Saving without a visibility change doesn't count twice
+        private.save()
+        self.assertEqual(self.public_count(), 2)
+
+        public.is_public = False
+        public.save()
+        self.assertEqual(self.public_count(), 1)
+        public.delete()
+        self.assertEqual(self.public_count(), 1)
+        Portfolio.objects.get(pk=private.pk).delete()
+        self.assertEqual(self.public_count(), 0)
+        self.assertEqual(reconcile_counters(), {PlatformCounter.PUBLIC_PORTFOLIOS: 0})
+
+    def test_record_export_counts_without_touching_updated_at(self):
+        portfolio = Portfolio.objects.create(user=self.user, title='Export', slug='export', is_public=True)
+        updated_at = portfolio.updated_at
+
+        record_export(portfolio)
+        record_export(portfolio)
+
+        portfolio.refresh_from_db()
+        self.assertEqual(portfolio.export_count, 2)
+        self.assertIsNotNone(portfolio.last_exported_at)
+        self.assertEqual(portfolio.updated_at, updated_at)
+        self.assertEqual(self.public_count(), 1)
+
+    def test_item_count_annotations_match_related_rows(self):
+        today = datetime.date.today()
+        full = Portfolio.objects.create(user=self.user, title='Full', slug='full')
+        Portfolio.objects.create(user=self.user, title='Empty', slug='empty')
+        Education.objects.create(portfolio=full, institution='Uni', degree='BSc', start_date=today)
+        for i in range(2):
+            Experience.objects.create(
+                portfolio=full, company='Co', position=f'Role {i}', description='Work', start_date=today,
+            )
+        for name in ('Python', 'Go', 'SQL'):
+            Skill.objects.create(portfolio=full, name=name)
+        Project.objects.create(portfolio=full, name='App', description='An app')
+        Certification.objects.create(portfolio=full, name='Cert', issuing_organization='Org', issue_date=today)
+
+        for portfolio in Portfolio.objects.filter(user=self.user).with_item_counts():
+            with self.subTest(portfolio=portfolio.slug):
+                counts = {
+                    'education_count': portfolio.education.count(),
+                    'experience_count': portfolio.experience.count(),
+                    'skills_count': portfolio.skills.count(),
+                    'projects_count': portfolio.projects.count(),
+                    'certifications_count': portfolio.certifications.count(),
+                }
+                self.assertEqual({name: getattr(portfolio, name) for name in counts}, counts)
+                self.assertEqual(portfolio.item_count, sum(counts.values()))
+        self.assertEqual(Portfolio.objects.with_item_counts().get(slug='full').item_count, 8)
+
+
+class AggregateStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Stats', slug='stats')
+        self.client.force_login(self.user)
+
+    def snapshot(self):
+        return {
+            (kind, key): value
+            for kind, key, value in AggregateStat.objects.exclude(value=0).values_list('kind', 'key', 'value')
+        }
+
+    def assertMatchesRecompute(self):
+        incremental = self.snapshot()
+        reconcile_aggregates()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_signals_keep_aggregates_current(self):
+        other = Portfolio.objects.create(user=self.user, title='Other', slug='other')
+        Skill.objects.create(portfolio=self.portfolio, name='Python', category='programming', proficiency=5)
+        Skill.objects.create(portfolio=other, name='python ', category='programming', proficiency=4)
+        go = Skill.objects.create(portfolio=self.portfolio, name='Go', category='programming', proficiency=3)
+        Project.objects.create(portfolio=self.portfolio, name='A', description='D', tech_stack='Django, js')
+        Project.objects.create(portfolio=other, name='B', description='D', tech_stack='JavaScript')
+
+        go = Skill.objects.get(pk=go.pk)
+        go.name, go.category = 'Rust', 'tools'
+        go.save()
+        Skill.objects.get(name='Python').delete()
+        other.delete()
+
+        self.assertMatchesRecompute()
+        stats = get_platform_stats()
+        self.assertEqual(stats['top_skills'], [{'name': 'Rust', 'count': 1}])
+        self.assertEqual(
+            {tech['name']: tech['count'] for tech in stats['top_technologies']},
+            {'Django': 1, 'JavaScript': 1},
+        )
+        self.assertEqual(stats['proficiency'], {'Tools & Technologies': {3: 1}})
+
+    def test_bulk_edit_paths_keep_aggregates_current(self):
+        skill = Skill.objects.create(portfolio=self.portfolio, name='Go', category='programming')
+        doomed = Skill.objects.create(portfolio=self.portfolio, name='Perl', category='programming')
+        self.client.post(
+            reverse('portfolio:batch_portfolio_items', args=['stats']),
+            json.dumps({'operations': [
+                {'op': 'create', 'type': 'skill', 'data': {'name': 'SQL', 'category': 'databases', 'proficiency': 4}},
+                {'op': 'update', 'type': 'skill', 'id': skill.pk, 'data': {'proficiency': 5}},
+                {'op': 'delete', 'type': 'skill', 'id': doomed.pk},
+                {'op': 'create', 'type': 'project', 'data': {'name': 'P', 'description': 'D', 'tech_stack': 'k8s'}},
+            ]}),
+            content_type='application/json',
+        )
+        self.client.post(
+            reverse('portfolio:update_portfolio_item', args=['stats', 'skill', skill.pk]),
+            json.dumps({'name': 'Golang'}), content_type='application/json',
+        )
+
+        self.assertMatchesRecompute()
+        self.assertEqual(self.snapshot()[AggregateStat.SKILL, 'golang'], 1)
+        self.assertEqual(self.snapshot()[AggregateStat.TECHNOLOGY, 'kubernetes'], 1)
+
+    def test_stats_are_read_from_a_few_rows(self):
+        for i in range(20):
+            Skill.objects.create(portfolio=self.portfolio, name=f'Skill {i}', category='tools')
+
+        with self.assertNumQueries(4):
+            stats = get_platform_stats(limit=5)
+        self.assertEqual(len(stats['top_skills']), 5)
+        self.assertEqual(self.client.get(reverse('portfolio:api_stats')).json()['proficiency'], {
+            'Tools & Technologies': {'3': 20},
+        })
+
+
+@override_settings(VIEW_ANALYTICS_FLUSH_INTERVAL=3600, VIEW_ANALYTICS_MAX_PENDING=1000)
+class ViewAnalyticsTests(TestCase):
+    def setUp(self):
+        view_analytics.pending.clear()
+        self.addCleanup(view_analytics.pending.clear)
+        self.user = User.objects.create_user('owner', password='pass')
+        UserProfile.objects.create(user=self.user)
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Seen', slug='seen', is_public=True)
+        self.url = reverse('portfolio:public', args=['seen'])
+
+    def visit(self, address, agent='Mozilla/5.0'):
+        self.assertEqual(self.client.get(self.url, REMOTE_ADDR=address, HTTP_USER_AGENT=agent).status_code, 200)
+
+    def test_views_are_buffered_then_flushed_in_one_batch(self):
+        for address in ['10.0.0.1', '10.0.0.2', '10.0.0.1']:
+            self.visit(address)
+        self.visit('10.0.0.3', agent='Googlebot/2.1')
+        self.assertFalse(PortfolioViewStat.objects.exists())
+
+        self.assertEqual(view_analytics.flush(), 1)
+        self.visit('10.0.0.3')
+        view_analytics.flush()
+
+        stat = PortfolioViewStat.objects.get(portfolio=self.portfolio, date=timezone.localdate())
+        self.assertEqual((stat.views, stat.visitors), (4, 3))
+
+    def test_flush_is_triggered_by_the_interval(self):
+        with override_settings(VIEW_ANALYTICS_FLUSH_INTERVAL=0):
+            self.visit('10.0.0.1')
+        self.assertEqual(PortfolioViewStat.objects.get(portfolio=self.portfolio).views, 1)
+
+    def test_sketch_estimates_and_merges(self):
+        first, second = VisitorSketch(), VisitorSketch()
+        for i in range(20000):
+            (first if i % 2 else second).add(int.from_bytes(hashlib.blake2b(str(i).encode(), digest_size=8).digest(), 'big'))
+        self.assertAlmostEqual(first.estimate(), 10000, delta=1000)
+        first.merge(VisitorSketch(bytes(second)))
+        self.assertAlmostEqual(first.estimate(), 20000, delta=2000)
+
+    def test_dashboard_shows_recent_views(self):
+        other = Portfolio.objects.create(user=self.user, title='Other', slug='other', is_public=True)
+        self.visit('10.0.0.1')
+        view_analytics.flush()
+        self.url = reverse('portfolio:public', args=['other'])
+        self.visit('10.0.0.1')
+
+        self.client.login(username='owner', password='pass')
+        response = self.client.get(reverse('portfolio:dashboard'))
+        self.assertEqual(response.context['total_views'], {'views': 2, 'visitors': 1})
+        rows = {portfolio.pk: portfolio.recent_views for portfolio in response.context['portfolios']}
+        self.assertEqual(rows[other.pk], {'views': 1, 'visitors': 1})
+        self.assertContains(response, 'in 30 days')
+
+    @override_settings(DASHBOARD_PAGE_SIZE=1)
+    def test_dashboard_total_comes_from_the_daily_rollup(self):
+        for slug in ('second', 'third'):
+            Portfolio.objects.create(user=self.user, title=slug, slug=slug, is_public=True)
+        for slug in ('seen', 'second', 'third'):
+            self.url = reverse('portfolio:public', args=[slug])
+            self.visit('10.0.0.1')
+        view_analytics.flush()
+        rollup = UserViewStat.objects.get(user=self.user, date=timezone.localdate())
+        self.assertEqual(rollup.views, 3)
+
+        self.client.login(username='owner', password='pass')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('portfolio:dashboard'))
+        self.assertEqual(response.context['total_views'], {'views': 3, 'visitors': 1})
+        # Per-portfolio stats are read for the one portfolio on the page
+        [page_query] = [q['sql'] for q in queries if 'portfolio_portfolioviewstat' in q['sql']]
+        self.assertIn(f"IN ('{response.context['portfolios'][0].pk.hex}')", page_query)
+
+        # "Load more" skips the total
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(
+                reverse('portfolio:dashboard'), {'cursor': response.context['next_cursor']},
+                HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            )
+        self.assertFalse([q for q in queries if 'portfolio_userviewstat' in q['sql']])
+
+
+@override_settings(DATABASE_REPLICA_ALIASES=['replica1'])
+class ReplicaRoutingTests(TransactionTestCase):
+    # Not TestCase: its wrapping transaction would pin every read to the primary
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+
+    def request(self, view, cookies=None):
+        request = RequestFactory().get('/')
+        request.COOKIES.update(cookies or {})
+        return ReplicaStickinessMiddleware(view)(request)
+
+    def test_only_opted_in_reads_use_a_replica(self):
+        routes = []
+
+        def view(request):
+            routes.append(self.router.db_for_read(Portfolio))
+            with replica_reads():
+                routes.append(self.router.db_for_read(Portfolio))
+                with transaction.atomic():
+                    routes.append(self.router.db_for_read(Portfolio))
+            return HttpResponse()
+
+        self.request(view)
+
+        self.assertEqual(routes, ['default', 'replica1', 'default'])
+        self.assertFalse(self.router.allow_migrate('replica1', 'portfolio'))
+
+    def test_reads_stick_to_the_primary_after_a_write(self):
+        routes = []
+
+        def read_then_write(request):
+            with replica_reads():
+                routes.append(self.router.db_for_read(Portfolio))
+                self.assertEqual(self.router.db_for_write(Portfolio), 'default')
+                routes.append(self.router.db_for_read(Portfolio))
+            return HttpResponse()
+
+        def read(request):
+            with replica_reads():
+                routes.append(self.router.db_for_read(Portfolio))
+            return HttpResponse()
+
+        self.assertIn(STICKY_COOKIE, self.request(read_then_write).cookies)
+        self.assertNotIn(STICKY_COOKIE, self.request(read, {STICKY_COOKIE: '1'}).cookies)
+        self.request(read)
+
+        self.assertEqual(routes, ['replica1', 'default', 'default', 'replica1'])
+
+    def test_replica_settings_follow_the_database_vendor(self):
+        def replica(**env):
+            env = {'DATABASE_REPLICAS': 'replica.sqlite3', **env}
+            with mock.patch.dict(os.environ, env):
+                databases = runpy.run_path(str(settings.BASE_DIR / 'devport_project' / 'settings.py'))['DATABASES']
+            return databases['default'], databases['replica1']
+
+        for env in ({}, {'SQLITE_PERFORMANCE_MODE': 'True'}):
+            with self.subTest(env=env):
+                default, replica1 = replica(**env)
+                self.assertEqual(replica1['NAME'], 'replica.sqlite3')
+                self.assertEqual(replica1['ENGINE'], default['ENGINE'])
+
+        default, replica1 = replica(DATABASE_ENGINE='django.db.backends.postgresql', DATABASE_NAME='devport')
+        self.assertEqual((replica1['NAME'], replica1['HOST']), ('devport', 'replica.sqlite3'))
+
+    def test_public_views_opt_in(self):
+        user = User.objects.create_user('owner', password='pass')
+        UserProfile.objects.create(user=user)
+        Portfolio.objects.create(user=user, title='Public', slug='public', is_public=True)
+        routes = []
+        route = ReplicaRouter.db_for_read
+
+        def db_for_read(router, model, **hints):
+            # Record the decision but query the test database
+            routes.append(route(router, model, **hints))
+            return 'default'
+
+        with mock.patch.object(ReplicaRouter, 'db_for_read', db_for_read):
+            self.assertEqual(self.client.get(reverse('portfolio:public', args=['public'])).status_code, 200)
+        self.assertIn('replica1', routes)
+
+
+class SQLitePerformanceBackendTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.path = f'{tmpdir.name}/tuned.sqlite3'
+        options = {**settings.SQLITE_PERFORMANCE_OPTIONS, 'timeout': 0}
+        backend = load_backend('portfolio.sqlite_backend')
+        self.tuned = backend.DatabaseWrapper({**connection.settings_dict, 'NAME': self.path, 'OPTIONS': options}, 'tuned')
+        self.addCleanup(self.tuned.close)
+
+    def test_pragmas_are_applied_to_new_connections(self):
+        with self.tuned.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+
+    def test_transactions_take_the_write_lock_up_front(self):
+        self.tuned.ensure_connection()
+        self.tuned._start_transaction_under_autocommit()
+        self.addCleanup(self.tuned.cursor().execute, 'ROLLBACK')
+
+        other = sqlite3.connect(self.path, timeout=0)
+        self.addCleanup(other.close)
+        with self.assertRaisesMessage(sqlite3.OperationalError, 'locked'):
+            other.execute('BEGIN IMMEDIATE')
+
+
+class SessionWriteTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', password='pass')
+        UserProfile.objects.create(user=self.user)
+        self.client.post(reverse('portfolio:login'), {'username': 'owner', 'password': 'pass'})
+        self.url = reverse('portfolio:dashboard')
+
+    def session_writes(self, requests=1):
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+        return [q['sql'] for q in queries if 'django_session' in q['sql'] and not q['sql'].startswith('SELECT')]
+
+    def test_unchanged_sessions_are_not_rewritten(self):
+        self.assertEqual(self.session_writes(requests=10), [])
+
+    def test_changed_data_is_written(self):
+        session = self.client.session
+        session['theme'] = 'dark'
+        session.save()
+        cache.clear()
+
+        self.assertEqual(self.client.session['theme'], 'dark')
+
+    def test_expiry_is_extended_once_per_interval(self):
+        with mock.patch('portfolio.session_utils.time.time', return_value=time.time() + 301):
+            self.assertEqual(len(self.session_writes(requests=3)), 1)
+
+
+class TwoTierCacheTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.cache = TwoTierCache(tmpdir.name, {'OPTIONS': {'L1_MAX_ENTRIES': 2}})
+
+    def in_other_process(self, target):
+        process = multiprocessing.get_context('fork').Process(target=target)
+        process.start()
+        process.join()
+        self.assertEqual(process.exitcode, 0)
+
+    def test_writes_in_another_process_invalidate_l1(self):
+        self.cache.set('doc', {'title': 'Old'})
+        self.assertEqual(self.cache.get('doc'), {'title': 'Old'})
+        self.assertEqual(self.cache.get('doc'), {'title': 'Old'})
+
+        self.in_other_process(lambda: self.cache.set('doc', {'title': 'New'}))
+        self.assertEqual(self.cache.get('doc'), {'title': 'New'})
+
+        self.in_other_process(lambda: self.cache.delete('doc'))
+        self.assertIsNone(self.cache.get('doc'))
+
+        stats = self.cache.stats()
+        self.assertEqual((stats['l1']['hits'], stats['l1']['stale']), (1, 2))
+        self.assertEqual((stats['l2']['hits'], stats['l2']['misses']), (2, 1))
+
+    def test_l1_is_a_bounded_lru(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+            self.cache.get(key)
+        self.cache.get('b')
+
+        stats = self.cache.stats()['l1']
+        self.assertEqual((stats['entries'], stats['evictions'], stats['hits']), (2, 1, 1))
+        # Evicted from L1, still served by L2
+        self.assertEqual(self.cache.get('a'), 'a')
+        self.assertEqual(self.cache.stats()['l2']['hits'], 4)
+
+    def test_racing_writers_leave_no_stale_l1_entry(self):
+        # Another process writes and bumps between our L2 write and our bump
+        l2_set = self.cache._l2.set
+        raced = []
+
+        def set_then_race(*args, **kwargs):
+            l2_set(*args, **kwargs)
+            if not raced:
+                raced.append(True)
+                self.in_other_process(lambda: self.cache.set('doc', 'theirs'))
+
+        with mock.patch.object(self.cache._l2, 'set', set_then_race):
+            self.cache.set('doc', 'ours')
+        self.assertEqual(self.cache.get('doc'), 'theirs')
+
+    def test_expiry_and_clear(self):
+        self.cache.set('short', 1, timeout=0)
+        self.assertIsNone(self.cache.get('short'))
+        self.cache.set('kept', 1)
+        self.cache.clear()
+        self.assertIsNone(self.cache.get('kept'))
+
+    def test_stats_are_staff_only(self):
+        user = User.objects.create_user('owner', password='pass')
+        self.client.force_login(user)
+        url = reverse('portfolio:cache_stats')
+        self.assertEqual(self.client.get(url).status_code, 404)
+        user.is_staff = True
+        user.save()
+        self.assertIn('l1', self.client.get(url).json())
+
+
+class ConcurrentZipExportTests(TransactionTestCase):
+    def test_concurrent_builds_keep_their_own_files(self):
+        portfolios = []
+        for name in ('Ada', 'Grace'):
+            user = User.objects.create_user(name.lower(), first_name=name)
+            UserProfile.objects.create(user=user)
+            portfolios.append(Portfolio.objects.create(user=user, title=f'{name} Portfolio', slug=name.lower()))
+
+        # Both builds reach the image step before either finishes
+        barrier = threading.Barrier(len(portfolios))
+        copy_images = PortfolioZipExporter._copy_images
+
+        def copy_images_together(exporter, *args):
+            barrier.wait(timeout=5)
+            return copy_images(exporter, *args)
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        errors = []
+
+        def build(portfolio):
+            try:
+                zip_exporter.build_zip(
+                    portfolio, portfolio.user.profile, RequestFactory().get('/'), f'{tmpdir.name}/{portfolio.slug}.zip',
+                )
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        with mock.patch.object(PortfolioZipExporter, '_copy_images', copy_images_together):
+            threads = [threading.Thread(target=build, args=(portfolio,)) for portfolio in portfolios]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        for portfolio, other in zip(portfolios, reversed(portfolios)):
+            with zipfile.ZipFile(f'{tmpdir.name}/{portfolio.slug}.zip') as archive:
+                index = archive.read('index.html').decode()
+            self.assertIn(portfolio.title, index)
+            self.assertNotIn(other.title, index)
+
+
+class MediaPrefetchTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=tmpdir.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        user = User.objects.create_user('owner', first_name='Ada')
+        self.portfolio = Portfolio.objects.create(user=user, title='Media', slug='media')
+        self.files = {
+            'profiles/ada.png': os.urandom(1024),
+            'projects/app.png': os.urandom(600 * 1024),
+        }
+        for name, data in self.files.items():
+            default_storage.save(name, ContentFile(data))
+        UserProfile.objects.create(user=user, profile_picture='profiles/ada.png')
+        Project.objects.create(portfolio=self.portfolio, name='App', description='An app', image='projects/app.png')
+        self.profile = UserProfile.objects.get(user=user)
+
+    def export_images(self):
+        path = os.path.join(settings.MEDIA_ROOT, 'export.zip')
+        zip_exporter.build_zip(self.portfolio, self.profile, RequestFactory().get('/'), path)
+        with zipfile.ZipFile(path) as archive:
+            return {
+                name: archive.read(name) for name in archive.namelist() if name.startswith('assets/images/')
+            }
+
+    def test_prefetched_bytes_match_storage(self):
+        media = media_prefetcher.fetch_portfolio_media(self.profile, self.portfolio)
+        self.assertEqual(dict(media), self.files)
+        self.assertEqual(media.deferred, set())
+        self.assertEqual(self.export_images(), {
+            'assets/images/profile_ada.png': self.files['profiles/ada.png'],
+            'assets/images/project_app.png': self.files['projects/app.png'],
+        })
+
+    def test_missing_file_is_left_out(self):
+        default_storage.delete('projects/app.png')
+        with self.assertLogs('portfolio.media_utils', 'WARNING'):
+            media = media_prefetcher.fetch_portfolio_media(self.profile, self.portfolio)
+        self.assertEqual(list(media), ['profiles/ada.png'])
+        self.assertEqual(media.deferred, set())
+        with self.assertLogs('portfolio.media_utils', 'WARNING'):
+            self.assertEqual(list(self.export_images()), ['assets/images/profile_ada.png'])
+
+    def test_files_over_the_memory_budget_are_streamed(self):
+        prefetcher = MediaPrefetcher(max_workers=1, max_bytes=64 * 1024)
+        media = prefetcher.fetch_portfolio_media(self.profile, self.portfolio)
+        self.assertEqual(dict(media), {'profiles/ada.png': self.files['profiles/ada.png']})
+        self.assertEqual(media.deferred, {'projects/app.png'})
+
+        with mock.patch.object(media_prefetcher, 'max_bytes', 64 * 1024):
+            images = self.export_images()
+        self.assertEqual(images['assets/images/project_app.png'], self.files['projects/app.png'])
+
+
+class ExportProfilerTests(TestCase):
+    def test_profiled_zip_export(self):
+        user = User.objects.create_user('owner')
+        profile = UserProfile.objects.create(user=user)
+        portfolio = Portfolio.objects.create(user=user, title='Profiled', slug='profiled')
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+
+        report, report_path = profile_export('zip', portfolio, profile, RequestFactory().get('/'), tmpdir.name)
+
+        self.assertTrue(report.startswith("ZIP export of 'profiled'"))
+        for phase in ('context', 'html_render', 'assets', 'media_fetch', 'archive_write'):
+            self.assertIn(f'\n{phase} ', report)
+        self.assertIn('allocation sites', report)
+        self.assertIn('functions by cumulative time', report)
+        self.assertTrue(os.path.exists(report_path))
+        self.assertTrue(os.path.exists(report_path[:-len('.txt')] + '.prof'))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_leaves_tracing_started_elsewhere_on(self):
+        tracemalloc.start()
+        self.addCleanup(tracemalloc.stop)
+        with ExportProfiler().profile():
+            with export_phase('work'):
+                [0] * 1000
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_concurrent_profiles_take_turns(self):
+        spans, errors = [], []
+
+        def run():
+            try:
+                with ExportProfiler().profile():
+                    started = time.monotonic()
+                    time.sleep(0.05)
+                    spans.append((started, time.monotonic()))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=run) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        first, second = sorted(spans)
+        self.assertLessEqual(first[1], second[0])
+        self.assertFalse(tracemalloc.is_tracing())
+
+
+class KeysetPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('owner', password='pass')
+        UserProfile.objects.create(user=self.user)
+        for i in range(5):
+            Portfolio.objects.create(user=self.user, title=f'Portfolio {i}', slug=f'portfolio-{i}')
+        self.queryset = Portfolio.objects.filter(user=self.user)
+
+    def walk(self, page_size):
+        pages, cursor = [], None
+        while True:
+            items, cursor = keyset_page(self.queryset, cursor=cursor, page_size=page_size)
+            pages.append([portfolio.pk for portfolio in items])
+            if cursor is None:
+                return pages
+
+    def expected_order(self):
+        return list(self.queryset.order_by('-updated_at', '-pk').values_list('pk', flat=True))
+
+    def test_pages_cover_every_row_once(self):
+        pages = self.walk(page_size=2)
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), self.expected_order())
+
+    def test_exact_last_page_has_no_cursor(self):
+        self.assertEqual([len(page) for page in self.walk(page_size=5)], [5])
+
+    def test_ties_on_updated_at_break_on_pk(self):
+        self.queryset.update(updated_at=timezone.now())
+        pages = self.walk(page_size=2)
+        self.assertEqual(sum(pages, []), self.expected_order())
+        self.assertEqual(len(set(sum(pages, []))), 5)
+
+    def test_bad_cursors_are_rejected(self):
+        def encode(payload):
+            return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+        for cursor in (
+            'not a cursor', encode(['2026-01-01T00:00:00+00:00', 'not-a-uuid']),
+            encode(['yesterday', str(uuid.uuid4())]), encode(['2026-01-01T00:00:00+00:00', 7]), encode(42),
+        ):
+            with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                keyset_page(self.queryset, cursor=cursor)
+
+    def test_dashboard_rejects_bad_cursor(self):
+        self.client.login(username='owner', password='pass')
+        cursor = base64.urlsafe_b64encode(b'["2026-01-01T00:00:00+00:00", "x"]').decode()
+        response = self.client.get(reverse('portfolio:dashboard'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 400)
+
+    def test_dashboard_filters(self):
+        self.queryset.filter(slug__in=['portfolio-0', 'portfolio-1']).update(is_public=True, theme='modern_light')
+        self.client.login(username='owner', password='pass')
+
+        def slugs(**params):
+            response = self.client.get(reverse('portfolio:dashboard'), params)
+            return sorted(portfolio.slug for portfolio in response.context['portfolios'])
+
+        self.assertEqual(slugs(visibility='public'), ['portfolio-0', 'portfolio-1'])
+        self.assertEqual(len(slugs(visibility='private')), 3)
+        self.assertEqual(slugs(theme='modern_light'), ['portfolio-0', 'portfolio-1'])
+        self.assertEqual(slugs(theme='modern_light', visibility='private'), [])
+        # Unknown values are ignored rather than matching nothing
+        self.assertEqual(len(slugs(theme='nope', visibility='everything')), 5)
+
+
+class FileDeliveryTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.root = tmpdir.name
+        self.path = os.path.join(self.root, 'export.zip')
+        with open(self.path, 'wb') as f:
+            f.write(bytes(range(100)))
+
+    def get(self, range_header):
+        request = RequestFactory().get('/', HTTP_RANGE=range_header)
+        response = send_file(request, self.path)
+        self.addCleanup(response.close)
+        return response
+
+    def test_single_range(self):
+        response = self.get('bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(10, 20)))
+
+    def test_open_and_suffix_ranges(self):
+        response = self.get('bytes=95-')
+        self.assertEqual((response.status_code, response['Content-Range']), (206, 'bytes 95-99/100'))
+        response = self.get('bytes=-5')
+        self.assertEqual(b''.join(response.streaming_content), bytes(range(95, 100)))
+        # A suffix longer than the file is the whole file
+        self.assertEqual(self.get('bytes=-500')['Content-Range'], 'bytes 0-99/100')
+
+    def test_unsatisfiable_range(self):
+        for header in ('bytes=100-', 'bytes=50-40', 'bytes=-0'):
+            with self.subTest(header=header):
+                response = self.get(header)
+                self.assertEqual(response.status_code, 416)
+                self.assertEqual(response['Content-Range'], 'bytes */100')
+
+    def test_multiple_or_malformed_ranges_get_the_whole_file(self):
+        for header in ('bytes=0-9,20-29', 'bytes=-', 'items=0-9'):
+            with self.subTest(header=header):
+                response = self.get(header)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(b''.join(response.streaming_content), bytes(range(100)))
+
+    async def test_asgi_requests_stream_asynchronously(self):
+        async def body(response):
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        with mock.patch('portfolio.delivery_utils.STREAM_CHUNK_SIZE', 16):
+            response = send_file(AsyncRequestFactory().get('/'), self.path)
+            self.assertTrue(response.is_async)
+            self.assertEqual((response.status_code, response['Content-Length']), (200, '100'))
+            self.assertEqual(await body(response), bytes(range(100)))
+
+            response = send_file(AsyncRequestFactory().get('/', headers={'Range': 'bytes=10-49'}), self.path)
+            self.assertTrue(response.is_async)
+            self.assertEqual(response.status_code, 206)
+            self.assertEqual(await body(response), bytes(range(10, 50)))
+
+    @override_settings(EXPORT_CACHE_PRUNE_GRACE=3600)
+    def test_superseded_exports_outlive_the_grace_period(self):
+        cache = ExportCache(self.root)
+        portfolio = mock.Mock(pk=1)
+
+        def build(key):
+            def write(path):
+                with open(path, 'w') as f:
+                    f.write(key)
+            return cache.get_or_create('zip', portfolio, key, 'zip', write)
+
+        def age(path, seconds):
+            os.utime(path, (time.time() - seconds, time.time() - seconds))
+
+        v1, v2 = build('v1'), build('v2')
+        # v1 was only just superseded: a download may still be about to open it
+        self.assertTrue(os.path.exists(v1))
+
+        age(v1, 7300)
+        age(v2, 7200)
+        v3 = build('v3')
+        self.assertFalse(os.path.exists(v1))
+        # v2 was only superseded by v3 just now
+        self.assertTrue(os.path.exists(v2))
+        self.assertEqual(build('v3'), v3)
+
+
+class StaticSiteTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.output_dir = tmpdir.name
+        self.builder = StaticSiteBuilder(self.output_dir)
+        self.user = User.objects.create_user('owner')
+        UserProfile.objects.create(user=self.user)
+
+    def page(self, slug):
+        with open(os.path.join(self.output_dir, slug, 'index.html'), encoding='utf-8') as f:
+            return f.read()
+
+    def test_unchanged_portfolios_are_skipped(self):
+        first = Portfolio.objects.create(user=self.user, title='First', slug='first', is_public=True)
+        Portfolio.objects.create(user=self.user, title='Second', slug='second', is_public=True)
+        Portfolio.objects.create(user=self.user, title='Private', slug='private')
+
+        self.assertEqual(self.builder.build(), {'built': 2, 'unchanged': 0, 'failed': 0, 'removed': 0})
+        self.assertEqual(self.builder.build(), {'built': 0, 'unchanged': 2, 'failed': 0, 'removed': 0})
+
+        first.title = 'First, renamed'
+        first.save()
+        self.assertEqual(self.builder.build(), {'built': 1, 'unchanged': 1, 'failed': 0, 'removed': 0})
+        self.assertIn('First, renamed', self.page('first'))
+        self.assertEqual(self.builder.build(force=True)['built'], 2)
+
+        first.is_public = False
+        first.save()
+        self.assertEqual(self.builder.build()['removed'], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.output_dir, 'first')))
+
+    def test_reused_slug_keeps_the_new_page(self):
+        old = Portfolio.objects.create(user=self.user, title='Old', slug='my-portfolio', is_public=True)
+        self.builder.build()
+        old.delete()
+        Portfolio.objects.create(user=self.user, title='New', slug='my-portfolio', is_public=True)
+
+        self.assertEqual(self.builder.build()['built'], 1)
+        self.assertIn('New', self.page('my-portfolio'))
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', password='pass')
+        UserProfile.objects.create(user=self.user, bio='Engines')
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Async', slug='async', is_public=True)
+        Skill.objects.create(portfolio=self.portfolio, name='Python', category='programming')
+        Project.objects.create(
+            portfolio=self.portfolio, name='Analytical Engine', description='Gears', tech_stack='Python',
+        )
+
+    async def test_public_pages_and_api_are_async(self):
+        response = await self.async_client.get(reverse('portfolio:public', args=['async']))
+        self.assertContains(response, 'Analytical Engine')
+        response = await self.async_client.get(reverse('portfolio:api_portfolio', args=['async']))
+        self.assertEqual(response.json()['title'], 'Async')
+        response = await self.async_client.get(reverse('portfolio:api_technology_projects', args=['python']))
+        self.assertEqual(response.json()['results'][0]['name'], 'Analytical Engine')
+
+    def test_private_and_anonymous_access(self):
+        self.portfolio.is_public = False
+        self.portfolio.save()
+        self.assertEqual(self.client.get(reverse('portfolio:public', args=['async'])).status_code, 404)
+        self.assertRedirects(
+            self.client.get(reverse('portfolio:preview', args=['async'])),
+            f"{reverse('portfolio:login')}?next={reverse('portfolio:preview', args=['async'])}",
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(self.client.post(reverse('portfolio:api_portfolio', args=['async'])).status_code, 405)
+
+    def test_exports_run_on_the_export_pool(self):
+        workers = []
+
+        def export(request, slug):
+            workers.append((threading.current_thread().name, slug))
+            return HttpResponse()
+
+        self.client.login(username='owner', password='pass')
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        with mock.patch('portfolio.views._export_zip', export), self.settings(EXPORT_ADMISSION_ROOT=tmpdir.name):
+            self.assertEqual(self.client.get(reverse('portfolio:export_zip', args=['async'])).status_code, 200)
+        self.assertTrue(workers[0][0].startswith('export'))
+        self.assertEqual(workers[0][1], 'async')
+
+    async def test_export_pool_keeps_the_routing_context(self):
+        with replica_reads():
+            self.assertTrue(await run_in_export_pool(_replica_reads.get))
+        self.assertFalse(await run_in_export_pool(_replica_reads.get))
+
+    @override_settings(DATABASE_REPLICA_ALIASES=['replica1'])
+    async def test_replica_routing_in_async_views(self):
+        router = ReplicaRouter()
+        routes = []
+
+        @read_from_replica
+        async def view(request):
+            routes.append(router.db_for_read(Portfolio))
+            router.db_for_write(Portfolio)
+            routes.append(router.db_for_read(Portfolio))
+            return HttpResponse()
+
+        middleware = ReplicaStickinessMiddleware(view)
+        self.assertTrue(asyncio.iscoroutinefunction(middleware))
+        response = await middleware(RequestFactory().get('/'))
+        self.assertIn(STICKY_COOKIE, response.cookies)
+        self.assertEqual(routes, ['replica1', 'default'])
+
+
+class ExportAdmissionTests(TestCase):
+    def setUp(self):
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        limits = self.settings(
+            EXPORT_ADMISSION_ROOT=tmpdir.name, EXPORT_MAX_CONCURRENT=1, EXPORT_MAX_PER_USER=1,
+            EXPORT_QUEUE_SIZE=1, EXPORT_QUEUE_TIMEOUT=0.5, EXPORT_RETRY_AFTER=7,
+        )
+        limits.enable()
+        self.addCleanup(limits.disable)
+        self.admission = ExportAdmission()
+
+    async def test_user_limit_queue_and_release(self):
+        entered = []
+
+        async def export(user_id):
+            async with self.admission.admit(user_id):
+                entered.append(user_id)
+
+        async with self.admission.admit(1):
+            with self.assertRaises(ExportRejected):
+                await export(1)
+            waiting = asyncio.create_task(export(2))
+            await asyncio.sleep(0.1)
+            with self.assertRaises(ExportRejected) as rejected:
+                await export(3)
+            self.assertEqual(rejected.exception.retry_after, 7)
+            self.assertEqual(entered, [])
+        await waiting
+
+        self.assertEqual(entered, [2])
+        stats = self.admission.get_stats()
+        self.assertEqual((stats['admitted'], stats['queued'], stats['rejected']), (2, 1, 2))
+        self.assertEqual(stats['rejected_by_reason'], {'user_limit': 1, 'queue_full': 1, 'timeout': 0})
+
+    async def test_queued_requests_time_out(self):
+        async with self.admission.admit(1):
+            started = time.monotonic()
+            with self.assertRaises(ExportRejected):
+                async with self.admission.admit(2):
+                    pass
+            self.assertLess(time.monotonic() - started, 2)
+        self.assertEqual(self.admission.get_stats()['rejected_by_reason']['timeout'], 1)
+
+    def test_busy_exports_get_429_with_retry_after(self):
+        user = User.objects.create_user('owner', password='pass', is_staff=True)
+        Portfolio.objects.create(user=user, title='Busy', slug='busy')
+        self.client.login(username='owner', password='pass')
+
+        # Another process holds the only render slot and the queue is full
+        busy = self.admission._try_acquire('render', 1), self.admission._try_acquire('queue', 1)
+        with mock.patch('portfolio.views.export_admission', self.admission):
+            response = self.client.get(reverse('portfolio:export_pdf', args=['busy']))
+            stats = self.client.get(reverse('portfolio:export_stats')).json()
+        for fd in busy:
+            self.admission._release(fd)
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '7')
+        self.assertEqual(stats['rejected_by_reason']['queue_full'], 1)
+
+
+@override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', password='pass', is_staff=True)
+        UserProfile.objects.create(user=self.user)
+        self.portfolio = Portfolio.objects.create(user=self.user, title='Timed', slug='timed', is_public=True)
+        Skill.objects.create(portfolio=self.portfolio, name='Python', category='programming')
+
+    def timings(self, response):
+        """Server-Timing metrics as ``{name: {param: value}}``"""
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_queries_templates_and_log_line(self):
+        self.client.login(username='owner', password='pass')
+        with self.assertLogs('portfolio.timing_utils', 'INFO') as logs:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('portfolio:dashboard'))
+
+        metrics = self.timings(response)
+        self.assertEqual(metrics['db']['desc'], f'"{len(queries)} queries"')
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        self.assertIn('total', metrics)
+        record = json.loads(logs.records[0].getMessage().split(' ', 2)[2])
+        self.assertEqual((record['path'], record['status'], record['queries']), ('/dashboard/', 200, len(queries)))
+
+    async def test_async_views_and_cache_lookups(self):
+        await sync_to_async(self.async_client.force_login)(self.user)
+        url = reverse('portfolio:api_portfolio', args=['timed'])
+        with self.assertLogs('portfolio.timing_utils', 'INFO'):
+            first = self.timings(await self.async_client.get(url))
+            second = self.timings(await self.async_client.get(url))
+        self.assertNotEqual(first['db']['desc'], '"0 queries"')
+        # The session is read from the cache too
+        self.assertEqual(first['cache']['desc'], '"hits=1 misses=1"')
+        self.assertEqual(second['cache']['desc'], '"hits=2 misses=0"')
+
+    def test_export_phases_are_reported(self):
+        def export(request, slug):
+            with export_phase('html_render'):
+                time.sleep(0.01)
+            return HttpResponse()
+
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        self.client.login(username='owner', password='pass')
+        with mock.patch('portfolio.views._export_zip', export), self.settings(EXPORT_ADMISSION_ROOT=tmpdir.name):
+            with self.assertLogs('portfolio.timing_utils', 'INFO'):
+                response = self.client.get(reverse('portfolio:export_zip', args=['timed']))
+        self.assertGreaterEqual(float(self.timings(response)['export_html_render']['dur']), 10)
+
+    def test_header_is_only_shown_to_staff(self):
+        User.objects.create_user('visitor', password='pass')
+        url = reverse('portfolio:public', args=['timed'])
+        with self.assertLogs('portfolio.timing_utils', 'INFO') as logs:
+            self.assertNotIn('Server-Timing', self.client.get(url))
+            self.client.login(username='visitor', password='pass')
+            self.assertNotIn('Server-Timing', self.client.get(url))
+        # Every sampled request is still logged
+        self.assertEqual(len(logs.records), 2)
+
+        with override_settings(SERVER_TIMING_PUBLIC=True), self.assertLogs('portfolio.timing_utils', 'INFO'):
+            self.assertIn('total', self.timings(self.client.get(url)))
+
+    async def test_async_header_is_only_shown_to_staff(self):
+        url = reverse('portfolio:api_portfolio', args=['timed'])
+        with self.assertLogs('portfolio.timing_utils', 'INFO'):
+            self.assertNotIn('Server-Timing', await self.async_client.get(url))
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_untouched(self):
+        response = self.client.get(reverse('portfolio:public', args=['timed']))
+        self.assertNotIn('Server-Timing', response)
@@ -0,0 +1,189 @@
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+logger = logging.getLogger(__name__)
+
+# The timing of the current request, or None when it wasn't sampled
+_timing = ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    """Where one request spent its time"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_ms = 0.0
+        self.template_ms = 0.0
+        self.cache = {'hits': 0, 'misses': 0}
+        self.phases = {}
+
+    def add_phase(self, name, ms):
+        self.phases[name] = self.phases.get(name, 0.0) + ms
+
+    def header(self, total_ms):
+        """The ``Server-Timing`` header value"""
+        metrics = [
+            f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'cache;desc="hits={self.cache["hits"]} misses={self.cache["misses"]}"',
+        ]
+        metrics += [f'{name};dur={ms:.1f}' for name, ms in self.phases.items()]
+        metrics.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(metrics)
+
+    def record(self, request, response, total_ms):
+        """Fields of the structured log line"""
+        return {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'total_ms': round(total_ms, 1),
+            'queries': self.queries,
+            'sql_ms': round(self.sql_ms, 1),
+            'template_ms': round(self.template_ms, 1),
+            'cache_hits': self.cache['hits'],
+            'cache_misses': self.cache['misses'],
+            'phases': {name: round(ms, 1) for name, ms in self.phases.items()},
+        }
+
+
+@contextmanager
+def timed_phase(name):
+    """Add the time spent in the block to a phase of the current request.
+
+    Costs one context variable lookup when the request isn't sampled.
+    Works as a decorator too.
+    """
+    timing = _timing.get()
+    if timing is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add_phase(name, (time.perf_counter() - started) * 1000)
+
+
+def record_cache_lookup(hit):
+    """Count a cache hit or miss for the current request"""
+    timing = _timing.get()
+    if timing is not None:
+        timing.cache['hits' if hit else 'misses'] += 1
+
+
+def _time_query(execute, sql, params, many, context):
+    timing = _timing.get()
+    if timing is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timing.queries += 1
+        timing.sql_ms += (time.perf_counter() - started) * 1000
+
+
+def install_query_timer(connection):
+    """Time the queries sampled requests run on this database connection"""
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timing = _timing.get()
+        if timing is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timing.template_ms += (time.perf_counter() - started) * 1000
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django templates that report render time to sampled requests"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+class ServerTimingMiddleware:
+    """Report query, template, cache and export timings of sampled requests.
+
+    A ``SERVER_TIMING_SAMPLE_RATE`` share of requests gets one ``request
+    timing`` log line; the rest only pay a random number and a few context
+    variable lookups. Sampled responses to staff, or to everyone with
+    ``SERVER_TIMING_PUBLIC``, also get a ``Server-Timing`` header. Put it
+    first in ``MIDDLEWARE`` so the total covers the other middleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        timing = RequestTiming()
+        token = _timing.set(timing)
+        try:
+            response = self.get_response(request)
+        finally:
+            _timing.reset(token)
+        return self._report(request, response, timing, self._show_header(request))
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        timing = RequestTiming()
+        token = _timing.set(timing)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _timing.reset(token)
+        # The lazy request.user may still need a session and user query
+        show_header = await sync_to_async(self._show_header)(request)
+        return self._report(request, response, timing, show_header)
+
+    def _sampled(self):
+        return random.random() < settings.SERVER_TIMING_SAMPLE_RATE
+
+    def _show_header(self, request):
+        """Whether the timings may be shown to this client"""
+        if settings.SERVER_TIMING_PUBLIC:
+            return True
+        user = getattr(request, 'user', None)
+        return user is not None and user.is_staff
+
+    def _report(self, request, response, timing, show_header):
+        total_ms = (time.perf_counter() - timing.started) * 1000
+        if show_header:
+            response['Server-Timing'] = timing.header(total_ms)
+        logger.info('request timing %s', json.dumps(timing.record(request, response, total_ms)))
+        return response
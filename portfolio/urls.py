@@ -24,6 +24,14 @@ urlpatterns = [
     # Public portfolio
     path('u/<slug:slug>/', views.portfolio_public, name='public'),
     
+    # Read-only JSON API
+    path('api/v1/portfolios/<slug:slug>/', views.api_portfolio, name='api_portfolio'),
+    path('api/v1/search/', views.api_search, name='api_search'),
+    path('api/v1/stats/', views.api_stats, name='api_stats'),
+    path('api/v1/cache-stats/', views.cache_stats, name='cache_stats'),
+    path('api/v1/export-stats/', views.export_stats, name='export_stats'),
+    path('api/v1/technologies/<str:name>/projects/', views.api_technology_projects, name='api_technology_projects'),
+    
     # Export functionality
     path('portfolio/<slug:slug>/export/zip/', views.portfolio_export_zip, name='export_zip'),
     path('portfolio/<slug:slug>/export/pdf/', views.portfolio_export_pdf, name='export_pdf'),
@@ -34,6 +42,8 @@ urlpatterns = [
     path('portfolio/<slug:slug>/add/skill/', views.add_skill, name='add_skill'),
     path('portfolio/<slug:slug>/add/project/', views.add_project, name='add_project'),
     path('portfolio/<slug:slug>/add/certification/', views.add_certification, name='add_certification'),
+    path('portfolio/<slug:slug>/items/batch/', views.batch_portfolio_items, name='batch_portfolio_items'),
+    path('portfolio/<slug:slug>/reorder/<str:item_type>/', views.reorder_portfolio_items, name='reorder_portfolio_items'),
 
     # New AJAX endpoints for update and delete
     path('portfolio/<slug:slug>/get/<str:item_type>/<int:item_id>/', views.get_portfolio_item, name='get_portfolio_item'),
@@ -1,29 +1,53 @@
+from asgiref.sync import sync_to_async
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, authenticate
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse
+from django.core.cache import cache
+from django.http import JsonResponse, HttpResponse, HttpResponseNotModified, Http404
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
 from django.urls import reverse_lazy, reverse
 from django.views.generic import CreateView, UpdateView, DeleteView, DetailView
 from django.utils.decorators import method_decorator
-from django.utils.text import slugify
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.forms.models import model_to_dict
 from django.views.decorators.http import require_http_methods
 import json
+import mimetypes
 import zipfile
 import os
 import tempfile
-from weasyprint import HTML, CSS
-from weasyprint.text.fonts import FontConfiguration
 
-from .models import Portfolio, UserProfile, Education, Experience, Skill, Project, Certification
+from .models import Portfolio, UserProfile, Education, Experience, Skill, Project, Certification, PlatformCounter
 from .forms import (
     CustomUserCreationForm, UserProfileForm, PortfolioForm, 
     EducationForm, ExperienceForm, SkillForm, ProjectForm, CertificationForm
 )
 from .pdf_utils import PortfolioPDFGenerator
+from .delivery_utils import send_file
+from .profiling_utils import profile_export
+from .admission_utils import ExportRejected, export_admission
+from .analytics_utils import view_analytics
+from .stats_utils import get_counter, get_platform_stats, record_export, record_skill_changes, skill_state
+from .pagination_utils import InvalidCursor, keyset_page
+from .slug_utils import create_with_unique_slug
+from .batch_utils import ITEM_FORMS, InvalidBatch, batch_editor
+from .api_utils import InvalidFields, api_serializer
+from .search_utils import search_index
+from .replica_utils import read_from_replica
+from .async_utils import (
+    async_login_required, async_require_http_methods, run_in_export_pool,
+)
+from .technology_utils import aget_technology, public_projects_using, sync_project_technologies
 from .zip_utils import zip_exporter
 
 
@@ -65,11 +89,58 @@ def register(request):
 def dashboard(request):
     """User dashboard view"""
     portfolios = Portfolio.objects.filter(user=request.user)
-    total_public_portfolios = Portfolio.objects.filter(is_public=True).count()
+    
+    # Server-side filters
+    theme = request.GET.get('theme', '')
+    visibility = request.GET.get('visibility', '')
+    theme_choices = Portfolio._meta.get_field('theme').choices
+    if theme in dict(theme_choices):
+        portfolios = portfolios.filter(theme=theme)
+    else:
+        theme = ''
+    if visibility in ('public', 'private'):
+        portfolios = portfolios.filter(is_public=(visibility == 'public'))
+    else:
+        visibility = ''
+    
+    # One keyset page with item counts annotated in the same query
+    try:
+        page, next_cursor = keyset_page(
+            portfolios.with_item_counts(),
+            cursor=request.GET.get('cursor'),
+            page_size=settings.DASHBOARD_PAGE_SIZE,
+        )
+    except InvalidCursor:
+        return JsonResponse({'success': False, 'message': 'Invalid cursor'}, status=400)
+    
+    # Views over the last 30 days of the portfolios on this page
+    view_stats = view_analytics.get_stats([portfolio.pk for portfolio in page])
+    for portfolio in page:
+        portfolio.recent_views = view_stats.get(portfolio.pk)
+
+    # "Load more" requests only need the next rows
+    if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+        html = render_to_string('portfolio/partials/dashboard_portfolio_rows.html', {'portfolios': page}, request=request)
+        return JsonResponse({'success': True, 'html': html, 'next_cursor': next_cursor})
+    
+    # Per-user totals in one aggregate; the global total comes from the
+    # maintained counter instead of a full-table COUNT
+    totals = Portfolio.objects.filter(user=request.user).aggregate(
+        portfolio_count=Count('pk'),
+        total_downloads=Coalesce(Sum('export_count'), 0),
+    )
 
     context = {
-        'portfolios': portfolios,
-        'total_public_portfolios': total_public_portfolios,
+        'portfolios': page,
+        'next_cursor': next_cursor,
+        'portfolio_count': totals['portfolio_count'],
+        'total_public_portfolios': get_counter(PlatformCounter.PUBLIC_PORTFOLIOS),
+        'total_downloads': totals['total_downloads'],
+        'total_views': view_analytics.get_user_total(request.user.pk),
+        'platform_stats': get_platform_stats(limit=8),
+        'theme_choices': theme_choices,
+        'selected_theme': theme,
+        'selected_visibility': visibility,
     }
 
     return render(request, 'portfolio/dashboard.html', context)
@@ -100,16 +171,9 @@ def portfolio_create(request):
         if form.is_valid():
             portfolio = form.save(commit=False)
             portfolio.user = request.user
-            portfolio.slug = slugify(portfolio.title)
-            
-            # Ensure unique slug
-            original_slug = portfolio.slug
-            counter = 1
-            while Portfolio.objects.filter(slug=portfolio.slug).exists():
-                portfolio.slug = f"{original_slug}-{counter}"
-                counter += 1
             
-            portfolio.save()
+            # Ensure unique slug (one lookup, retried if a concurrent create wins)
+            create_with_unique_slug(portfolio)
             messages.success(request, 'Portfolio created successfully!')
             return redirect('portfolio:edit', slug=portfolio.slug)
     else:
@@ -135,51 +199,49 @@ def portfolio_edit(request, slug):
     return render(request, 'portfolio/portfolio_edit.html', context)
 
 
-@login_required
-def portfolio_preview(request, slug):
+@async_login_required
+@read_from_replica
+async def portfolio_preview(request, slug):
     """Portfolio preview view"""
-    portfolio = get_object_or_404(Portfolio, slug=slug, user=request.user)
-    
-    context = {
-        'portfolio': portfolio,
-        'user_profile': portfolio.user.profile,
-        'education_list': portfolio.education.all(),
-        'experience_list': portfolio.experience.all(),
-        'skills_by_category': {},
-        'projects_list': portfolio.projects.all(),
-        'certifications_list': portfolio.certifications.all(),
-    }
-    
-    # Group skills by category
-    for skill in portfolio.skills.all():
-        if skill.category not in context['skills_by_category']:
-            context['skills_by_category'][skill.category] = []
-        context['skills_by_category'][skill.category].append(skill)
-    
-    return render(request, f'portfolio/themes/{portfolio.theme}.html', context)
+    try:
+        portfolio = await Portfolio.objects.select_related('user__profile').aget(slug=slug, user=request.user)
+    except Portfolio.DoesNotExist:
+        raise Http404('Portfolio not found')
+    return render(request, f'portfolio/themes/{portfolio.theme}.html', await _atheme_context(portfolio))
 
 
-def portfolio_public(request, slug):
+@read_from_replica
+async def portfolio_public(request, slug):
     """Public portfolio view"""
-    portfolio = get_object_or_404(Portfolio, slug=slug, is_public=True)
-    
+    try:
+        portfolio = await Portfolio.objects.select_related('user__profile').aget(slug=slug, is_public=True)
+    except Portfolio.DoesNotExist:
+        raise Http404('Portfolio not found')
+    if request.method == 'GET' and view_analytics.record(portfolio.pk, request):
+        await sync_to_async(view_analytics.flush)()
+    return render(request, f'portfolio/themes/{portfolio.theme}.html', await _atheme_context(portfolio))
+
+
+async def _atheme_context(portfolio):
+    """Theme template context, loaded with the async ORM.
+
+    Everything the themes touch is fetched here, so rendering on the event
+    loop never needs the database.
+    """
     context = {
         'portfolio': portfolio,
         'user_profile': portfolio.user.profile,
-        'education_list': portfolio.education.all(),
-        'experience_list': portfolio.experience.all(),
+        'education_list': [item async for item in portfolio.education.all()],
+        'experience_list': [item async for item in portfolio.experience.all()],
         'skills_by_category': {},
-        'projects_list': portfolio.projects.all(),
-        'certifications_list': portfolio.certifications.all(),
+        'projects_list': [item async for item in portfolio.projects.all()],
+        'certifications_list': [item async for item in portfolio.certifications.all()],
     }
-    
+
     # Group skills by category
-    for skill in portfolio.skills.all():
-        if skill.category not in context['skills_by_category']:
-            context['skills_by_category'][skill.category] = []
-        context['skills_by_category'][skill.category].append(skill)
-    
-    return render(request, f'portfolio/themes/{portfolio.theme}.html', context)
+    async for skill in portfolio.skills.all():
+        context['skills_by_category'].setdefault(skill.category, []).append(skill)
+    return context
 
 
 @login_required
@@ -195,35 +257,114 @@ def portfolio_delete(request, slug):
     return render(request, 'portfolio/portfolio_delete.html', {'portfolio': portfolio})
 
 
-@login_required
-def portfolio_export_zip(request, slug):
+@async_login_required
+async def portfolio_export_zip(request, slug):
+    """Export portfolio as ZIP file, built on the export pool"""
+    return await _admitted_export(request, _export_zip, slug)
+
+
+@async_login_required
+async def portfolio_export_pdf(request, slug):
+    """Export portfolio as PDF file, rendered on the export pool"""
+    return await _admitted_export(request, _export_pdf, slug)
+
+
+async def _admitted_export(request, export, slug):
+    """Run an export once admission control lets it in, else answer 429"""
+    try:
+        async with export_admission.admit(request.user.pk):
+            return await run_in_export_pool(export, request, slug)
+    except ExportRejected as e:
+        response = JsonResponse({'error': f"{e.reason}, please try again shortly"}, status=429)
+        response['Retry-After'] = str(e.retry_after)
+        return response
+
+
+def _export_zip(request, slug):
     """Export portfolio as ZIP file with enhanced assets"""
-    portfolio = get_object_or_404(Portfolio, slug=slug, user=request.user)
+    portfolio = _get_export_portfolio(request, slug)
     user_profile = getattr(portfolio.user, 'profile', None)
     
     if not user_profile:
         user_profile, created = UserProfile.objects.get_or_create(user=portfolio.user)
     
-    # Generate ZIP using enhanced utility
-    return zip_exporter.create_portfolio_zip(portfolio, user_profile, request)
+    if _wants_export_profile(request):
+        return _export_profile_response('zip', portfolio, user_profile, request)
+    
+    # Generate ZIP using enhanced utility (cached on disk per content version)
+    response = zip_exporter.create_portfolio_zip(portfolio, user_profile, request)
+    record_export(portfolio)
+    return response
 
 
-@login_required
-def portfolio_export_pdf(request, slug):
+def _export_pdf(request, slug):
     """Export portfolio as PDF file with enhanced formatting"""
-    portfolio = get_object_or_404(Portfolio, slug=slug, user=request.user)
+    portfolio = _get_export_portfolio(request, slug)
     user_profile = getattr(portfolio.user, 'profile', None)
     
     if not user_profile:
         user_profile, created = UserProfile.objects.get_or_create(user=portfolio.user)
     
-    # Generate PDF using enhanced utility
+    if _wants_export_profile(request):
+        return _export_profile_response('pdf', portfolio, user_profile, request)
+    
+    # Generate PDF using enhanced utility (cached on disk per content version)
     pdf_generator = PortfolioPDFGenerator()
-    pdf_bytes = pdf_generator.generate_pdf(portfolio, user_profile, request)
+    pdf_path = pdf_generator.get_portfolio_pdf(portfolio, user_profile, request)
+    record_export(portfolio)
     
-    # Create response
+    # Hand the file to the front proxy, or stream it with Range support
     filename = f"{portfolio.slug}_portfolio.pdf"
-    return pdf_generator.create_response(pdf_bytes, filename)
+    return send_file(request, pdf_path, filename=filename, content_type='application/pdf')
+
+
+def _wants_export_profile(request):
+    """Staff can add ?profile=1 to an export URL to get a profiling report"""
+    return request.user.is_staff and request.GET.get('profile') == '1'
+
+
+def _get_export_portfolio(request, slug):
+    """Owners export their own portfolios; staff may profile any portfolio"""
+    if _wants_export_profile(request):
+        return get_object_or_404(Portfolio, slug=slug)
+    return get_object_or_404(Portfolio, slug=slug, user=request.user)
+
+
+def _export_profile_response(kind, portfolio, user_profile, request):
+    """Run the export under cProfile/tracemalloc and return the report"""
+    report, report_path = profile_export(kind, portfolio, user_profile, request)
+    response = HttpResponse(report, content_type='text/plain; charset=utf-8')
+    response['X-Export-Profile'] = os.path.basename(report_path)
+    return response
+
+
+# Item type -> related name of its section on the edit page
+EDIT_SECTIONS = {
+    'education': 'education',
+    'experience': 'experience',
+    'skill': 'skills',
+    'project': 'projects',
+    'certification': 'certifications',
+}
+
+
+def _edit_fragment(request, item_type, portfolio_id, item=None):
+    """Render the edit-page fragment requested with ``?fragment=item|section``.
+
+    Lets the editor patch the DOM in place instead of reloading the whole
+    edit page; a section fragment queries only that one section.
+    """
+    fragment = request.GET.get('fragment')
+    if fragment == 'item' and item is not None:
+        template = f'portfolio/partials/edit/{item_type}_item.html'
+        context = {'item': item}
+    elif fragment == 'section':
+        template = f'portfolio/partials/edit/{item_type}_section.html'
+        Model = ITEM_FORMS[item_type]._meta.model
+        context = {'items': Model.objects.filter(portfolio_id=portfolio_id)}
+    else:
+        return {}
+    return {'fragment': fragment, 'html': render_to_string(template, context, request=request)}
 
 
 # AJAX views for dynamic form handling
@@ -238,7 +379,12 @@ def add_education(request, slug):
             education = form.save(commit=False)
             education.portfolio = portfolio
             education.save()
-            return JsonResponse({'success': True, 'message': 'Education added successfully!'})
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+            return JsonResponse({
+                'success': True,
+                'message': 'Education added successfully!',
+                **_edit_fragment(request, 'education', portfolio.pk, education),
+            })
         else:
             return JsonResponse({'success': False, 'errors': form.errors})
     
@@ -256,7 +402,12 @@ def add_experience(request, slug):
             experience = form.save(commit=False)
             experience.portfolio = portfolio
             experience.save()
-            return JsonResponse({'success': True, 'message': 'Experience added successfully!'})
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+            return JsonResponse({
+                'success': True,
+                'message': 'Experience added successfully!',
+                **_edit_fragment(request, 'experience', portfolio.pk, experience),
+            })
         else:
             return JsonResponse({'success': False, 'errors': form.errors})
     
@@ -274,7 +425,12 @@ def add_skill(request, slug):
             skill = form.save(commit=False)
             skill.portfolio = portfolio
             skill.save()
-            return JsonResponse({'success': True, 'message': 'Skill added successfully!'})
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+            return JsonResponse({
+                'success': True,
+                'message': 'Skill added successfully!',
+                **_edit_fragment(request, 'skill', portfolio.pk, skill),
+            })
         else:
             return JsonResponse({'success': False, 'errors': form.errors})
     
@@ -292,7 +448,12 @@ def add_project(request, slug):
             project = form.save(commit=False)
             project.portfolio = portfolio
             project.save()
-            return JsonResponse({'success': True, 'message': 'Project added successfully!'})
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+            return JsonResponse({
+                'success': True,
+                'message': 'Project added successfully!',
+                **_edit_fragment(request, 'project', portfolio.pk, project),
+            })
         else:
             return JsonResponse({'success': False, 'errors': form.errors})
     
@@ -310,13 +471,63 @@ def add_certification(request, slug):
             certification = form.save(commit=False)
             certification.portfolio = portfolio
             certification.save()
-            return JsonResponse({'success': True, 'message': 'Certification added successfully!'})
+            Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
+            return JsonResponse({
+                'success': True,
+                'message': 'Certification added successfully!',
+                **_edit_fragment(request, 'certification', portfolio.pk, certification),
+            })
         else:
             return JsonResponse({'success': False, 'errors': form.errors})
     
     return JsonResponse({'success': False, 'message': 'Invalid request'})
 
 
+@login_required
+@require_http_methods(["POST"])
+def batch_portfolio_items(request, slug):
+    """Apply a list of item create/update/delete operations in one request"""
+    portfolio = get_object_or_404(Portfolio, slug=slug, user=request.user)
+
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON payload'}, status=400)
+
+    try:
+        operations = payload.get('operations') if isinstance(payload, dict) else None
+        applied, results = batch_editor.apply(portfolio, operations)
+    except InvalidBatch as e:
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+    except IntegrityError:
+        return JsonResponse({
+            'success': False,
+            'message': 'The batch conflicts with existing items (e.g. a duplicate skill name)',
+        }, status=409)
+
+    return JsonResponse({'success': applied, 'results': results}, status=200 if applied else 400)
+
+
+@login_required
+@require_http_methods(["POST"])
+def reorder_portfolio_items(request, slug, item_type):
+    """Persist a new order for one item type after a drag-and-drop"""
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON payload'}, status=400)
+
+    try:
+        ids = payload.get('ids') if isinstance(payload, dict) else None
+        updated = batch_editor.reorder(request.user, slug, item_type, ids)
+    except InvalidBatch as e:
+        # Tell a foreign or missing portfolio apart from a stale id list
+        get_object_or_404(Portfolio, slug=slug, user=request.user)
+        return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+    return JsonResponse({'success': True, 'updated': updated})
+
+
 @login_required
 @require_http_methods(["POST"])
 def delete_portfolio_item(request, slug, item_type, item_id):
@@ -344,10 +555,12 @@ def delete_portfolio_item(request, slug, item_type, item_id):
 
         # Delete the item
         item.delete()
+        Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
 
         return JsonResponse({
             'success': True,
-            'message': f'{item_type.title()} deleted successfully'
+            'message': f'{item_type.title()} deleted successfully',
+            **_edit_fragment(request, item_type, portfolio.pk),
         })
 
     except Exception as e:
@@ -407,7 +620,7 @@ def get_portfolio_item(request, slug, item_type, item_id):
                 'id': item.id,
                 'name': item.name,
                 'description': item.description,
-                'technologies': getattr(item, 'technologies', ''),
+                'tech_stack': item.tech_stack,
                 'github_url': getattr(item, 'github_url', ''),
                 'live_url': getattr(item, 'live_url', ''),
                 'start_date': item.start_date.strftime('%Y-%m-%d') if hasattr(item,
@@ -436,88 +649,59 @@ def get_portfolio_item(request, slug, item_type, item_id):
 @login_required
 @require_http_methods(["POST"])
 def update_portfolio_item(request, slug, item_type, item_id):
-    """Update portfolio items via AJAX"""
-    try:
-        # Get the portfolio first to ensure user owns it
-        portfolio = get_object_or_404(Portfolio, slug=slug, user=request.user)
-
-        from .models import Experience, Education, Project, Certification
-
-        model_map = {
-            'experience': Experience,
-            'education': Education,
-            'project': Project,
-            'certification': Certification,
-        }
+    """Update portfolio items via AJAX, writing only the changed columns"""
+    if item_type not in ITEM_FORMS:
+        return JsonResponse({'error': 'Invalid item type'}, status=400)
 
-        if item_type not in model_map:
-            return JsonResponse({'error': 'Invalid item type'}, status=400)
+    form_class = ITEM_FORMS[item_type]
+    Model = form_class._meta.model
 
-        Model = model_map[item_type]
-        item = get_object_or_404(Model, id=item_id, portfolio=portfolio)
+    # Ownership is checked by the same query that loads the item
+    item = get_object_or_404(Model, id=item_id, portfolio__slug=slug, portfolio__user=request.user)
 
-        # Parse JSON data from request
+    try:
         data = json.loads(request.body)
-
-        # Update fields based on item type
-        if item_type == 'experience':
-            item.position = data.get('position', item.position)
-            item.company = data.get('company', item.company)
-            if hasattr(item, 'location'):
-                item.location = data.get('location', getattr(item, 'location', ''))
-            item.start_date = data.get('start_date') or item.start_date
-            item.end_date = data.get('end_date') or item.end_date
-            if hasattr(item, 'is_current'):
-                item.is_current = data.get('is_current', getattr(item, 'is_current', False))
-            item.description = data.get('description', item.description)
-
-        elif item_type == 'education':
-            item.institution = data.get('institution', item.institution)
-            item.degree = data.get('degree', item.degree)
-            if hasattr(item, 'field_of_study'):
-                item.field_of_study = data.get('field_of_study', getattr(item, 'field_of_study', ''))
-            item.start_date = data.get('start_date') or item.start_date
-            item.end_date = data.get('end_date') or item.end_date
-            if hasattr(item, 'grade'):
-                item.grade = data.get('grade', getattr(item, 'grade', ''))
-            if hasattr(item, 'description'):
-                item.description = data.get('description', getattr(item, 'description', ''))
-
-        elif item_type == 'project':
-            item.name = data.get('name', item.name)
-            item.description = data.get('description', item.description)
-            if hasattr(item, 'technologies'):
-                item.technologies = data.get('technologies', getattr(item, 'technologies', ''))
-            if hasattr(item, 'github_url'):
-                item.github_url = data.get('github_url', getattr(item, 'github_url', ''))
-            if hasattr(item, 'live_url'):
-                item.live_url = data.get('live_url', getattr(item, 'live_url', ''))
-            if hasattr(item, 'start_date'):
-                item.start_date = data.get('start_date') or getattr(item, 'start_date', None)
-            if hasattr(item, 'end_date'):
-                item.end_date = data.get('end_date') or getattr(item, 'end_date', None)
-
-        elif item_type == 'certification':
-            item.name = data.get('name', item.name)
-            item.issuing_organization = data.get('issuing_organization', item.issuing_organization)
-            item.issue_date = data.get('issue_date') or item.issue_date
-            item.expiry_date = data.get('expiry_date') or getattr(item, 'expiry_date', None)
-            if hasattr(item, 'credential_id'):
-                item.credential_id = data.get('credential_id', getattr(item, 'credential_id', ''))
-            if hasattr(item, 'credential_url'):
-                item.credential_url = data.get('credential_url', getattr(item, 'credential_url', ''))
-
-        item.save()
-
+    except ValueError:
+        return JsonResponse({'success': False, 'message': 'Invalid JSON payload'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'success': False, 'message': 'Invalid JSON payload'}, status=400)
+
+    # Fields missing from the payload keep their current value
+    form = form_class({**model_to_dict(item, fields=form_class._meta.fields), **data}, instance=item)
+    if not form.is_valid():
+        return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+
+    changed = form.changed_data
+    if not changed:
         return JsonResponse({
             'success': True,
-            'message': f'{item_type.title()} updated successfully'
+            'changed': [],
+            'message': 'No changes to save',
+            **_edit_fragment(request, item_type, item.portfolio_id, item),
         })
 
-    except Exception as e:
+    try:
+        with transaction.atomic():
+            Model.objects.filter(pk=item.pk, portfolio_id=item.portfolio_id).update(
+                **{name: getattr(item, name) for name in changed}
+            )
+            if 'tech_stack' in changed:
+                sync_project_technologies([item])
+            if Model is Skill:
+                record_skill_changes([(item._loaded_stats, skill_state(item))])
+            Portfolio.objects.filter(pk=item.portfolio_id).bump_content_version()
+    except IntegrityError:
         return JsonResponse({
-            'error': str(e)
-        }, status=500)
+            'success': False,
+            'message': 'Another item already uses these values',
+        }, status=409)
+
+    return JsonResponse({
+        'success': True,
+        'changed': changed,
+        'message': f'{item_type.title()} updated successfully',
+        **_edit_fragment(request, item_type, item.portfolio_id, item),
+    })
 
 
 @login_required
@@ -532,10 +716,12 @@ def delete_skill(request, slug, skill_id):
         skill = get_object_or_404(Skill, id=skill_id, portfolio=portfolio)
 
         skill.delete()
+        Portfolio.objects.filter(pk=portfolio.pk).bump_content_version()
 
         return JsonResponse({
             'success': True,
-            'message': 'Skill deleted successfully'
+            'message': 'Skill deleted successfully',
+            **_edit_fragment(request, 'skill', portfolio.pk),
         })
 
     except Exception as e:
@@ -543,3 +729,135 @@ def delete_skill(request, slug, skill_id):
             'error': str(e)
         }, status=500)
 
+
+@async_require_http_methods(["GET", "HEAD"])
+@read_from_replica
+async def api_portfolio(request, slug):
+    """Read-only JSON document of a public portfolio"""
+    portfolio = await api_serializer.aget_portfolio(slug)
+    if portfolio is None:
+        return JsonResponse({'error': 'Portfolio not found'}, status=404)
+
+    try:
+        selection = api_serializer.parse_fields(request.GET.get('fields', ''))
+    except InvalidFields as e:
+        return JsonResponse({'error': str(e)}, status=400)
+
+    # The ETag only depends on the content version, so revalidation never
+    # touches the cache or the child tables
+    version_key = api_serializer.get_version_key(portfolio)
+    etag = api_serializer.get_etag(version_key, selection)
+    if_none_match = request.headers.get('If-None-Match', '')
+    if if_none_match == '*' or etag in parse_etags(if_none_match):
+        response = HttpResponseNotModified()
+    else:
+        document = await api_serializer.aget_document(portfolio, version_key)
+        response = JsonResponse(api_serializer.select(document, selection))
+
+    response['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=0, must_revalidate=True)
+    return response
+
+
+@require_http_methods(["GET"])
+@read_from_replica
+def api_search(request):
+    """Ranked, paginated full-text search over public portfolios"""
+    query = request.GET.get('q', '').strip()
+    try:
+        page = int(request.GET.get('page', 1))
+        page_size = int(request.GET.get('page_size', 20))
+    except ValueError:
+        return JsonResponse({'error': 'page and page_size must be integers'}, status=400)
+
+    portfolios, has_next = search_index.search(query, page=page, page_size=page_size)
+    return JsonResponse({
+        'query': query,
+        'page': max(page, 1),
+        'has_next': has_next,
+        'results': [
+            {
+                'slug': portfolio.slug,
+                'title': portfolio.title,
+                'theme': portfolio.theme,
+                'owner': portfolio.user.get_full_name() or portfolio.user.username,
+                'url': reverse('portfolio:public', args=[portfolio.slug]),
+                'rank': portfolio.search_rank,
+            }
+            for portfolio in portfolios
+        ],
+    })
+
+
+@require_http_methods(["GET"])
+@read_from_replica
+def api_stats(request):
+    """Platform-wide skill and technology statistics, read from the aggregates"""
+    return JsonResponse(get_platform_stats())
+
+
+@login_required
+@require_http_methods(["GET"])
+def cache_stats(request):
+    """Per-tier hit rates of the cache in the worker serving this request (staff only)"""
+    if not request.user.is_staff:
+        raise Http404('Not found')
+    if not hasattr(cache, 'stats'):
+        return JsonResponse({'error': 'The configured cache backend does not report stats'}, status=404)
+    return JsonResponse(cache.stats())
+
+
+@login_required
+@require_http_methods(["GET"])
+def export_stats(request):
+    """Export admission counts of the worker serving this request (staff only)"""
+    if not request.user.is_staff:
+        raise Http404('Not found')
+    return JsonResponse(export_admission.get_stats())
+
+
+@async_require_http_methods(["GET"])
+@read_from_replica
+async def api_technology_projects(request, name):
+    """Public projects tagged with a technology, by any of its spellings"""
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+        page_size = max(1, min(int(request.GET.get('page_size', 20)), 50))
+    except ValueError:
+        return JsonResponse({'error': 'page and page_size must be integers'}, status=400)
+
+    technology = await aget_technology(name)
+    if technology is None:
+        return JsonResponse({'error': 'Technology not found'}, status=404)
+
+    offset = (page - 1) * page_size
+    # Fetch one extra row to know whether there is a next page
+    projects = [project async for project in public_projects_using(technology)[offset:offset + page_size + 1]]
+    return JsonResponse({
+        'technology': technology.name,
+        'page': page,
+        'has_next': len(projects) > page_size,
+        'results': [
+            {
+                'id': project.id,
+                'name': project.name,
+                'portfolio': project.portfolio.slug,
+                'url': reverse('portfolio:public', args=[project.portfolio.slug]),
+            }
+            for project in projects[:page_size]
+        ],
+    })
+
+
+def serve_media(request, path):
+    """Serve uploaded media in development through the delivery layer"""
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404('Media file not found')
+    
+    if not os.path.isfile(full_path):
+        raise Http404('Media file not found')
+    
+    content_type, encoding = mimetypes.guess_type(full_path)
+    return send_file(request, full_path, content_type=content_type, as_attachment=False)
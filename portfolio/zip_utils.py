@@ -2,72 +2,100 @@ import os
 import zipfile
 import tempfile
 import shutil
+from django.db.models import prefetch_related_objects
 from django.template.loader import render_to_string
-from django.http import HttpResponse
 from django.conf import settings
-from django.core.files.storage import default_storage
 from .models import Portfolio, UserProfile
+from .delivery_utils import export_cache, send_file
+from .hash_utils import PORTFOLIO_PREFETCH, content_fingerprint
+from .media_utils import media_prefetcher
+from .profiling_utils import export_phase
+from .replica_utils import replica_reads
 
 
 class PortfolioZipExporter:
-    """Enhanced ZIP export utility for portfolios"""
+    """Enhanced ZIP export utility for portfolios
+
+    Keeps no per-export state, so one instance serves concurrent exports:
+    each build's working directory is passed between the helpers.
+    """
+    
+    # Bump when the archive layout or bundled assets change
+    EXPORT_VERSION = 1
     
-    def __init__(self):
-        self.temp_dir = None
-        self.zip_path = None
+    THEMES = ['minimal_dark', 'modern_light', 'creative_burst', 'tech_noir', 'professional_corporate', 'gradient_showcase']
     
     def create_portfolio_zip(self, portfolio, user_profile, request):
-        """Create a complete ZIP package of the portfolio"""
+        """Create a complete ZIP package of the portfolio and send it"""
+        zip_path = self.get_portfolio_zip(portfolio, user_profile, request)
+        zip_filename = f"{portfolio.slug}_portfolio.zip"
+        return send_file(request, zip_path, filename=zip_filename, content_type='application/zip')
+    
+    def get_portfolio_zip(self, portfolio, user_profile, request):
+        """Return the path of the cached ZIP archive, building it on a miss"""
+        with replica_reads():
+            prefetch_related_objects([portfolio], *PORTFOLIO_PREFETCH)
+        key = content_fingerprint(
+            portfolio,
+            user_profile,
+            template_names=[f'portfolio/themes/{theme}.html' for theme in self.THEMES],
+            extra=[self.EXPORT_VERSION, portfolio.updated_at],
+        )
+        return export_cache.get_or_create(
+            'zip', portfolio, key, 'zip',
+            lambda zip_path: self.build_zip(portfolio, user_profile, request, zip_path),
+        )
+    
+    def build_zip(self, portfolio, user_profile, request, zip_path):
+        """Write a complete ZIP package of the portfolio to ``zip_path``"""
         
         # Create temporary directory
-        self.temp_dir = tempfile.mkdtemp()
+        temp_dir = tempfile.mkdtemp()
         
         try:
             # Prepare context data
-            context = {
-                'portfolio': portfolio,
-                'user_profile': user_profile,
-                'education_list': portfolio.education.all(),
-                'experience_list': portfolio.experience.all(),
-                'skills_by_category': self._group_skills_by_category(portfolio.skills.all()),
-                'projects_list': portfolio.projects.all(),
-                'certifications_list': portfolio.certifications.all(),
-                'base_url': '',  # Use relative paths for offline viewing
-            }
+            with export_phase('context'):
+                prefetch_related_objects([portfolio], *PORTFOLIO_PREFETCH)
+                context = self.build_context(portfolio, user_profile)
             
             # Create portfolio structure
-            self._create_portfolio_structure()
+            self._create_portfolio_structure(temp_dir)
             
             # Generate HTML files
-            self._generate_html_files(portfolio, context, request)
+            with export_phase('html_render'):
+                self._generate_html_files(temp_dir, portfolio, context, request)
             
             # Copy CSS and JS assets
-            self._copy_assets(portfolio.theme)
+            with export_phase('assets'):
+                self._copy_assets(temp_dir, portfolio.theme)
             
             # Copy images
-            self._copy_images(user_profile, portfolio)
-            
-            # Create README file
-            self._create_readme(portfolio, user_profile)
-            
-            # Create ZIP file
-            zip_filename = f"{portfolio.slug}_portfolio.zip"
-            self.zip_path = os.path.join(tempfile.gettempdir(), zip_filename)
+            with export_phase('media_fetch'):
+                self._copy_images(temp_dir, user_profile, portfolio)
             
-            self._create_zip_archive()
-            
-            # Read ZIP file and create response
-            with open(self.zip_path, 'rb') as zip_file:
-                response = HttpResponse(zip_file.read(), content_type='application/zip')
-                response['Content-Disposition'] = f'attachment; filename="{zip_filename}"'
-                response['Content-Length'] = os.path.getsize(self.zip_path)
-                return response
+            # Create README file and ZIP file
+            with export_phase('archive_write'):
+                self._create_readme(temp_dir, portfolio, user_profile)
+                self._create_zip_archive(temp_dir, zip_path)
                 
         finally:
             # Cleanup temporary files
-            self._cleanup()
+            self._cleanup(temp_dir)
+    
+    def build_context(self, portfolio, user_profile):
+        """Build the theme template context for offline rendering"""
+        return {
+            'portfolio': portfolio,
+            'user_profile': user_profile,
+            'education_list': portfolio.education.all(),
+            'experience_list': portfolio.experience.all(),
+            'skills_by_category': self._group_skills_by_category(portfolio.skills.all()),
+            'projects_list': portfolio.projects.all(),
+            'certifications_list': portfolio.certifications.all(),
+            'base_url': '',  # Use relative paths for offline viewing
+        }
     
-    def _create_portfolio_structure(self):
+    def _create_portfolio_structure(self, temp_dir):
         """Create directory structure for the portfolio"""
         directories = [
             'assets',
@@ -78,9 +106,9 @@ class PortfolioZipExporter:
         ]
         
         for directory in directories:
-            os.makedirs(os.path.join(self.temp_dir, directory), exist_ok=True)
+            os.makedirs(os.path.join(temp_dir, directory), exist_ok=True)
     
-    def _generate_html_files(self, portfolio, context, request):
+    def _generate_html_files(self, temp_dir, portfolio, context, request):
         """Generate HTML files for the portfolio"""
         
         # Main portfolio HTML
@@ -94,13 +122,11 @@ class PortfolioZipExporter:
         html_content = self._process_html_for_offline(html_content)
         
         # Write main HTML file
-        with open(os.path.join(self.temp_dir, 'index.html'), 'w', encoding='utf-8') as f:
+        with open(os.path.join(temp_dir, 'index.html'), 'w', encoding='utf-8') as f:
             f.write(html_content)
         
         # Generate alternative theme versions
-        themes = ['minimal_dark', 'modern_light', 'creative_burst', 'tech_noir', 'professional_corporate', 'gradient_showcase']
-        
-        for theme in themes:
+        for theme in self.THEMES:
             if theme != portfolio.theme:
                 try:
                     theme_context = context.copy()
@@ -111,60 +137,56 @@ class PortfolioZipExporter:
                     )
                     theme_html = self._process_html_for_offline(theme_html)
                     
-                    with open(os.path.join(self.temp_dir, f'{theme}.html'), 'w', encoding='utf-8') as f:
+                    with open(os.path.join(temp_dir, f'{theme}.html'), 'w', encoding='utf-8') as f:
                         f.write(theme_html)
                 except:
                     # Skip if theme template doesn't exist
                     pass
     
-    def _copy_assets(self, theme):
+    def _copy_assets(self, temp_dir, theme):
         """Copy CSS, JS, and other assets"""
         
         # Create comprehensive CSS file
         css_content = self._generate_comprehensive_css(theme)
-        with open(os.path.join(self.temp_dir, 'assets', 'css', 'style.css'), 'w', encoding='utf-8') as f:
+        with open(os.path.join(temp_dir, 'assets', 'css', 'style.css'), 'w', encoding='utf-8') as f:
             f.write(css_content)
         
         # Create JavaScript file
         js_content = self._generate_comprehensive_js()
-        with open(os.path.join(self.temp_dir, 'assets', 'js', 'script.js'), 'w', encoding='utf-8') as f:
+        with open(os.path.join(temp_dir, 'assets', 'js', 'script.js'), 'w', encoding='utf-8') as f:
             f.write(js_content)
         
         # Copy theme switcher
         theme_switcher_js = self._generate_theme_switcher_js()
-        with open(os.path.join(self.temp_dir, 'assets', 'js', 'theme-switcher.js'), 'w', encoding='utf-8') as f:
+        with open(os.path.join(temp_dir, 'assets', 'js', 'theme-switcher.js'), 'w', encoding='utf-8') as f:
             f.write(theme_switcher_js)
     
-    def _copy_images(self, user_profile, portfolio):
+    def _copy_images(self, temp_dir, user_profile, portfolio):
         """Copy all images to the assets folder"""
-        images_dir = os.path.join(self.temp_dir, 'assets', 'images')
+        images_dir = os.path.join(temp_dir, 'assets', 'images')
+        
+        # Read every image through the storage API in one concurrent batch
+        media = media_prefetcher.fetch_portfolio_media(user_profile, portfolio)
         
         # Copy profile picture
         if user_profile.profile_picture:
-            try:
-                if default_storage.exists(user_profile.profile_picture.name):
-                    source_path = user_profile.profile_picture.path
-                    if os.path.exists(source_path):
-                        filename = os.path.basename(user_profile.profile_picture.name)
-                        dest_path = os.path.join(images_dir, f'profile_{filename}')
-                        shutil.copy2(source_path, dest_path)
-            except Exception as e:
-                print(f"Error copying profile picture: {e}")
+            filename = os.path.basename(user_profile.profile_picture.name)
+            self._write_image(images_dir, f'profile_{filename}', media, user_profile.profile_picture.name)
         
         # Copy project images
         for project in portfolio.projects.all():
             if project.image:
-                try:
-                    if default_storage.exists(project.image.name):
-                        source_path = project.image.path
-                        if os.path.exists(source_path):
-                            filename = os.path.basename(project.image.name)
-                            dest_path = os.path.join(images_dir, f'project_{filename}')
-                            shutil.copy2(source_path, dest_path)
-                except Exception as e:
-                    print(f"Error copying project image: {e}")
-    
-    def _create_readme(self, portfolio, user_profile):
+                filename = os.path.basename(project.image.name)
+                self._write_image(images_dir, f'project_{filename}', media, project.image.name)
+    
+    def _write_image(self, images_dir, filename, media, name):
+        """Write a prefetched image into the assets folder"""
+        try:
+            media_prefetcher.save(media, name, os.path.join(images_dir, filename))
+        except OSError as e:
+            print(f"Error copying image {filename}: {e}")
+    
+    def _create_readme(self, temp_dir, portfolio, user_profile):
         """Create README file for the portfolio"""
         readme_content = f"""# {user_profile.user.first_name} {user_profile.user.last_name} - Portfolio
 
@@ -225,20 +247,24 @@ This is a professional portfolio for {user_profile.user.first_name} {user_profil
 *This portfolio was generated using DevPort - Professional Portfolio Generator*
 """
         
-        with open(os.path.join(self.temp_dir, 'README.md'), 'w', encoding='utf-8') as f:
+        with open(os.path.join(temp_dir, 'README.md'), 'w', encoding='utf-8') as f:
             f.write(readme_content)
     
-    def _create_zip_archive(self):
+    def _create_zip_archive(self, temp_dir, zip_path):
         """Create the final ZIP archive"""
-        with zipfile.ZipFile(self.zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for root, dirs, files in os.walk(self.temp_dir):
+        with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for root, dirs, files in os.walk(temp_dir):
                 for file in files:
                     file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, self.temp_dir)
+                    arcname = os.path.relpath(file_path, temp_dir)
                     zipf.write(file_path, arcname)
     
-    def _process_html_for_offline(self, html_content):
-        """Process HTML to work offline with relative paths"""
+    def _process_html_for_offline(self, html_content, rewrite_cdn=True):
+        """Process HTML to work offline with relative paths
+        
+        With ``rewrite_cdn=False`` only media paths are rewritten and CDN
+        stylesheets are kept, for pages that are still served online.
+        """
         # Replace CDN links with local fallbacks or remove them
         replacements = {
             # Font Awesome CDN
@@ -248,9 +274,10 @@ This is a professional portfolio for {user_profile.user.first_name} {user_profil
             'https://fonts.googleapis.com/css2?family=Space+Grotesk:wght@300;400;500;600;700&family=Space+Mono:wght@400;700&display=swap': 'assets/css/fonts.css',
             'https://fonts.googleapis.com/css2?family=Orbitron:wght@400;500;600;700;800;900&family=Rajdhani:wght@300;400;500;600;700&display=swap': 'assets/css/fonts.css',
             'https://fonts.googleapis.com/css2?family=Playfair+Display:wght@400;500;600;700&family=Source+Sans+Pro:wght@300;400;600;700&display=swap': 'assets/css/fonts.css',
-            # Image paths
-            '/media/': 'assets/images/',
-        }
+        } if rewrite_cdn else {}
+        
+        # Image paths
+        replacements['/media/'] = 'assets/images/'
         
         for old, new in replacements.items():
             html_content = html_content.replace(old, new)
@@ -659,13 +686,11 @@ function createThemeSwitcher() {
 }
 """
     
-    def _cleanup(self):
+    def _cleanup(self, temp_dir):
         """Clean up temporary files"""
         try:
-            if self.temp_dir and os.path.exists(self.temp_dir):
-                shutil.rmtree(self.temp_dir)
-            if self.zip_path and os.path.exists(self.zip_path):
-                os.remove(self.zip_path)
+            if temp_dir and os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir)
         except Exception as e:
             print(f"Error during cleanup: {e}")
 